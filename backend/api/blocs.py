@@ -39,6 +39,7 @@ class BlocUpdate(BaseModel):
     couleur: Couleur | None = None
     largeur: float | None = None
     hauteur: float | None = None
+    epingle: bool | None = None
 
 
 class ContenuCreate(BaseModel):
@@ -96,7 +97,7 @@ async def update_bloc(bloc_id: str, data: BlocUpdate):
 
     await db.execute(
         """UPDATE blocs SET x = ?, y = ?, x_global = ?, y_global = ?,
-           forme = ?, couleur = ?, largeur = ?, hauteur = ?, updated_at = ?
+           forme = ?, couleur = ?, largeur = ?, hauteur = ?, epingle = ?, updated_at = ?
            WHERE id = ?""",
         (
             data.x if data.x is not None else current["x"],
@@ -107,6 +108,7 @@ async def update_bloc(bloc_id: str, data: BlocUpdate):
             data.couleur if data.couleur is not None else current["couleur"],
             data.largeur if data.largeur is not None else current["largeur"],
             data.hauteur if data.hauteur is not None else current["hauteur"],
+            int(data.epingle) if data.epingle is not None else current["epingle"],
             now,
             bloc_id,
         ),
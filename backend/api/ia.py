@@ -1,15 +1,30 @@
 """API — Assistant IA (dialogue, analyse d'espace, suggestions, réorganisation)."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from services.ia_assistant import ask_assistant
-from services.force_layout import reorganiser_espace, reorganiser_global
-from services.meta_graphe import suggerer_et_persister
+from services.force_layout import reorganiser_espace
+from services.layout_executor import FileLayoutPleine, LayoutExpire, LayoutRemplace, capacite_disponible
+from services.layout_jobs import PROGRESSION_TOUTES_DEFAUT, flux_sse, get_job, lancer_layout
+from services.meta_graphe import SEUIL_QUASI_DOUBLON, detecter_quasi_doublons, suggerer_et_persister
 
 router = APIRouter()
 
 
+async def _executer_reorganisation(coro):
+    """Traduit les refus de l'exécuteur de layout en erreurs HTTP."""
+    try:
+        return await coro
+    except FileLayoutPleine as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except LayoutRemplace as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except LayoutExpire as e:
+        raise HTTPException(status_code=504, detail=str(e))
+
+
 class IAQuestion(BaseModel):
     espace_id: str
     question: str
@@ -17,6 +32,10 @@ class IAQuestion(BaseModel):
 
 class ReorgRequest(BaseModel):
     espace_id: str
+    # None = automatique (incrémental si peu de blocs ont changé)
+    incremental: bool | None = None
+    # Graine du layout (None = graine par défaut : même graphe, même image)
+    seed: int | None = None
 
 
 @router.post("/ask")
@@ -27,25 +46,95 @@ async def ia_ask(data: IAQuestion):
 
 @router.post("/reorganiser")
 async def ia_reorganiser(data: ReorgRequest):
-    """Réorganise le graphe d'un espace avec l'algorithme force-directed."""
-    result = await reorganiser_espace(data.espace_id)
+    """Réorganise le graphe d'un espace avec l'algorithme force-directed.
+
+    Attend la fin du calcul ; POST /reorganiser-espace le lance en job.
+    """
+    result = await _executer_reorganisation(
+        reorganiser_espace(data.espace_id, incremental=data.incremental, seed=data.seed)
+    )
     return {"result": result}
 
 
-@router.post("/reorganiser-global")
-async def ia_reorganiser_global():
-    """Positionne tous les blocs dans le graphe global (x_global/y_global)."""
-    result = await reorganiser_global()
-    return {"scope": "global", "result": result}
+@router.post("/reorganiser-espace", status_code=202)
+async def ia_reorganiser_espace(
+    data: ReorgRequest,
+    progression_toutes: int = Query(
+        PROGRESSION_TOUTES_DEFAUT, ge=0, description="Positions intermédiaires toutes les N itérations (0 = jamais)"
+    ),
+):
+    """Lance la réorganisation d'un espace (x/y) en job asynchrone.
+
+    Retourne immédiatement l'identifiant du job ; suivre l'avancement via
+    GET /layouts/{job_id} ou le flux SSE GET /layouts/{job_id}/flux.
+    """
+    if not capacite_disponible():
+        raise HTTPException(status_code=503, detail="Trop de layouts en cours, réessayez plus tard.")
+    job = lancer_layout("espace", data.espace_id, progression_toutes=progression_toutes,
+                        incremental=data.incremental, seed=data.seed)
+    return job.etat()
+
+
+@router.post("/reorganiser-global", status_code=202)
+async def ia_reorganiser_global(
+    progression_toutes: int = Query(
+        PROGRESSION_TOUTES_DEFAUT, ge=0, description="Positions intermédiaires toutes les N itérations (0 = jamais)"
+    ),
+    multiniveau: bool | None = Query(
+        None, description="Layout multiniveau par espace (défaut : automatique selon le nombre de blocs)"
+    ),
+    par_espace: bool | None = Query(
+        None, description="Layout en deux phases, espaces en parallèle (défaut : dès qu'il y a plusieurs espaces)"
+    ),
+):
+    """Lance le positionnement global (x_global/y_global) en job asynchrone.
+
+    Retourne immédiatement l'identifiant du job ; suivre l'avancement via
+    GET /layouts/{job_id} ou le flux SSE GET /layouts/{job_id}/flux.
+    """
+    if not capacite_disponible():
+        raise HTTPException(status_code=503, detail="Trop de layouts en cours, réessayez plus tard.")
+    job = lancer_layout("global", progression_toutes=progression_toutes, multiniveau=multiniveau, par_espace=par_espace)
+    return {"scope": "global", **job.etat()}
+
+
+@router.get("/layouts/{job_id}")
+async def ia_layout_etat(job_id: str, positions: bool = False):
+    """État d'un job de layout (positions intermédiaires si `positions=true`)."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job de layout non trouvé")
+    return job.etat(avec_positions=positions)
+
+
+@router.get("/layouts/{job_id}/flux")
+async def ia_layout_flux(job_id: str):
+    """Flux Server-Sent Events de la progression d'un job de layout."""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job de layout non trouvé")
+    return StreamingResponse(
+        flux_sse(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.post("/suggerer-liaisons")
-async def ia_suggerer_liaisons():
+async def ia_suggerer_liaisons(complet: bool = False):
     """Suggestions IA de liaisons inter-espaces.
 
     Détecte des connexions sémantiques entre blocs d'espaces différents
     et les persiste en état `en_attente` avec `origine=ia_suggestion`.
     Le poids est indicatif — l'utilisateur valide ou rejette.
+    Seuls les blocs dont les termes ont changé depuis le dernier passage
+    sont réévalués, sauf `complet=true`.
     """
-    result = await suggerer_et_persister()
+    result = await suggerer_et_persister(complet=complet)
     return {"scope": "global", "result": result}
+
+
+@router.get("/quasi-doublons")
+async def ia_quasi_doublons(seuil: float = Query(SEUIL_QUASI_DOUBLON, ge=0.0, le=1.0)):
+    """Blocs d'espaces différents aux termes quasi identiques (Jaccard estimé ≥ seuil)."""
+    return {"seuil": seuil, "doublons": await detecter_quasi_doublons(seuil)}
@@ -0,0 +1,268 @@
+"""Benchmark — Moteurs de force_layout (exact, Barnes-Hut, NumPy).
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_force_layout
+    python -m benchmarks.bench_force_layout --tailles 100 1000 --iterations 5
+
+Pour chaque taille de graphe :
+- temps moyen d'une itération de simulation, par moteur (sans la passe de
+  suppression des chevauchements, qui ne dépend pas du nombre d'itérations)
+- temps de la passe de suppression des chevauchements, seule
+- erreur relative des forces Barnes-Hut par rapport au calcul exact, sur la
+  seule composante lointaine (cf. erreur_forces)
+
+Ces deux dernières colonnes portent sur une disposition réaliste (quelques
+itérations Barnes-Hut), calculée jusqu'à --exact-max nœuds.
+
+Jusqu'à --comparaison-max nœuds, les dispositions finales de chaque moteur
+sont ensuite comparées à celle du moteur exact (même graine) : distance de
+Procrustes et proportion des --voisins plus proches voisins conservés. La
+simulation est chaotique (deux moteurs aux forces identiques à l'arrondi
+près divergent en quelques dizaines d'itérations) : la distance est
+rapportée à celle qui sépare deux dispositions exactes de graines
+différentes, et un moteur dont le rapport dépasse --tolerance est signalé
+(code de sortie 1).
+
+Le moteur exact est O(n²) : au-delà de --exact-max nœuds il n'est pas
+chronométré (une seule itération à 20 000 nœuds prend plusieurs minutes).
+Le moteur numpy est ignoré si NumPy n'est pas installé.
+"""
+
+import argparse
+import heapq
+import math
+import sys
+import time
+
+from benchmarks.graphes_synthetiques import generer_graphe_aleatoire as generer_graphe
+from services import force_layout
+from services.force_layout import (
+    Edge,
+    ForceParams,
+    Node,
+    _apply_repulsion,
+    _apply_repulsion_barnes_hut,
+    remove_overlaps,
+    simulate_forces,
+)
+
+TAILLES_DEFAUT = [100, 1000, 5000, 20000]
+
+
+def _copier(nodes: list[Node]) -> list[Node]:
+    return [Node(id=n.id, x=n.x, y=n.y, w=n.w, h=n.h) for n in nodes]
+
+
+def mesurer_iteration(nodes: list[Node], edges: list[Edge], engine: str, iterations: int,
+                      theta: float = ForceParams.theta) -> float:
+    """Temps moyen (ms) d'une itération complète de simulation."""
+    params = ForceParams(engine=engine, theta=theta, iterations=iterations, min_temperature=0.0,
+                         convergence_window=0, seed=0, remove_overlaps=False)
+    start = time.perf_counter()
+    simulate_forces(_copier(nodes), edges, params)
+    return (time.perf_counter() - start) * 1000 / iterations
+
+
+def mesurer_chevauchements(nodes: list[Node]) -> float:
+    """Temps (ms) de la passe de suppression des chevauchements sur une disposition donnée."""
+    copie = _copier(nodes)
+    start = time.perf_counter()
+    remove_overlaps(copie, ForceParams.overlap_gap, ForceParams.overlap_rounds)
+    return (time.perf_counter() - start) * 1000
+
+
+def _forces_proches(nodes: list[Node], params: ForceParams) -> list[tuple[float, float]]:
+    """Part de la répulsion exacte due aux paires qui se chevauchent (center_dist < min_sep).
+
+    Balayage selon x : min_sep ne dépasse pas la plus grande dimension des
+    blocs plus la marge, les paires plus écartées en x sont ignorées.
+    """
+    forces = [[0.0, 0.0] for _ in nodes]
+    portee = max(max(node.w, node.h) for node in nodes) + params.overlap_padding
+    ordre = sorted(range(len(nodes)), key=lambda i: nodes[i].x)
+    for rang, i in enumerate(ordre):
+        a = nodes[i]
+        for j in ordre[rang + 1:]:
+            b = nodes[j]
+            dx = b.x - a.x
+            if dx >= portee:
+                break
+            dy = b.y - a.y
+            if abs(dy) >= portee:
+                continue
+            center_dist = max(math.sqrt(dx * dx + dy * dy), 1.0)
+            nx = dx / center_dist
+            ny = dy / center_dist
+            min_sep_x = (a.w + b.w) / 2 + params.overlap_padding
+            min_sep_y = (a.h + b.h) / 2 + params.overlap_padding
+            min_sep = math.sqrt((min_sep_x * nx) ** 2 + (min_sep_y * ny) ** 2)
+            if center_dist >= min_sep:
+                continue
+            effective_dist = max(center_dist - min_sep, params.repulsion_min_distance)
+            force = params.repulsion_strength / (effective_dist * effective_dist)
+            force += params.repulsion_strength * (1.0 - center_dist / min_sep) * 2.0
+            forces[i][0] -= nx * force
+            forces[i][1] -= ny * force
+            forces[j][0] += nx * force
+            forces[j][1] += ny * force
+    return [(fx, fy) for fx, fy in forces]
+
+
+def erreur_forces(nodes: list[Node], theta: float) -> float:
+    """Erreur relative des forces Barnes-Hut sur la composante lointaine.
+
+    Barnes-Hut n'approche une cellule que si aucun de ses blocs ne peut
+    chevaucher le nœud : les paires qui se chevauchent sont toujours
+    calculées exactement, l'écart aux forces exactes ne porte que sur la
+    composante lointaine. Il est rapporté à la norme de cette seule
+    composante (forces exactes moins _forces_proches), sans quoi les
+    fortes répulsions de chevauchement écraseraient le dénominateur.
+    """
+    params = ForceParams()
+    exact = _copier(nodes)
+    approx = _copier(nodes)
+    _apply_repulsion(exact, params)
+    _apply_repulsion_barnes_hut(approx, ForceParams(theta=theta))
+    proches = _forces_proches(nodes, params)
+
+    ecart = sum((a.vx - e.vx) ** 2 + (a.vy - e.vy) ** 2 for a, e in zip(approx, exact))
+    norme = sum((e.vx - px) ** 2 + (e.vy - py) ** 2 for e, (px, py) in zip(exact, proches))
+    return math.sqrt(ecart / norme) if norme else 0.0
+
+
+def _disposer(nodes: list[Node], edges: list[Edge]) -> list[Node]:
+    """Positions réalistes : quelques itérations Barnes-Hut depuis le semis initial."""
+    params = ForceParams(engine="barnes_hut", iterations=20, seed=0, remove_overlaps=False)
+    return simulate_forces(_copier(nodes), edges, params)
+
+
+def _disposition_finale(nodes: list[Node], edges: list[Edge], engine: str, theta: float,
+                        seed: int) -> list[Node]:
+    """Disposition complète, avec les paramètres de l'application."""
+    return simulate_forces(_copier(nodes), edges, ForceParams(engine=engine, theta=theta, seed=seed))
+
+
+def distance_procrustes(reference: list[Node], autre: list[Node]) -> float:
+    """Disparité de Procrustes entre deux dispositions des mêmes nœuds, dans [0, 1].
+
+    `autre` est aligné sur `reference` (translation, rotation, échelle et
+    symétrie) ; 0 = mêmes positions à une similitude près. Les positions
+    sont traitées comme des complexes : la meilleure similitude est le
+    coefficient de régression de `reference` sur `autre`.
+    """
+    ref = [complex(node.x, node.y) for node in reference]
+    pos = [complex(node.x, node.y) for node in autre]
+    centre_ref = sum(ref) / len(ref)
+    centre_pos = sum(pos) / len(pos)
+    ref = [z - centre_ref for z in ref]
+    pos = [z - centre_pos for z in pos]
+    norme_ref = sum(abs(z) ** 2 for z in ref)
+    norme_pos = sum(abs(z) ** 2 for z in pos)
+    if not norme_ref or not norme_pos:
+        return 0.0
+    return min(
+        1.0 - abs(sum(r.conjugate() * p for r, p in zip(ref, candidat))) ** 2 / (norme_ref * norme_pos)
+        for candidat in (pos, [z.conjugate() for z in pos])
+    )
+
+
+def _plus_proches(nodes: list[Node], k: int) -> list[set[int]]:
+    positions = [(node.x, node.y) for node in nodes]
+    voisins = []
+    for i, (x, y) in enumerate(positions):
+        proches = heapq.nsmallest(
+            k + 1, (((px - x) ** 2 + (py - y) ** 2, j) for j, (px, py) in enumerate(positions))
+        )
+        voisins.append({j for _, j in proches if j != i})
+    return voisins
+
+
+def preservation_voisinage(reference: list[Node], autre: list[Node], k: int) -> float:
+    """Proportion moyenne des k plus proches voisins de `reference` conservés dans `autre`."""
+    k = min(k, len(reference) - 1)
+    if k <= 0:
+        return 1.0
+    communs = sum(len(a & b) for a, b in zip(_plus_proches(reference, k), _plus_proches(autre, k)))
+    return communs / (k * len(reference))
+
+
+def comparer_moteurs(nodes: list[Node], edges: list[Edge], engines: list[str], theta: float,
+                     k: int) -> dict[str, tuple[float, float]]:
+    """(distance de Procrustes, préservation du voisinage) de chaque moteur face à l'exact.
+
+    La clé "graine" compare le moteur exact à lui-même avec une autre graine :
+    c'est l'écart que la seule initialisation suffit à produire.
+    """
+    reference = _disposition_finale(nodes, edges, "exact", theta, seed=0)
+    autres = {engine: _disposition_finale(nodes, edges, engine, theta, seed=0)
+              for engine in engines if engine != "exact"}
+    autres["graine"] = _disposition_finale(nodes, edges, "exact", theta, seed=1)
+    return {
+        nom: (distance_procrustes(reference, disposition), preservation_voisinage(reference, disposition, k))
+        for nom, disposition in autres.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES_DEFAUT)
+    parser.add_argument("--iterations", type=int, default=3, help="itérations chronométrées par mesure")
+    parser.add_argument("--theta", type=float, default=ForceParams.theta)
+    parser.add_argument("--exact-max", type=int, default=5000, help="taille max pour le moteur exact")
+    parser.add_argument("--comparaison-max", type=int, default=500,
+                        help="taille max pour la comparaison des dispositions finales")
+    parser.add_argument("--voisins", type=int, default=10, help="k de la préservation du voisinage")
+    parser.add_argument("--tolerance", type=float, default=0.6,
+                        help="rapport max (distance au moteur exact / distance entre graines)")
+    args = parser.parse_args()
+
+    engines = ["exact", "barnes_hut"] + (["numpy"] if force_layout.np is not None else [])
+    header = " | ".join(f"{e + ' ms/it':>15}" for e in engines)
+    print(f"{'nœuds':>8} | {header} | {'chevauch. ms':>12} | {'err. BH lointain':>16}")
+    print("-" * (45 + 18 * len(engines)))
+    for n in args.tailles:
+        nodes, edges = generer_graphe(n)
+        cells = []
+        for engine in engines:
+            if engine == "exact" and n > args.exact_max:
+                cells.append(f"{'—':>15}")
+                continue
+            ms = mesurer_iteration(nodes, edges, engine, args.iterations, args.theta)
+            cells.append(f"{ms:>15.1f}")
+
+        if n <= args.exact_max:
+            disposition = _disposer(nodes, edges)
+            chevauchements = f"{mesurer_chevauchements(disposition):>12.1f}"
+            erreur = f"{erreur_forces(disposition, args.theta):>16.1e}"
+        else:
+            chevauchements = f"{'—':>12}"
+            erreur = f"{'—':>16}"
+        print(f"{n:>8} | {' | '.join(cells)} | {chevauchements} | {erreur}")
+
+    comparees = [n for n in args.tailles if n <= args.comparaison_max]
+    if not comparees:
+        return
+    print(f"\n{'nœuds':>8} | {'moteur':>10} | {'procrustes':>10} | {'voisins':>8} | {'/ graine':>8} |")
+    print("-" * 58)
+    ecarts = []
+    for n in comparees:
+        nodes, edges = generer_graphe(n)
+        mesures = comparer_moteurs(nodes, edges, engines, args.theta, args.voisins)
+        plancher = mesures["graine"][0]
+        for nom, (procrustes, voisinage) in mesures.items():
+            rapport = procrustes / plancher if plancher else 0.0
+            hors_tolerance = nom != "graine" and rapport > args.tolerance
+            if hors_tolerance:
+                ecarts.append(f"{n} nœuds, {nom} : {rapport:.2f} × l'écart entre graines")
+            print(f"{n:>8} | {nom:>10} | {procrustes:>10.4f} | {voisinage:>8.1%} | {rapport:>8.2f} |"
+                  f"{' hors tolérance' if hors_tolerance else ''}")
+
+    if ecarts:
+        print(f"\n{len(ecarts)} disposition(s) au-delà de {args.tolerance} × l'écart entre graines :")
+        for ligne in ecarts:
+            print(f"  - {ligne}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Benchmark — Suite de layout : temps et qualité par moteur et par mode.
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_layout_suite
+    python -m benchmarks.bench_layout_suite --tailles 200 1000 --sortie rapport.json
+    python -m benchmarks.bench_layout_suite --reference rapport_precedent.json
+
+Pour chaque taille de graphe synthétique (cf. graphes_synthetiques), chaque
+moteur (exact, barnes_hut, numpy) et chaque mode :
+- standard    : simulate_forces depuis le semis initial
+- multiniveau : simulate_multilevel, contraction par espace
+- incremental : simulate_incremental sur 2 % de blocs déplacés, à partir
+                d'une disposition standard (seul l'incrémental est chronométré)
+
+sont mesurés le temps total, le nombre d'itérations, la convergence et la
+qualité du résultat :
+- stress           : écart quadratique moyen, relatif ((d − L) / L)², des
+                     longueurs de liaisons à leur longueur idéale (selon le
+                     type), pondéré par le poids des liaisons
+- chevauchements   : paires de rectangles qui se recouvrent
+- croisements      : estimation du nombre de croisements de liaisons, par
+                     échantillonnage de paires de liaisons
+- aire_bbox        : aire de la boîte englobante (px²)
+
+Le rapport JSON (--sortie) est comparable à un rapport précédent
+(--reference) : toute mesure qui se dégrade au-delà de --tolerance est
+signalée et le code de sortie vaut 1, ce qui permet de bloquer un déploiement.
+"""
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.graphes_synthetiques import GENERATEURS
+from services import force_layout
+from services.force_layout import (
+    Edge,
+    ForceParams,
+    LayoutStats,
+    Node,
+    _paires_chevauchantes,
+    _ressort,
+    simulate_forces,
+    simulate_incremental,
+    simulate_multilevel,
+)
+
+TAILLES_DEFAUT = [200, 1000]
+MODES = ["standard", "multiniveau", "incremental"]
+SORTIE_DEFAUT = "benchmarks/rapport_layout.json"
+
+# Mesures comparées à la référence : une valeur plus grande est une dégradation
+MESURES_SURVEILLEES = ["temps_ms", "stress", "chevauchements", "croisements", "aire_bbox"]
+
+
+def _copier(nodes: list[Node]) -> list[Node]:
+    return [Node(id=n.id, x=n.x, y=n.y, w=n.w, h=n.h, group=n.group) for n in nodes]
+
+
+# ═══════════════════════════════════════════════════════════
+#  MESURES DE QUALITÉ
+# ═══════════════════════════════════════════════════════════
+
+def stress_liaisons(nodes: list[Node], edges: list[Edge], params: ForceParams) -> float:
+    node_map = {node.id: node for node in nodes}
+    total = poids = 0.0
+    for edge in edges:
+        a, b = node_map.get(edge.source_id), node_map.get(edge.target_id)
+        if a and b:
+            _, longueur = _ressort(edge, params)
+            total += edge.weight * ((math.hypot(a.x - b.x, a.y - b.y) - longueur) / longueur) ** 2
+            poids += edge.weight
+    return total / poids if poids else 0.0
+
+
+def _orientation(ax, ay, bx, by, cx, cy) -> float:
+    return (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+
+
+def _se_croisent(p1, p2, q1, q2) -> bool:
+    """Croisement strict de deux segments (les contacts aux extrémités ne comptent pas)."""
+    d1 = _orientation(*q1, *q2, *p1)
+    d2 = _orientation(*q1, *q2, *p2)
+    d3 = _orientation(*p1, *p2, *q1)
+    d4 = _orientation(*p1, *p2, *q2)
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+
+def estimer_croisements(nodes: list[Node], edges: list[Edge], echantillon: int = 20000,
+                        seed: int = 0) -> int:
+    """Nombre de croisements de liaisons, estimé sur `echantillon` paires tirées au hasard.
+
+    Exact (toutes les paires) si le graphe en a moins que l'échantillon.
+    Les paires qui partagent une extrémité ne peuvent pas se croiser.
+    """
+    node_map = {node.id: node for node in nodes}
+    segments = [
+        (edge.source_id, edge.target_id, (a.x, a.y), (b.x, b.y))
+        for edge in edges
+        if (a := node_map.get(edge.source_id)) and (b := node_map.get(edge.target_id))
+        and edge.source_id != edge.target_id
+    ]
+    m = len(segments)
+    total = m * (m - 1) // 2
+    if total == 0:
+        return 0
+
+    def croise(i: int, j: int) -> bool:
+        s1, t1, p1, p2 = segments[i]
+        s2, t2, q1, q2 = segments[j]
+        if {s1, t1} & {s2, t2}:
+            return False
+        return _se_croisent(p1, p2, q1, q2)
+
+    if total <= echantillon:
+        return sum(croise(i, j) for i in range(m) for j in range(i + 1, m))
+    rng = random.Random(seed)
+    touches = 0
+    for _ in range(echantillon):
+        i, j = rng.sample(range(m), 2)
+        touches += croise(i, j)
+    return round(touches / echantillon * total)
+
+
+def aire_bbox(nodes: list[Node]) -> float:
+    largeur = max(n.x + n.w / 2 for n in nodes) - min(n.x - n.w / 2 for n in nodes)
+    hauteur = max(n.y + n.h / 2 for n in nodes) - min(n.y - n.h / 2 for n in nodes)
+    return largeur * hauteur
+
+
+def mesurer_qualite(nodes: list[Node], edges: list[Edge], params: ForceParams) -> dict:
+    # Copies non fixes : les paires de nœuds fixes comptent aussi
+    return {
+        "stress": round(stress_liaisons(nodes, edges, params), 4),
+        "chevauchements": len(_paires_chevauchantes(_copier(nodes), 0.0)),
+        "croisements": estimer_croisements(nodes, edges),
+        "aire_bbox": round(aire_bbox(nodes)),
+    }
+
+
+# ═══════════════════════════════════════════════════════════
+#  EXÉCUTION
+# ═══════════════════════════════════════════════════════════
+
+def executer_cas(nodes: list[Node], edges: list[Edge], engine: str, mode: str,
+                 seed: int = 0) -> dict:
+    """Un layout chronométré (moteur × mode) suivi des mesures de qualité."""
+    params = ForceParams(engine=engine, seed=seed)
+    travail = _copier(nodes)
+    stats = LayoutStats()
+
+    if mode == "standard":
+        start = time.perf_counter()
+        simulate_forces(travail, edges, params, stats=stats)
+    elif mode == "multiniveau":
+        params = ForceParams(engine=engine, seed=seed, multilevel=True)
+        start = time.perf_counter()
+        simulate_multilevel(travail, edges, params, stats=stats)
+    elif mode == "incremental":
+        simulate_forces(travail, edges, ForceParams(engine=engine, seed=seed))
+        rng = random.Random(seed)
+        deplaces = rng.sample(travail, max(1, len(travail) // 50))
+        for node in deplaces:
+            node.x += rng.uniform(-600, 600)
+            node.y += rng.uniform(-600, 600)
+        start = time.perf_counter()
+        simulate_incremental(travail, edges, {node.id for node in deplaces}, params, stats=stats)
+    else:
+        raise ValueError(f"Mode inconnu : {mode}")
+    temps_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "temps_ms": round(temps_ms, 1),
+        "iterations": stats.iterations,
+        "converge": stats.converged,
+        "arret": stats.arret,
+        **mesurer_qualite(travail, edges, params),
+    }
+
+
+def comparer(resultats: list[dict], reference: list[dict], tolerance: float) -> list[str]:
+    """Dégradations par rapport à la référence, au-delà de la tolérance relative."""
+    anciens = {(r["taille"], r["moteur"], r["mode"]): r for r in reference}
+    regressions = []
+    for r in resultats:
+        ancien = anciens.get((r["taille"], r["moteur"], r["mode"]))
+        if ancien is None:
+            continue
+        for mesure in MESURES_SURVEILLEES:
+            avant, apres = ancien.get(mesure), r[mesure]
+            if avant is None:
+                continue
+            # Marge absolue minimale : un passage de 0 à 1 chevauchement compte, pas 0,001 de stress
+            seuil = avant * (1 + tolerance) + (0 if mesure == "chevauchements" else 1e-3)
+            if apres > seuil:
+                regressions.append(
+                    f"{r['taille']} nœuds, {r['moteur']}/{r['mode']} : {mesure} {avant} → {apres}"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES_DEFAUT)
+    parser.add_argument("--generateur", choices=sorted(GENERATEURS), default="espaces")
+    parser.add_argument("--moteurs", nargs="+", default=None, help="défaut : tous les moteurs disponibles")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--exact-max", type=int, default=500, help="taille max pour le moteur exact")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--sortie", default=SORTIE_DEFAUT, help="rapport JSON produit")
+    parser.add_argument("--reference", default=None, help="rapport JSON précédent à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="dégradation relative tolérée")
+    args = parser.parse_args()
+
+    moteurs = args.moteurs or ["exact", "barnes_hut"] + (["numpy"] if force_layout.np is not None else [])
+    generer = GENERATEURS[args.generateur]
+
+    print(f"{'nœuds':>7} | {'moteur':>10} | {'mode':>11} | {'ms':>9} | {'it.':>4} | "
+          f"{'stress':>7} | {'chev.':>5} | {'crois.':>7} | {'aire bbox':>12}")
+    print("-" * 98)
+    resultats = []
+    for n in args.tailles:
+        nodes, edges = generer(n, seed=args.seed)
+        for moteur in moteurs:
+            if moteur == "exact" and n > args.exact_max:
+                continue
+            for mode in args.modes:
+                r = {"taille": n, "moteur": moteur, "mode": mode,
+                     **executer_cas(nodes, edges, moteur, mode)}
+                resultats.append(r)
+                print(f"{n:>7} | {moteur:>10} | {mode:>11} | {r['temps_ms']:>9.0f} | {r['iterations']:>4} | "
+                      f"{r['stress']:>7.3f} | {r['chevauchements']:>5} | {r['croisements']:>7} | "
+                      f"{r['aire_bbox']:>12.3g}")
+
+    rapport = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": force_layout.np is not None,
+        "generateur": args.generateur,
+        "seed": args.seed,
+        "resultats": resultats,
+    }
+    with open(args.sortie, "w", encoding="utf-8") as f:
+        json.dump(rapport, f, ensure_ascii=False, indent=2)
+    print(f"\nRapport écrit dans {args.sortie}")
+
+    if args.reference:
+        with open(args.reference, encoding="utf-8") as f:
+            reference = json.load(f)["resultats"]
+        regressions = comparer(resultats, reference, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} régression(s) au-delà de {args.tolerance:.0%} :")
+            for ligne in regressions:
+                print(f"  - {ligne}")
+            sys.exit(1)
+        print("\nAucune régression par rapport à la référence.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Benchmark — Détection des suggestions inter-espaces (meta_graphe).
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_meta_graphe
+    python -m benchmarks.bench_meta_graphe --tailles 1000 5000 --naif-max 2000
+
+Pour chaque nombre de blocs indexés :
+- temps de la détection par index inversé (meta_graphe._detecter), avec le
+  plafond MAX_BLOCS_PAR_TERME sur les termes trop courants puis sans plafond
+- temps du parcours naïf de toutes les paires inter-espaces (référence),
+  jusqu'à --naif-max blocs
+- vérification que l'index sans plafond produit les mêmes suggestions que le
+  parcours naïf, dans le même ordre (fréquences documentaires des blocs
+  générés dans les deux cas)
+- temps des candidates LSH (signatures MinHash comprises) et leur rappel :
+  part des suggestions exactes retrouvées, toutes puis fortes seulement
+  (similarité TF-IDF > 0,4, poids suggéré ≥ 0,6)
+
+Les blocs synthétiques tirent leurs mots-clés et entités d'un vocabulaire à
+fréquences de Zipf (quelques termes très courants, une longue traîne de
+termes rares), répartis en espaces de tailles égales.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from services.meta_graphe import MAX_BLOCS_PAR_TERME, _detecter, _evaluer_paire, frequences_locales
+
+TAILLES_DEFAUT = [500, 2000, 5000]
+COULEURS = ["green", "orange", "yellow", "blue", "violet", "mauve"]
+
+
+def generer_blocs(n: int, n_espaces: int = 8, vocabulaire: int = 20000,
+                  seed: int = 42) -> dict[str, list[dict]]:
+    """Blocs indexés synthétiques, groupés par espace (comme la requête de meta_graphe)."""
+    rng = random.Random(seed)
+    termes = [f"terme{i}" for i in range(vocabulaire)]
+    frequences = [1.0 / (rang + 20) for rang in range(vocabulaire)]
+    par_espace: dict[str, list[dict]] = {}
+    for i in range(n):
+        espace_id = f"espace{i % n_espaces}"
+        mots = rng.choices(termes, weights=frequences, k=rng.randint(3, 8))
+        entites = rng.choices(termes, weights=frequences, k=rng.randint(0, 3))
+        par_espace.setdefault(espace_id, []).append({
+            "id": f"b{i}",
+            "espace_id": espace_id,
+            "couleur": rng.choice(COULEURS),
+            "titre_ia": " ".join(rng.choices(termes, weights=frequences, k=3)),
+            "mots_cles": json.dumps(mots),
+            "entites": json.dumps(entites),
+        })
+    return dict(sorted(par_espace.items()))
+
+
+def detecter_naif(par_espace: dict[str, list[dict]]) -> list[dict]:
+    """Référence : toutes les paires de blocs d'espaces différents."""
+    frequences, nb_blocs = frequences_locales([b for blocs in par_espace.values() for b in blocs])
+    espaces = list(par_espace)
+    paires = set()
+    suggestions = []
+    for i, espace_a in enumerate(espaces):
+        for espace_b in espaces[i + 1:]:
+            for bloc_a in par_espace[espace_a]:
+                for bloc_b in par_espace[espace_b]:
+                    pair = tuple(sorted([bloc_a["id"], bloc_b["id"]]))
+                    if pair in paires:
+                        continue
+                    suggestion = _evaluer_paire(bloc_a, bloc_b, frequences, nb_blocs)
+                    if suggestion:
+                        suggestions.append(suggestion)
+                        paires.add(pair)
+    return suggestions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES_DEFAUT)
+    parser.add_argument("--naif-max", type=int, default=2000, help="taille max pour le parcours naïf")
+    args = parser.parse_args()
+
+    print(f"plafond : {MAX_BLOCS_PAR_TERME} blocs par terme")
+    print(f"{'blocs':>7} | {'plafonné ms':>11} | {'sugg.':>7} | {'exact ms':>9} | {'sugg.':>7} | "
+          f"{'naïf ms':>9} | {'gain':>7} | {'identiques':>10} | {'lsh ms':>8} | {'rappel':>6} | {'forts':>6}")
+    print("-" * 127)
+    for n in args.tailles:
+        par_espace = generer_blocs(n)
+
+        start = time.perf_counter()
+        plafonnees = _detecter(par_espace, set())
+        ms_plafond = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        exactes = _detecter(par_espace, set(), max_blocs_par_terme=None)
+        ms_exact = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        approchees = _detecter(par_espace, set(), candidats="lsh")
+        ms_lsh = (time.perf_counter() - start) * 1000
+        trouvees = {(s["bloc_source_id"], s["bloc_cible_id"]) for s in approchees}
+
+        def rappel(suggestions: list[dict]) -> float:
+            if not suggestions:
+                return 1.0
+            return sum((s["bloc_source_id"], s["bloc_cible_id"]) in trouvees for s in suggestions) / len(suggestions)
+
+        if n <= args.naif_max:
+            start = time.perf_counter()
+            reference = detecter_naif(par_espace)
+            ms_naif = (time.perf_counter() - start) * 1000
+            naif = f"{ms_naif:>9.0f}"
+            gain = f"{ms_naif / ms_exact:>6.1f}x"
+            identiques = "oui" if exactes == reference else "NON"
+        else:
+            naif, gain, identiques = f"{'—':>9}", f"{'—':>7}", "—"
+        print(f"{n:>7} | {ms_plafond:>11.0f} | {len(plafonnees):>7} | {ms_exact:>9.0f} | {len(exactes):>7} | "
+              f"{naif} | {gain} | {identiques:>10} | {ms_lsh:>8.0f} | {rappel(exactes):>6.1%} | "
+              f"{rappel([s for s in exactes if s['poids'] >= 0.6]):>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark — Scan différentiel d'un dossier surveillé (scan_diff).
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_scan_diff
+    python -m benchmarks.bench_scan_diff --tailles 10000 50000 --budget 0
+
+Pour chaque nombre de fichiers, une arborescence synthétique est créée dans
+un dossier temporaire (sous-dossiers imbriqués, quelques dossiers ignorés),
+avec une base SQLite temporaire, puis sont chronométrés :
+- premier scan      : tous les fichiers sont nouveaux (tous hashés)
+- rescan            : aucun changement
+- après changements : 5 % de fichiers modifiés, 2 % supprimés, un dossier
+                      de premier niveau renommé (fichiers déplacés)
+
+avec le détail par phase du rapport (parcours, hash, diff, écriture) et le
+nombre de fichiers effectivement hashés.
+
+Cible du projet (CENTRAL.md §8.3) : < 5 s pour 10 000 fichiers.
+"""
+
+import argparse
+import asyncio
+import random
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import db.database as database
+from services import scan_diff
+
+TAILLES_DEFAUT = [2000, 10000]
+EXTENSIONS = [".md", ".txt", ".py", ".json", ".csv", ".pdf"]
+
+
+def generer_arborescence(racine: Path, n: int, seed: int = 42) -> list[Path]:
+    """n fichiers de 0,5 à 64 Ko répartis sur trois niveaux de dossiers."""
+    rng = random.Random(seed)
+    fichiers = []
+    for i in range(n):
+        dossier = racine / f"projet{i % 10}" / f"partie{i % 37}" / f"lot{i % 5}"
+        dossier.mkdir(parents=True, exist_ok=True)
+        chemin = dossier / f"fichier{i}{rng.choice(EXTENSIONS)}"
+        chemin.write_bytes(rng.randbytes(rng.randint(512, 64 * 1024)))
+        fichiers.append(chemin)
+    # Dossiers ignorés : ne doivent pas être parcourus
+    for ignore in ("node_modules", ".git", "__pycache__"):
+        dossier = racine / "projet0" / ignore
+        dossier.mkdir(parents=True, exist_ok=True)
+        for i in range(n // 100):
+            (dossier / f"ignore{i}.js").write_bytes(b"x" * 100)
+    return fichiers
+
+
+def appliquer_changements(racine: Path, fichiers: list[Path], seed: int = 42) -> None:
+    rng = random.Random(seed)
+    restants = [f for f in fichiers if not f.is_relative_to(racine / "projet9")]
+    for chemin in rng.sample(restants, len(restants) // 20):
+        chemin.write_bytes(chemin.read_bytes() + b"modif")
+    for chemin in rng.sample(restants, len(restants) // 50):
+        chemin.unlink(missing_ok=True)
+    (racine / "projet9").rename(racine / "projet9_renomme")
+
+
+async def mesurer(n: int, budget: int | None) -> list[tuple[str, float, dict]]:
+    racine = Path(tempfile.mkdtemp(prefix="bench_scan_"))
+    try:
+        fichiers = generer_arborescence(racine / "arbre", n)
+        database.DB_PATH = racine / "atelier.db"
+        await database.init_db()
+        db = await database.get_db()
+        dossier_id = str(uuid.uuid4())
+        await db.execute(
+            "INSERT INTO dossiers_surveilles (id, chemin_absolu, nom) VALUES (?, ?, ?)",
+            (dossier_id, str(racine / "arbre"), "bench"),
+        )
+        await db.commit()
+
+        mesures = []
+        for etape in ("premier scan", "rescan", "après changements"):
+            if etape == "après changements":
+                appliquer_changements(racine / "arbre", fichiers)
+            start = time.perf_counter()
+            rapport = await scan_diff.scanner_dossier(dossier_id, budget_io=budget)
+            mesures.append((etape, (time.perf_counter() - start) * 1000, rapport))
+        await database.close_db()
+        return mesures
+    finally:
+        shutil.rmtree(racine, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tailles", type=int, nargs="+", default=TAILLES_DEFAUT)
+    parser.add_argument("--budget", type=int, default=scan_diff.HASH_BUDGET_IO,
+                        help="budget disque du hash en octets/s (0 = illimité)")
+    args = parser.parse_args()
+
+    print(f"threads de hash : {scan_diff.HASH_WORKERS}, budget : {args.budget or 'illimité'} o/s")
+    print(f"{'fichiers':>8} | {'étape':>18} | {'ms':>8} | {'parc.':>6} | {'hash':>6} | {'diff':>5} | "
+          f"{'écrit.':>6} | {'hashés':>6} | {'nouv.':>6} | {'modif.':>6} | {'suppr.':>6} | {'dépl.':>6} | {'inch.':>7}")
+    print("-" * 134)
+    for n in args.tailles:
+        for etape, ms, r in asyncio.run(mesurer(n, args.budget or None)):
+            d = r["durees_ms"]
+            print(f"{n:>8} | {etape:>18} | {ms:>8.0f} | {d['parcours']:>6} | {d['hash']:>6} | {d['diff']:>5} | "
+                  f"{d['ecriture']:>6} | {r['fichiers_haches']:>6} | "
+                  f"{r['fichiers_nouveaux']:>6} | {r['fichiers_modifies']:>6} | "
+                  f"{r['fichiers_supprimes']:>6} | {r['fichiers_deplaces']:>6} | {r['fichiers_inchanges']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Générateurs de graphes synthétiques à la forme des données de l'atelier.
+
+Un graphe est fait de plusieurs espaces de tailles inégales. À l'intérieur
+d'un espace, les liaisons suivent un attachement préférentiel : les degrés
+suivent une loi de puissance, avec quelques blocs pivots et beaucoup de blocs
+peu liés. Entre espaces, les liaisons sont rares. Les nœuds portent leur
+espace dans `Node.group`, comme dans reorganiser_global.
+
+Les liaisons portent un type et un poids comme en base ; s'y ajoutent des
+suggestions en attente tirées au hasard (bruit), au poids réduit que leur
+donne _edge_liaison.
+"""
+
+import random
+
+from services.force_layout import POIDS_EN_ATTENTE, Edge, Node
+
+# Types des liaisons internes, tirés avec ces fréquences relatives
+TYPES_INTERNES = {"simple": 4, "logique": 2, "prolongement": 2, "fondation": 1, "dependance": 1,
+                  "complementarite": 1, "application": 1}
+
+
+def _tailles_espaces(n: int, n_espaces: int, rng: random.Random) -> list[int]:
+    """Répartit n blocs en espaces de tailles inégales (loi de Pareto), 2 blocs minimum."""
+    poids = [rng.paretovariate(1.5) for _ in range(n_espaces)]
+    total = sum(poids)
+    tailles = [max(2, int(n * p / total)) for p in poids]
+    # Ajustement pour tomber exactement sur n
+    i = 0
+    while sum(tailles) != n:
+        k = i % n_espaces
+        if sum(tailles) < n:
+            tailles[k] += 1
+        elif tailles[k] > 2:
+            tailles[k] -= 1
+        i += 1
+    return tailles
+
+
+def _attachement_preferentiel(ids: list[str], liens_par_bloc: int, rng: random.Random) -> list[Edge]:
+    """Liaisons intra-espace : chaque nouveau bloc se lie à des blocs déjà liés."""
+    edges = []
+    # Chaque extrémité de liaison est répétée : tirer dans cette liste favorise les pivots
+    urne = [ids[0]]
+    for bloc in ids[1:]:
+        cibles = {rng.choice(urne) for _ in range(liens_par_bloc)}
+        for cible in sorted(cibles):
+            type_liaison = rng.choices(list(TYPES_INTERNES), weights=list(TYPES_INTERNES.values()))[0]
+            edges.append(Edge(source_id=bloc, target_id=cible, weight=rng.uniform(0.5, 1.0),
+                              type=type_liaison))
+            urne.append(cible)
+        urne.append(bloc)
+    return edges
+
+
+def generer_graphe_espaces(n: int, n_espaces: int = 8, liens_par_bloc: int = 2,
+                           ratio_inter: float = 0.05, ratio_bruit: float = 0.2,
+                           seed: int = 42) -> tuple[list[Node], list[Edge]]:
+    """Graphe de n blocs répartis en n_espaces, liaisons surtout internes aux espaces.
+
+    `ratio_inter` (liaisons inter-espaces) et `ratio_bruit` (suggestions en
+    attente entre blocs quelconques) sont rapportés au nombre de liaisons
+    internes.
+    """
+    rng = random.Random(seed)
+    n_espaces = max(1, min(n_espaces, n // 2))
+    nodes: list[Node] = []
+    edges: list[Edge] = []
+    espaces: list[list[str]] = []
+    for e, taille in enumerate(_tailles_espaces(n, n_espaces, rng)):
+        ids = [f"e{e}-b{i}" for i in range(taille)]
+        espaces.append(ids)
+        nodes.extend(
+            Node(id=bloc_id, x=0.0, y=0.0, w=rng.uniform(160, 260), h=rng.uniform(100, 180), group=f"e{e}")
+            for bloc_id in ids
+        )
+        edges.extend(_attachement_preferentiel(ids, liens_par_bloc, rng))
+
+    if n_espaces > 1:
+        for _ in range(int(len(edges) * ratio_inter)):
+            a, b = rng.sample(range(n_espaces), 2)
+            edges.append(Edge(source_id=rng.choice(espaces[a]), target_id=rng.choice(espaces[b]),
+                              type=rng.choice(["analogie", "complementarite", "exploration"])))
+
+    tous = [node.id for node in nodes]
+    for _ in range(int(len(edges) * ratio_bruit)):
+        a, b = rng.sample(tous, 2)
+        edges.append(Edge(source_id=a, target_id=b, weight=POIDS_EN_ATTENTE,
+                          type=rng.choice(["analogie", "exploration"])))
+    return nodes, edges
+
+
+def generer_graphe_aleatoire(n: int, seed: int = 42) -> tuple[list[Node], list[Edge]]:
+    """Graphe sans structure (un seul groupe, ~1,5 liaison par nœud), pour comparaison."""
+    rng = random.Random(seed)
+    nodes = [
+        Node(id=f"n{i}", x=0.0, y=0.0, w=rng.uniform(160, 260), h=rng.uniform(100, 180))
+        for i in range(n)
+    ]
+    edges = []
+    for _ in range(int(n * 1.5)):
+        a, b = rng.randrange(n), rng.randrange(n)
+        if a != b:
+            edges.append(Edge(source_id=f"n{a}", target_id=f"n{b}"))
+    return nodes, edges
+
+
+GENERATEURS = {
+    "espaces": generer_graphe_espaces,
+    "aleatoire": generer_graphe_aleatoire,
+}
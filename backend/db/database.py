@@ -45,6 +45,10 @@ async def init_db() -> None:
     # Migrations incrémentales
     await _migrate_contenus_bloc()
     await _migrate_v2_graphe_global()
+    await _migrate_blocs_epingle()
+    await _migrate_blocs_meta_graphe()
+    await _migrate_frequences_termes()
+    await _migrate_termes_blocs()
 
 
 # ═══════════════════════════════════════════════════════════════
@@ -184,6 +188,167 @@ async def _migrate_v2_graphe_global() -> None:
     print("[Migration V2] Migration graphe global terminée ✓")
 
 
+async def _migrate_blocs_epingle() -> None:
+    """Blocs épinglés : ignorés par la réorganisation automatique."""
+    db = await get_db()
+    if "epingle" not in await _get_columns("blocs"):
+        await db.execute("ALTER TABLE blocs ADD COLUMN epingle INTEGER DEFAULT 0")
+        await db.commit()
+        print("[Migration] Ajout colonne blocs.epingle")
+
+
+async def _migrate_blocs_meta_graphe() -> None:
+    """Méta-graphe : termes normalisés et signature MinHash de chaque bloc."""
+    db = await get_db()
+    existing = await _get_columns("blocs")
+    migrations = [
+        ("signature_minhash", "ALTER TABLE blocs ADD COLUMN signature_minhash BLOB"),
+        ("termes", "ALTER TABLE blocs ADD COLUMN termes TEXT"),
+        ("termes_updated_at", "ALTER TABLE blocs ADD COLUMN termes_updated_at DATETIME"),
+    ]
+    for col_name, sql in migrations:
+        if col_name not in existing:
+            await db.execute(sql)
+            print(f"[Migration] Ajout colonne blocs.{col_name}")
+    await db.commit()
+
+
+# Fréquences documentaires : chaque écriture de blocs.termes (JSON de termes
+# uniques) retire l'ancien ensemble et ajoute le nouveau
+TRIGGERS_FREQUENCES_TERMES = """
+CREATE TRIGGER IF NOT EXISTS frequences_termes_insert AFTER INSERT ON blocs
+WHEN NEW.termes IS NOT NULL
+BEGIN
+    INSERT INTO frequences_termes (terme, nb_blocs)
+        SELECT value, 1 FROM json_each(NEW.termes) WHERE true
+        ON CONFLICT(terme) DO UPDATE SET nb_blocs = nb_blocs + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS frequences_termes_update AFTER UPDATE OF termes ON blocs
+WHEN OLD.termes IS NOT NEW.termes
+BEGIN
+    UPDATE frequences_termes SET nb_blocs = nb_blocs - 1
+        WHERE terme IN (SELECT value FROM json_each(OLD.termes));
+    INSERT INTO frequences_termes (terme, nb_blocs)
+        SELECT value, 1 FROM json_each(NEW.termes) WHERE true
+        ON CONFLICT(terme) DO UPDATE SET nb_blocs = nb_blocs + 1;
+    DELETE FROM frequences_termes
+        WHERE nb_blocs <= 0 AND terme IN (SELECT value FROM json_each(OLD.termes));
+END;
+
+CREATE TRIGGER IF NOT EXISTS frequences_termes_delete AFTER DELETE ON blocs
+WHEN OLD.termes IS NOT NULL
+BEGIN
+    UPDATE frequences_termes SET nb_blocs = nb_blocs - 1
+        WHERE terme IN (SELECT value FROM json_each(OLD.termes));
+    DELETE FROM frequences_termes
+        WHERE nb_blocs <= 0 AND terme IN (SELECT value FROM json_each(OLD.termes));
+END;
+"""
+
+
+async def _migrate_frequences_termes() -> None:
+    """Méta-graphe : triggers des fréquences documentaires, table recalculée à leur création."""
+    db = await get_db()
+    rows = await db.execute_fetchall(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'frequences_termes_%'"
+    )
+    if len(rows) == 3:
+        return
+    await db.executescript(TRIGGERS_FREQUENCES_TERMES)
+    await db.execute("DELETE FROM frequences_termes")
+    await db.execute(
+        """INSERT INTO frequences_termes (terme, nb_blocs)
+           SELECT t.value, COUNT(*) FROM blocs b, json_each(b.termes) t GROUP BY t.value"""
+    )
+    await db.commit()
+    print("[Migration] Fréquences des termes : triggers installés, table recalculée")
+
+
+TRIGGERS_TERMES_BLOCS = """
+CREATE TRIGGER IF NOT EXISTS termes_blocs_insert AFTER INSERT ON blocs
+WHEN NEW.termes IS NOT NULL
+BEGIN
+    INSERT OR IGNORE INTO termes_blocs (terme, bloc_id)
+        SELECT value, NEW.id FROM json_each(NEW.termes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS termes_blocs_update AFTER UPDATE OF termes ON blocs
+WHEN OLD.termes IS NOT NEW.termes
+BEGIN
+    DELETE FROM termes_blocs WHERE bloc_id = OLD.id;
+    INSERT OR IGNORE INTO termes_blocs (terme, bloc_id)
+        SELECT value, NEW.id FROM json_each(NEW.termes);
+END;
+"""
+
+
+async def _migrate_termes_blocs() -> None:
+    """Méta-graphe : triggers de l'index terme → blocs, table recalculée à leur création.
+
+    La suppression d'un bloc efface ses lignes (ON DELETE CASCADE).
+    """
+    db = await get_db()
+    rows = await db.execute_fetchall(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'termes_blocs_%'"
+    )
+    if len(rows) == 2:
+        return
+    await db.executescript(TRIGGERS_TERMES_BLOCS)
+    await db.execute("DELETE FROM termes_blocs")
+    await db.execute(
+        """INSERT OR IGNORE INTO termes_blocs (terme, bloc_id)
+           SELECT t.value, b.id FROM blocs b, json_each(b.termes) t"""
+    )
+    await db.commit()
+    print("[Migration] Index terme → blocs : triggers installés, table recalculée")
+
+
+# ═══════════════════════════════════════════════════════════════
+# ÉCRITURES GROUPÉES
+# ═══════════════════════════════════════════════════════════════
+
+# Lignes par appel executemany : un aller-retour vers le thread aiosqlite par
+# lot, la boucle d'événements reprend la main entre deux lots
+TAILLE_LOT_POSITIONS = 500
+
+
+async def ecrire_positions(positions: list[tuple[str, float, float]], globales: bool = False) -> None:
+    """Met à jour les coordonnées de nombreux blocs par lots (executemany).
+
+    `positions` : (bloc_id, x, y), arrondis au dixième. `globales` écrit
+    x_global / y_global au lieu de x / y. updated_at n'est pas touché : un
+    layout n'est pas une modification du bloc (sa date est tenue dans la
+    table dispositions), sinon tous les blocs paraîtraient modifiés au
+    layout suivant et le mode incrémental ne servirait jamais.
+
+    Tous les lots partagent la transaction courante : l'appelant valide
+    (commit) après ses éventuelles écritures liées. En cas d'erreur, aucune
+    position n'est écrite : seul le point de sauvegarde des lots est annulé,
+    les écritures non validées des autres coroutines (connexion partagée)
+    restent dans la transaction.
+    """
+    db = await get_db()
+    col_x, col_y = ("x_global", "y_global") if globales else ("x", "y")
+    sql = f"UPDATE blocs SET {col_x} = ?, {col_y} = ? WHERE id = ?"
+    # Hors transaction, RELEASE validerait aussitôt : le point de sauvegarde
+    # est toujours pris dans une transaction, que l'appelant valide
+    if not db.in_transaction:
+        await db.execute("BEGIN")
+    await db.execute("SAVEPOINT ecrire_positions")
+    try:
+        for debut in range(0, len(positions), TAILLE_LOT_POSITIONS):
+            await db.executemany(sql, [
+                (round(x, 1), round(y, 1), bloc_id)
+                for bloc_id, x, y in positions[debut:debut + TAILLE_LOT_POSITIONS]
+            ])
+    except Exception:
+        await db.execute("ROLLBACK TO ecrire_positions")
+        await db.execute("RELEASE ecrire_positions")
+        raise
+    await db.execute("RELEASE ecrire_positions")
+
+
 # ═══════════════════════════════════════════════════════════════
 # FERMETURE
 # ═══════════════════════════════════════════════════════════════
@@ -21,10 +21,14 @@ CREATE TABLE IF NOT EXISTS blocs (
     couleur TEXT NOT NULL CHECK(couleur IN ('green','orange','yellow','blue','violet','mauve')),
     largeur REAL DEFAULT 200,
     hauteur REAL DEFAULT 120,
+    epingle INTEGER DEFAULT 0,    -- bloc épinglé : immobile lors des réorganisations
     titre_ia TEXT,
     resume_ia TEXT,
     entites TEXT,
     mots_cles TEXT,
+    termes TEXT,                  -- termes normalisés, JSON trié (meta_graphe), NULL = à calculer
+    termes_updated_at DATETIME,   -- date d'écriture de `termes` (passages incrémentaux du méta-graphe)
+    signature_minhash BLOB,       -- signature MinHash des termes (meta_graphe), NULL si aucun terme
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
 );
@@ -124,6 +128,56 @@ CREATE TABLE IF NOT EXISTS journal_scan (
     details TEXT                          -- JSON rapport détaillé
 );
 
+-- Dernière disposition force-directed par cible (layout incrémental). Les
+-- positions écrites par un layout ne touchent pas blocs.updated_at : seules
+-- les modifications réelles comptent pour le mode incrémental
+CREATE TABLE IF NOT EXISTS dispositions (
+    cle TEXT PRIMARY KEY,                 -- 'espace:<id>', 'global', 'global:par_espace'
+    derniere_disposition DATETIME NOT NULL
+);
+
+-- Dernier passage des suggestions inter-espaces : seuls les blocs dont les
+-- termes ont changé depuis sont réévalués
+CREATE TABLE IF NOT EXISTS passages_meta_graphe (
+    cle TEXT PRIMARY KEY,                 -- 'suggestions'
+    dernier_passage DATETIME NOT NULL     -- plus grand blocs.termes_updated_at traité
+);
+
+-- Fréquences documentaires des termes (pondération TF-IDF du méta-graphe) :
+-- nombre de blocs dont `termes` contient le terme, tenu à jour par les
+-- triggers frequences_termes_* (cf. database._migrate_frequences_termes)
+CREATE TABLE IF NOT EXISTS frequences_termes (
+    terme TEXT PRIMARY KEY,
+    nb_blocs INTEGER NOT NULL
+) WITHOUT ROWID;
+
+-- Index inversé terme → blocs du méta-graphe (voisins d'un bloc sans décoder
+-- les termes de tous les blocs), tenu à jour par les triggers termes_blocs_*
+-- (cf. database._migrate_termes_blocs)
+CREATE TABLE IF NOT EXISTS termes_blocs (
+    terme TEXT NOT NULL,
+    bloc_id TEXT NOT NULL REFERENCES blocs(id) ON DELETE CASCADE,
+    PRIMARY KEY (terme, bloc_id)
+) WITHOUT ROWID;
+
+-- Paires inter-espaces évaluées sous le seuil de suggestion : pas réévaluées
+-- tant que les termes des deux blocs sont les mêmes (cf. meta_graphe)
+CREATE TABLE IF NOT EXISTS paires_evaluees (
+    bloc_a_id TEXT NOT NULL REFERENCES blocs(id) ON DELETE CASCADE,  -- bloc_a_id < bloc_b_id
+    bloc_b_id TEXT NOT NULL REFERENCES blocs(id) ON DELETE CASCADE,
+    version INTEGER NOT NULL,             -- versions des termes des deux blocs, cf. meta_graphe._version_paire
+    PRIMARY KEY (bloc_a_id, bloc_b_id)
+) WITHOUT ROWID;
+
+-- Cache des layouts : dernières positions calculées par cible, valables tant
+-- que l'empreinte du graphe (blocs, tailles, liaisons, paramètres) est la même
+CREATE TABLE IF NOT EXISTS cache_layouts (
+    cle TEXT PRIMARY KEY,                 -- 'espace:<id>' | 'global'
+    empreinte TEXT NOT NULL,              -- SHA-256, cf. force_layout.empreinte_graphe
+    positions TEXT NOT NULL,              -- JSON {bloc_id: [x, y]}
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
 -- ═══════════════════════════════════════════════════════
 -- INDEX
 -- ═══════════════════════════════════════════════════════
@@ -140,3 +194,5 @@ CREATE INDEX IF NOT EXISTS idx_fichiers_dossier ON fichiers_indexes(dossier_id);
 CREATE INDEX IF NOT EXISTS idx_fichiers_statut ON fichiers_indexes(statut);
 CREATE INDEX IF NOT EXISTS idx_dossiers_chemin ON dossiers_surveilles(chemin_absolu);
 CREATE INDEX IF NOT EXISTS idx_journal_dossier ON journal_scan(dossier_id);
+CREATE INDEX IF NOT EXISTS idx_paires_evaluees_b ON paires_evaluees(bloc_b_id);
+CREATE INDEX IF NOT EXISTS idx_termes_blocs_bloc ON termes_blocs(bloc_id);
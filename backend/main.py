@@ -10,6 +10,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from api import espaces, blocs, liaisons, config_ia, ia, upload, filesystem, graphe_global
 from db.database import init_db, close_db, seed_db
+from services.layout_executor import arreter_layout_executor
 
 # Charger .env depuis la racine du projet
 _env_path = Path(__file__).resolve().parent.parent / ".env"
@@ -28,6 +29,7 @@ async def lifespan(app: FastAPI):
     await init_db()
     await seed_db()
     yield
+    arreter_layout_executor()
     await close_db()
 
 
@@ -7,6 +7,15 @@ Simule un système de forces physiques pour positionner les blocs naturellement
 - Amortissement progressif pour convergence
 
 Inspiré des algorithmes de Fruchterman-Reingold et d3-force.
+Moteurs disponibles (ForceParams.engine) :
+- "exact"      : toutes les paires, O(n²) par itération
+- "barnes_hut" : quadtree + critère θ, O(n log n) par itération
+- "numpy"      : calcul exact vectorisé sur des tableaux contigus
+- "auto"       : numpy si installé (jusqu'à quelques milliers de nœuds),
+                 sinon barnes_hut pour les grands graphes, exact pour les petits
+Mode multiniveau (ForceParams.multilevel) pour les grands graphes : le graphe
+est contracté (appariement de liaisons, puis un super-nœud par groupe/espace),
+le graphe grossier est disposé, puis chaque niveau est prolongé et affiné.
 Le résultat est une disposition organique où :
 - Les nœuds très connectés se retrouvent au centre
 - Les clusters émergent naturellement par affinité
@@ -14,12 +23,23 @@ Le résultat est une disposition organique où :
 - Aucune intersection forcée
 """
 
+import asyncio
+import hashlib
+import json
 import math
 import random
-from dataclasses import dataclass, field
+import time
+from collections.abc import Callable
+from dataclasses import asdict, astuple, dataclass, field, replace
 from datetime import datetime, timezone
+from functools import partial
 
-from db.database import get_db
+from db.database import ecrire_positions, get_db
+
+try:
+    import numpy as np
+except ImportError:  # moteur "numpy" indisponible → repli sur les moteurs Python
+    np = None
 
 
 @dataclass
@@ -33,18 +53,81 @@ class Node:
     vy: float = 0.0
     # Nombre de liaisons (pour pondérer la gravité)
     degree: int = 0
+    # Nœud immobile : exerce des forces mais ne bouge pas
+    fixed: bool = False
+    # Position de rappel élastique (nœud ancré), cf. ForceParams.anchor_strength
+    anchor: tuple[float, float] | None = None
+    # Groupe d'appartenance (espace) pour la contraction multiniveau
+    group: str | None = None
 
 
 @dataclass
 class Edge:
     source_id: str
     target_id: str
+    # Raideur relative du ressort (1.0 = ForceParams.attraction_strength)
+    weight: float = 1.0
+    # Type de liaison : raideur et longueur idéale propres, cf. ForceParams.link_types
+    type: str = "simple"
+
+
+@dataclass
+class IterationInfo:
+    """État transmis au callback `on_iteration` après chaque itération."""
+    iteration: int
+    iterations_max: int
+    temperature: float
+    # Énergie cinétique totale (somme des vitesses au carré, avant bornage
+    # par la température : mesure le déséquilibre réel des forces)
+    energy: float
+    # Instantané des positions (listes x, y dans l'ordre des nœuds), calculé à la demande
+    positions: Callable[[], tuple[list[float], list[float]]]
+
+
+# Callback d'itération : retourner True interrompt la simulation
+IterationCallback = Callable[[IterationInfo], bool | None]
+
+
+@dataclass
+class LayoutStats:
+    """Bilan d'une simulation, rempli par simulate_forces (paramètre `stats`)."""
+    iterations: int = 0
+    # Énergie cinétique totale et plus grand déplacement à la dernière itération
+    energy: float = 0.0
+    max_displacement: float = 0.0
+    # True si l'arrêt vient du critère de convergence (et non du budget ou du froid)
+    converged: bool = False
+    # Cause de l'arrêt : "energie" (énergie par nœud sous son seuil), "derive"
+    # (positions figées d'une fenêtre à l'autre, l'énergie pouvant rester
+    # élevée), "temperature", "iterations" (budget épuisé) ou "interruption"
+    arret: str = ""
+    # Paires de blocs qui se chevauchaient en fin de simulation (corrigées ensuite)
+    overlaps: int = 0
 
 
 # ═══════════════════════════════════════════════════════════
 #  PARAMÈTRES DE SIMULATION
 # ═══════════════════════════════════════════════════════════
 
+# Par type de liaison : (raideur, longueur idéale), relatives à
+# attraction_strength et ideal_link_distance. Les liaisons structurantes
+# (fondation, dépendance…) tirent fort et court, les rapprochements lâches
+# (analogie, exploration) tirent peu et laissent de la distance.
+TYPES_LIAISON: dict[str, tuple[float, float]] = {
+    "simple": (1.0, 1.0),
+    "logique": (1.2, 0.9),
+    "tension": (0.6, 1.3),
+    "ancree": (1.5, 0.7),
+    "prolongement": (1.3, 0.8),
+    "fondation": (1.5, 0.7),
+    "complementarite": (1.1, 0.9),
+    "application": (1.0, 1.0),
+    "analogie": (0.6, 1.2),
+    "dependance": (1.3, 0.8),
+    "exploration": (0.4, 1.3),
+}
+
+
 @dataclass
 class ForceParams:
     # Répulsion entre nœuds (force de Coulomb)
@@ -54,6 +137,9 @@ class ForceParams:
     # Attraction des liaisons (ressort de Hooke)
     attraction_strength: float = 0.005
     ideal_link_distance: float = 450.0
+    # Facteurs par type de liaison (type absent = (1.0, 1.0)) ; la raideur est
+    # en plus multipliée par Edge.weight
+    link_types: dict[str, tuple[float, float]] = field(default_factory=lambda: dict(TYPES_LIAISON))
 
     # Marge minimale entre blocs (en plus de leur taille)
     overlap_padding: float = 40.0
@@ -70,19 +156,76 @@ class ForceParams:
     min_temperature: float = 0.5        # Seuil d'arrêt
     velocity_damping: float = 0.85      # Amortissement de vitesse
 
+    # Convergence, évaluée par fenêtres de `convergence_window` itérations
+    # (0 = désactivée) : arrêt anticipé si l'énergie par nœud libre est restée
+    # sous son seuil, ou si aucun nœud n'a dérivé de plus de
+    # `convergence_displacement` px par itération en moyenne sur la fenêtre
+    # (les nœuds ne font plus qu'osciller sur place)
+    convergence_window: int = 10
+    convergence_energy: float = 0.25        # px² par itération²
+    convergence_displacement: float = 0.5   # px par itération
+
+    # Refroidissement adaptatif (Hu) en plus du refroidissement géométrique :
+    # pas réduit dès que l'énergie remonte, relâché après quelques baisses d'affilée
+    adaptive_cooling: bool = True
+    adaptive_step_ratio: float = 0.97
+    adaptive_progress_steps: int = 5
+
     # Limites spatiales
     min_x: float = 50.0
     min_y: float = 50.0
     max_x: float = 3000.0
     max_y: float = 2400.0
 
+    # Graine du semis initial et des tirages aléatoires (None = non reproductible)
+    seed: int | None = None
+
+    # Moteur : "auto", "exact" (O(n²)), "barnes_hut" (O(n log n)) ou "numpy"
+    engine: str = "auto"
+    # Critère d'ouverture Barnes-Hut : plus θ est petit, plus c'est précis
+    theta: float = 0.8
+
+    # Démarrage à chaud : positions actuelles conservées (pas de semis initial)
+    warm_start: bool = False
+    # Rappel des nœuds ancrés vers leur position d'origine
+    anchor_strength: float = 0.15
+
+    # Layout incrémental : voisinage simulé (en sauts) et budget réduit
+    incremental_hops: int = 1
+    incremental_iterations: int = 60
+    incremental_temperature: float = 40.0
+
+    # Multiniveau : contraction "espace" (appariement dans chaque groupe puis
+    # un super-nœud par groupe) ou "matching" (appariement seul)
+    multilevel: bool = False
+    multilevel_coarsening: str = "espace"
+    multilevel_min_nodes: int = 30          # Arrêt de la contraction
+    multilevel_refine_iterations: int = 80  # Budget par niveau d'affinage
+    multilevel_refine_temperature: float = 80.0
+
+    # Suppression des chevauchements après la simulation : écart garanti entre
+    # rectangles, et nombre de passes de séparation avant le balayage final
+    remove_overlaps: bool = True
+    overlap_gap: float = 10.0
+    overlap_rounds: int = 20
+
 
 # ═══════════════════════════════════════════════════════════
 #  SIMULATION
 # ═══════════════════════════════════════════════════════════
 
-def _apply_repulsion(nodes: list[Node], params: ForceParams):
-    """Force de répulsion entre toutes les paires de nœuds."""
+def _apply_repulsion(nodes: list[Node], params: ForceParams, free: list[Node] | None = None,
+                     fixes: list[tuple[float, float, float, float]] | None = None):
+    """Force de répulsion entre toutes les paires de nœuds.
+
+    Si `free` est fourni (présence de nœuds fixes), seules les forces subies
+    par ces nœuds sont calculées : O(|free| × n) au lieu de O(n²). `fixes` :
+    cf. _apply_repulsion_free.
+    """
+    if free is not None:
+        _apply_repulsion_free(nodes, free, params, fixes)
+        return
+
     n = len(nodes)
     for i in range(n):
         for j in range(i + 1, n):
@@ -116,21 +259,254 @@ def _apply_repulsion(nodes: list[Node], params: ForceParams):
             b.vy += fy
 
 
-def _apply_attraction(nodes: list[Node], edges: list[Edge], node_map: dict[str, Node], params: ForceParams):
-    """Force d'attraction entre nœuds liés (ressort de Hooke)."""
+def _emballer(nodes: list[Node], params: ForceParams) -> list[tuple[float, float, float, float]]:
+    """(x, y, demi-largeur + marge, demi-hauteur + marge) de chaque nœud."""
+    padding = params.overlap_padding
+    return [(node.x, node.y, node.w / 2 + padding, node.h / 2 + padding) for node in nodes]
+
+
+def _apply_repulsion_free(nodes: list[Node], free: list[Node], params: ForceParams,
+                          fixes: list[tuple[float, float, float, float]] | None = None):
+    """Répulsion subie par les seuls nœuds `free`, de la part de tous.
+
+    `fixes` : nœuds fixes emballés (cf. _emballer), préparés une fois pour
+    toute la simulation puisqu'ils ne bougent pas ; seuls les nœuds libres
+    sont relus à chaque itération. Leur force dépend de la position des
+    nœuds libres et se recalcule, elle, à chaque fois.
+    """
+    if fixes is None:
+        fixes = _emballer([node for node in nodes if node.fixed], params)
+    libres = _emballer(free, params)
+    strength = params.repulsion_strength
+    min_distance = params.repulsion_min_distance
+    for a in free:
+        ax, ay = a.x, a.y
+        demi_w, demi_h = a.w / 2, a.h / 2
+        fx_total = 0.0
+        fy_total = 0.0
+        for autres in (fixes, libres):
+            # La paire (a, a) a nx = ny = 0 : aucune contribution
+            for bx, by, bw, bh in autres:
+                dx = bx - ax
+                dy = by - ay
+                center_dist = max(math.sqrt(dx * dx + dy * dy), 1.0)
+                nx = dx / center_dist
+                ny = dy / center_dist
+                min_sep_x = (demi_w + bw) * nx
+                min_sep_y = (demi_h + bh) * ny
+                min_sep = math.sqrt(min_sep_x * min_sep_x + min_sep_y * min_sep_y)
+                effective_dist = max(center_dist - min_sep, min_distance)
+                force = strength / (effective_dist * effective_dist)
+                if center_dist < min_sep:
+                    force += strength * (1.0 - center_dist / min_sep) * 2.0
+                fx_total += nx * force
+                fy_total += ny * force
+        a.vx -= fx_total
+        a.vy -= fy_total
+
+
+# ── Barnes-Hut ─────────────────────────────────────────
+# Les nœuds sont rangés dans un quadtree ; une cellule suffisamment éloignée
+# (taille / distance < θ) agit comme un pseudo-nœud unique placé en son centre
+# de masse, avec la taille moyenne des blocs qu'elle contient.
+
+_QUADTREE_MAX_DEPTH = 16
+
+
+class _QuadCell:
+    __slots__ = ("x0", "y0", "size", "mass", "mx", "my", "sw", "sh", "nodes", "children")
+
+    def __init__(self, x0: float, y0: float, size: float):
+        self.x0 = x0
+        self.y0 = y0
+        self.size = size
+        self.mass = 0
+        # Sommes pendant la construction, moyennes après _finaliser_quadtree
+        self.mx = 0.0
+        self.my = 0.0
+        self.sw = 0.0
+        self.sh = 0.0
+        self.nodes: list[Node] | None = None
+        self.children: list["_QuadCell | None"] | None = None
+
+
+def _quad_child(cell: _QuadCell, node: Node) -> _QuadCell:
+    half = cell.size / 2
+    right = node.x >= cell.x0 + half
+    bottom = node.y >= cell.y0 + half
+    index = (2 if bottom else 0) + (1 if right else 0)
+    child = cell.children[index]
+    if child is None:
+        child = _QuadCell(
+            cell.x0 + (half if right else 0.0),
+            cell.y0 + (half if bottom else 0.0),
+            half,
+        )
+        cell.children[index] = child
+    return child
+
+
+def _quad_insert(cell: _QuadCell, node: Node, depth: int):
+    cell.mass += 1
+    cell.mx += node.x
+    cell.my += node.y
+    cell.sw += node.w
+    cell.sh += node.h
+
+    if cell.children is None:
+        if not cell.nodes:
+            cell.nodes = [node]
+            return
+        if depth >= _QUADTREE_MAX_DEPTH:
+            # Nœuds (quasi) superposés : feuille multiple
+            cell.nodes.append(node)
+            return
+        existing = cell.nodes
+        cell.nodes = None
+        cell.children = [None, None, None, None]
+        for other in existing:
+            _quad_insert(_quad_child(cell, other), other, depth + 1)
+
+    _quad_insert(_quad_child(cell, node), node, depth + 1)
+
+
+def _build_quadtree(nodes: list[Node]) -> _QuadCell:
+    """Construit le quadtree des nœuds et calcule les centres de masse."""
+    min_x = min(node.x for node in nodes)
+    min_y = min(node.y for node in nodes)
+    size = max(
+        max(node.x for node in nodes) - min_x,
+        max(node.y for node in nodes) - min_y,
+    ) + 1.0
+
+    root = _QuadCell(min_x, min_y, size)
+    for node in nodes:
+        _quad_insert(root, node, 0)
+
+    stack = [root]
+    while stack:
+        cell = stack.pop()
+        cell.mx /= cell.mass
+        cell.my /= cell.mass
+        cell.sw /= cell.mass
+        cell.sh /= cell.mass
+        if cell.children is not None:
+            stack.extend(c for c in cell.children if c is not None)
+    return root
+
+
+def _apply_repulsion_barnes_hut(nodes: list[Node], params: ForceParams, free: list[Node] | None = None,
+                                fixed_root: _QuadCell | None = None):
+    """Force de répulsion approchée par quadtree (Barnes-Hut), O(n log n).
+
+    `fixed_root` : quadtree des nœuds fixes, construit une fois pour toute la
+    simulation (ils ne bougent pas). Seul l'arbre des nœuds libres est alors
+    reconstruit à chaque itération, et chaque nœud libre parcourt les deux.
+    """
+    if len(nodes) < 2:
+        return
+
+    if fixed_root is not None:
+        roots = [_build_quadtree(free), fixed_root]
+    else:
+        roots = [_build_quadtree(nodes)]
+    theta2 = params.theta * params.theta
+    strength = params.repulsion_strength
+    padding = params.overlap_padding
+    min_distance = params.repulsion_min_distance
+
+    for a in (free if free is not None else nodes):
+        fx_total = 0.0
+        fy_total = 0.0
+        stack = list(roots)
+        while stack:
+            cell = stack.pop()
+
+            if cell.nodes is not None:
+                # Feuille : interaction exacte (même formule que _apply_repulsion)
+                for b in cell.nodes:
+                    if b is a:
+                        continue
+                    dx = b.x - a.x
+                    dy = b.y - a.y
+                    center_dist = max(math.sqrt(dx * dx + dy * dy), 1.0)
+                    nx = dx / center_dist
+                    ny = dy / center_dist
+                    min_sep_x = (a.w + b.w) / 2 + padding
+                    min_sep_y = (a.h + b.h) / 2 + padding
+                    min_sep = math.sqrt((min_sep_x * nx) ** 2 + (min_sep_y * ny) ** 2)
+                    effective_dist = max(center_dist - min_sep, min_distance)
+                    force = strength / (effective_dist * effective_dist)
+                    if center_dist < min_sep:
+                        force += strength * (1.0 - center_dist / min_sep) * 2.0
+                    fx_total += nx * force
+                    fy_total += ny * force
+                continue
+
+            dx = cell.mx - a.x
+            dy = cell.my - a.y
+            d2 = dx * dx + dy * dy
+            if cell.size * cell.size < theta2 * d2:
+                dist = math.sqrt(d2)
+                nx = dx / dist
+                ny = dy / dist
+                min_sep_x = (a.w + cell.sw) / 2 + padding
+                min_sep_y = (a.h + cell.sh) / 2 + padding
+                min_sep = math.sqrt((min_sep_x * nx) ** 2 + (min_sep_y * ny) ** 2)
+                # Une cellule proche peut contenir des blocs qui chevauchent `a` :
+                # on ne l'approxime que si aucun chevauchement n'est possible.
+                if dist - cell.size > min_sep:
+                    effective_dist = max(dist - min_sep, min_distance)
+                    force = strength * cell.mass / (effective_dist * effective_dist)
+                    fx_total += nx * force
+                    fy_total += ny * force
+                    continue
+
+            stack.extend(c for c in cell.children if c is not None)
+
+        a.vx -= fx_total
+        a.vy -= fy_total
+
+
+_REPULSION_ENGINES = {
+    "exact": _apply_repulsion,
+    "barnes_hut": _apply_repulsion_barnes_hut,
+}
+
+# Mode "auto" : sans NumPy, taille à partir de laquelle Barnes-Hut devient rentable ;
+# avec NumPy, taille au-delà de laquelle le O(n²) vectorisé perd face à Barnes-Hut
+_BARNES_HUT_AUTO_MIN = 300
+_NUMPY_AUTO_MAX = 8000
+
+
+def _ressort(edge: Edge, params: ForceParams) -> tuple[float, float]:
+    """Raideur et longueur idéale d'une liaison, selon son poids et son type."""
+    raideur, longueur = params.link_types.get(edge.type, (1.0, 1.0))
+    return params.attraction_strength * edge.weight * raideur, params.ideal_link_distance * longueur
+
+
+def _ressorts(edges: list[Edge], node_map: dict[str, Node],
+              params: ForceParams) -> list[tuple[Node, Node, float, float]]:
+    """Liaisons résolues une fois pour toute la simulation : (a, b, raideur, longueur)."""
+    ressorts = []
     for edge in edges:
         a = node_map.get(edge.source_id)
         b = node_map.get(edge.target_id)
-        if not a or not b:
-            continue
+        if a and b:
+            ressorts.append((a, b, *_ressort(edge, params)))
+    return ressorts
+
 
+def _apply_attraction(ressorts: list[tuple[Node, Node, float, float]]):
+    """Force d'attraction entre nœuds liés (ressort de Hooke), cf. _ressorts."""
+    for a, b, raideur, longueur in ressorts:
         dx = b.x - a.x
         dy = b.y - a.y
         dist = math.sqrt(dx * dx + dy * dy)
         dist = max(dist, 1.0)
 
-        displacement = dist - params.ideal_link_distance
-        force = params.attraction_strength * displacement
+        displacement = dist - longueur
+        force = raideur * displacement
 
         fx = (dx / dist) * force
         fy = (dy / dist) * force
@@ -151,13 +527,30 @@ def _apply_gravity(nodes: list[Node], params: ForceParams):
         node.vy += dy * params.gravity_strength * weight
 
 
-def _apply_velocity(nodes: list[Node], temperature: float, params: ForceParams):
-    """Applique les vitesses aux positions avec amortissement et limites."""
+def _apply_anchors(nodes: list[Node], params: ForceParams):
+    """Rappel élastique des nœuds ancrés vers leur position d'origine."""
     for node in nodes:
+        ax, ay = node.anchor
+        node.vx += (ax - node.x) * params.anchor_strength
+        node.vy += (ay - node.y) * params.anchor_strength
+
+
+def _apply_velocity(nodes: list[Node], temperature: float, params: ForceParams) -> tuple[float, float]:
+    """Applique les vitesses aux positions avec amortissement et limites.
+
+    Retourne l'énergie cinétique (avant bornage par la température) et le
+    plus grand déplacement effectif (après limites).
+    """
+    energy = 0.0
+    max_displacement = 0.0
+    for node in nodes:
+        old_x, old_y = node.x, node.y
         node.vx *= params.velocity_damping
         node.vy *= params.velocity_damping
 
-        speed = math.sqrt(node.vx * node.vx + node.vy * node.vy)
+        speed2 = node.vx * node.vx + node.vy * node.vy
+        energy += speed2
+        speed = math.sqrt(speed2)
         if speed > temperature:
             node.vx = (node.vx / speed) * temperature
             node.vy = (node.vy / speed) * temperature
@@ -168,9 +561,570 @@ def _apply_velocity(nodes: list[Node], temperature: float, params: ForceParams):
         node.x = max(params.min_x, min(params.max_x, node.x))
         node.y = max(params.min_y, min(params.max_y, node.y))
 
+        displacement = math.hypot(node.x - old_x, node.y - old_y)
+        if displacement > max_displacement:
+            max_displacement = displacement
+    return energy, max_displacement
+
 
-def simulate_forces(nodes: list[Node], edges: list[Edge], params: ForceParams | None = None) -> list[Node]:
-    """Lance la simulation force-directed. Retourne les nœuds avec positions finales."""
+class _Refroidissement:
+    """Température de la simulation et détection de convergence.
+
+    Refroidissement géométrique (cooling_factor) corrigé à la Hu : le pas est
+    multiplié par adaptive_step_ratio quand l'énergie ne baisse pas, divisé
+    par ce ratio après adaptive_progress_steps baisses consécutives (sans
+    dépasser la température initiale).
+
+    Le déplacement par itération est borné par la température : des nœuds
+    qui oscillent autour de leur équilibre bougent encore à chaque pas. La
+    convergence compare donc les positions d'une fenêtre à l'autre.
+    """
+
+    def __init__(self, params: ForceParams, n_free: int):
+        self.params = params
+        self.n_free = max(1, n_free)
+        self.temperature = params.initial_temperature
+        self.energy = math.inf
+        self.progress = 0
+        self.iteration = 0
+        self.equilibre = True
+        self.snapshot: tuple | None = None
+        # Critère qui a déclaré la convergence : "energie" ou "derive"
+        self.critere = ""
+
+    def update(self, energy: float, positions: Callable[[], tuple]) -> bool:
+        """Refroidit après une itération ; retourne True si la disposition a convergé.
+
+        `positions` retourne les listes x, y des nœuds (lue en fin de fenêtre).
+        """
+        params = self.params
+        self.temperature *= params.cooling_factor
+        if params.adaptive_cooling:
+            if energy < self.energy:
+                self.progress += 1
+                if self.progress >= params.adaptive_progress_steps:
+                    self.progress = 0
+                    self.temperature = min(params.initial_temperature,
+                                           self.temperature / params.adaptive_step_ratio)
+            else:
+                self.progress = 0
+                self.temperature *= params.adaptive_step_ratio
+        self.energy = energy
+
+        window = params.convergence_window
+        if window <= 0:
+            return False
+        self.iteration += 1
+        if energy / self.n_free >= params.convergence_energy:
+            self.equilibre = False
+        if self.iteration % window:
+            return False
+
+        xs, ys = positions()
+        converged = False
+        if self.snapshot is not None:
+            old_xs, old_ys = self.snapshot
+            drift = max(math.hypot(x - ox, y - oy) for x, y, ox, oy in zip(xs, ys, old_xs, old_ys))
+            if self.equilibre:
+                self.critere = "energie"
+            elif drift < params.convergence_displacement * window:
+                self.critere = "derive"
+            converged = bool(self.critere)
+        self.snapshot = (xs, ys)
+        self.equilibre = True
+        return converged
+
+
+def _simulate_python(nodes: list[Node], edges: list[Edge], node_map: dict[str, Node],
+                     params: ForceParams, apply_repulsion, stats: LayoutStats,
+                     on_iteration: IterationCallback | None = None):
+    """Boucle de simulation sur les objets Node (moteurs exact et barnes_hut)."""
+    free = [node for node in nodes if not node.fixed]
+    anchored = [node for node in free if node.anchor is not None]
+    # Sans nœud fixe, la répulsion exacte garde sa boucle symétrique
+    free_subset = free if len(free) < len(nodes) else None
+    # Nœuds fixes préparés une fois : quadtree (Barnes-Hut) ou tuples (exact)
+    if free_subset is not None and apply_repulsion is _apply_repulsion_barnes_hut:
+        fixed_root = _build_quadtree([node for node in nodes if node.fixed])
+        apply_repulsion = partial(_apply_repulsion_barnes_hut, fixed_root=fixed_root)
+    elif free_subset is not None and apply_repulsion is _apply_repulsion:
+        fixes = _emballer([node for node in nodes if node.fixed], params)
+        apply_repulsion = partial(_apply_repulsion, fixes=fixes)
+    ressorts = _ressorts(edges, node_map, params)
+    cooling = _Refroidissement(params, len(free))
+
+    stats.arret = "iterations"
+    for iteration in range(params.iterations):
+        if cooling.temperature < params.min_temperature:
+            stats.arret = "temperature"
+            break
+
+        apply_repulsion(nodes, params, free_subset)
+        _apply_attraction(ressorts)
+        _apply_gravity(free, params)
+        _apply_anchors(anchored, params)
+        energy, max_displacement = _apply_velocity(free, cooling.temperature, params)
+
+        converged = cooling.update(energy, lambda: ([node.x for node in free], [node.y for node in free]))
+        stats.iterations = iteration + 1
+        stats.energy = energy
+        stats.max_displacement = max_displacement
+        stats.converged = converged
+
+        if on_iteration:
+            info = IterationInfo(
+                iteration=iteration + 1,
+                iterations_max=params.iterations,
+                temperature=cooling.temperature,
+                energy=energy,
+                positions=lambda: ([node.x for node in nodes], [node.y for node in nodes]),
+            )
+            if on_iteration(info):
+                stats.arret = "interruption"
+                break
+        if converged:
+            stats.arret = cooling.critere
+            break
+
+
+# ═══════════════════════════════════════════════════════════
+#  MOTEUR NUMPY
+# ═══════════════════════════════════════════════════════════
+# Mêmes forces que les moteurs Python, calculées par lots sur des tableaux
+# contigus (positions, vitesses, tailles, degrés). La répulsion reste exacte
+# mais est évaluée par blocs de lignes pour borner la mémoire à O(bloc × n).
+
+# Nombre max d'éléments d'une matrice de paires intermédiaire (~256 Ko en
+# float64 : les temporaires restent en cache, nettement plus rapide que de gros blocs)
+_NUMPY_BLOCK_ELEMENTS = 1 << 15
+
+
+def _np_repulsion(x, y, w, h, vx, vy, params: ForceParams, rows=None):
+    """Répulsion subie par les nœuds `rows` (tous si None) de la part de tous.
+
+    Avec des nœuds fixes, `rows` sont les nœuds libres. Contrairement aux
+    moteurs Python, rien n'est préparé à part pour les fixes : positions et
+    tailles sont déjà des tableaux construits une fois pour la simulation,
+    et leur force, fonction de la position des nœuds libres, se recalcule à
+    chaque itération (scinder les colonnes fixes/libres n'a rien fait gagner).
+    """
+    n = len(x)
+    if rows is None:
+        rows = np.arange(n)
+    block = max(1, _NUMPY_BLOCK_ELEMENTS // n)
+    strength = params.repulsion_strength
+    for start in range(0, len(rows), block):
+        r = rows[start:start + block]
+        dx = x[None, :] - x[r, None]
+        dy = y[None, :] - y[r, None]
+        center_dist = np.sqrt(dx * dx + dy * dy)
+        np.maximum(center_dist, 1.0, out=center_dist)
+        nx = dx / center_dist
+        ny = dy / center_dist
+
+        min_sep_x = (w[r, None] + w[None, :]) * 0.5 + params.overlap_padding
+        min_sep_y = (h[r, None] + h[None, :]) * 0.5 + params.overlap_padding
+        min_sep_x *= nx
+        min_sep_y *= ny
+        min_sep = np.sqrt(min_sep_x * min_sep_x + min_sep_y * min_sep_y)
+
+        effective_dist = np.maximum(center_dist - min_sep, params.repulsion_min_distance)
+        force = strength / (effective_dist * effective_dist)
+
+        # Chevauchement : la paire (i, i) a min_sep = 0 et n'y entre jamais
+        overlap = np.nonzero(center_dist < min_sep)
+        force[overlap] += strength * (1.0 - center_dist[overlap] / min_sep[overlap]) * 2.0
+
+        # La paire (i, i) a nx = ny = 0 : aucune contribution
+        vx[r] -= np.einsum("ij,ij->i", nx, force)
+        vy[r] -= np.einsum("ij,ij->i", ny, force)
+
+
+def _np_attraction(x, y, vx, vy, src, dst, raideur, longueur):
+    if len(src) == 0:
+        return
+    n = len(x)
+    dx = x[dst] - x[src]
+    dy = y[dst] - y[src]
+    dist = np.maximum(np.hypot(dx, dy), 1.0)
+    force = raideur * (dist - longueur)
+    fx = dx / dist * force
+    fy = dy / dist * force
+    vx += np.bincount(src, fx, n) - np.bincount(dst, fx, n)
+    vy += np.bincount(src, fy, n) - np.bincount(dst, fy, n)
+
+
+def _np_gravity(x, y, vx, vy, gravity_weight, params: ForceParams):
+    vx += (params.center_x - x) * params.gravity_strength * gravity_weight
+    vy += (params.center_y - y) * params.gravity_strength * gravity_weight
+
+
+def _np_velocity(x, y, vx, vy, temperature: float, params: ForceParams) -> tuple[float, float]:
+    """Comme _apply_velocity : retourne l'énergie et le plus grand déplacement."""
+    old_x = x.copy()
+    old_y = y.copy()
+    vx *= params.velocity_damping
+    vy *= params.velocity_damping
+    energy = float(np.dot(vx, vx) + np.dot(vy, vy))
+
+    speed = np.hypot(vx, vy)
+    scale = np.where(speed > temperature, temperature / np.maximum(speed, 1e-12), 1.0)
+    vx *= scale
+    vy *= scale
+
+    x += vx
+    y += vy
+    np.clip(x, params.min_x, params.max_x, out=x)
+    np.clip(y, params.min_y, params.max_y, out=y)
+    return energy, float(np.hypot(x - old_x, y - old_y).max())
+
+
+def _simulate_numpy(nodes: list[Node], edges: list[Edge], params: ForceParams, stats: LayoutStats,
+                    on_iteration: IterationCallback | None = None):
+    """Boucle de simulation vectorisée — écrit les positions finales dans les nœuds."""
+    index = {node.id: i for i, node in enumerate(nodes)}
+    x = np.array([node.x for node in nodes], dtype=np.float64)
+    y = np.array([node.y for node in nodes], dtype=np.float64)
+    vx = np.array([node.vx for node in nodes], dtype=np.float64)
+    vy = np.array([node.vy for node in nodes], dtype=np.float64)
+    w = np.array([node.w for node in nodes], dtype=np.float64)
+    h = np.array([node.h for node in nodes], dtype=np.float64)
+    gravity_weight = 1.0 + np.array([node.degree for node in nodes], dtype=np.float64) * 0.3
+
+    fixed = np.array([node.fixed for node in nodes], dtype=bool)
+    free_rows = np.flatnonzero(~fixed) if fixed.any() else None
+    anchored = np.array([i for i, node in enumerate(nodes) if node.anchor is not None and not node.fixed],
+                        dtype=np.intp)
+    anchor_x = np.array([nodes[i].anchor[0] for i in anchored], dtype=np.float64)
+    anchor_y = np.array([nodes[i].anchor[1] for i in anchored], dtype=np.float64)
+
+    pairs = [
+        (index[e.source_id], index[e.target_id], *_ressort(e, params))
+        for e in edges
+        if e.source_id in index and e.target_id in index
+    ]
+    src = np.array([p[0] for p in pairs], dtype=np.intp)
+    dst = np.array([p[1] for p in pairs], dtype=np.intp)
+    raideur = np.array([p[2] for p in pairs], dtype=np.float64)
+    longueur = np.array([p[3] for p in pairs], dtype=np.float64)
+
+    cooling = _Refroidissement(params, len(free_rows) if free_rows is not None else len(nodes))
+    stats.arret = "iterations"
+    for iteration in range(params.iterations):
+        if cooling.temperature < params.min_temperature:
+            stats.arret = "temperature"
+            break
+
+        _np_repulsion(x, y, w, h, vx, vy, params, free_rows)
+        _np_attraction(x, y, vx, vy, src, dst, raideur, longueur)
+        _np_gravity(x, y, vx, vy, gravity_weight, params)
+        if len(anchored):
+            vx[anchored] += (anchor_x - x[anchored]) * params.anchor_strength
+            vy[anchored] += (anchor_y - y[anchored]) * params.anchor_strength
+        if free_rows is not None:
+            vx[fixed] = 0.0
+            vy[fixed] = 0.0
+        energy, max_displacement = _np_velocity(x, y, vx, vy, cooling.temperature, params)
+
+        converged = cooling.update(energy, lambda: (x.tolist(), y.tolist()))
+        stats.iterations = iteration + 1
+        stats.energy = energy
+        stats.max_displacement = max_displacement
+        stats.converged = converged
+
+        if on_iteration:
+            info = IterationInfo(
+                iteration=iteration + 1,
+                iterations_max=params.iterations,
+                temperature=cooling.temperature,
+                energy=energy,
+                positions=lambda: (x.tolist(), y.tolist()),
+            )
+            if on_iteration(info):
+                stats.arret = "interruption"
+                break
+        if converged:
+            stats.arret = cooling.critere
+            break
+
+    for i, node in enumerate(nodes):
+        node.x = float(x[i])
+        node.y = float(y[i])
+        node.vx = float(vx[i])
+        node.vy = float(vy[i])
+
+
+# ═══════════════════════════════════════════════════════════
+#  SUPPRESSION DES CHEVAUCHEMENTS
+# ═══════════════════════════════════════════════════════════
+# Passe finale, indépendante des forces : les rectangles (w × h + écart) sont
+# rangés dans une grille uniforme dont la maille est la taille médiane des
+# blocs, si bien que chaque bloc n'est comparé qu'à ses voisins de cellule.
+# Seuls les nœuds libres bougent : les nœuds fixes sont indexés une fois, et
+# chaque passe ne touche que les nœuds libres et les cellules qu'ils couvrent
+# (un layout incrémental ne paie que pour son voisinage). Des passes de
+# séparation minimale (à la PRISM, le long de l'axe de moindre pénétration)
+# corrigent d'abord les chevauchements en déformant peu la disposition ; les
+# nœuds encore en conflit sont ensuite replacés un à un à la position libre
+# la plus proche, dans les bornes du layout, avec un nombre d'essais borné.
+
+# Anneaux (pas d'une demi-maille) explorés au plus autour d'un nœud en conflit
+_OVERLAP_MAX_ANNEAUX = 40
+
+# Décalages (i, j) de chaque anneau carré de rayon r ≥ 1, du plus proche au plus éloigné
+_ANNEAUX = [
+    sorted([(i, j) for i in range(-r, r + 1) for j in (-r, r)]
+           + [(i, j) for i in (-r, r) for j in range(-r + 1, r)],
+           key=lambda c: c[0] * c[0] + c[1] * c[1])
+    for r in range(1, _OVERLAP_MAX_ANNEAUX + 1)
+]
+
+# Marge ajoutée à l'écart au contact d'un obstacle (l'écart exact, aux
+# arrondis près, compterait encore comme chevauchement)
+_OVERLAP_MARGE = 0.01
+
+# Les passes de séparation s'arrêtent dès qu'une passe retire moins de cette
+# part des paires restantes (amas trop serré : le placement prend le relais)
+_OVERLAP_PROGRES_MIN = 0.05
+
+
+def _maille(nodes: list[Node], gap: float) -> float:
+    tailles = sorted(max(node.w, node.h) for node in nodes)
+    return max(1.0, tailles[len(tailles) // 2] + gap)
+
+
+def _cellules(node: Node, maille: float, gap: float) -> list[tuple[int, int]]:
+    """Cellules de la grille couvertes par le rectangle élargi de `node`."""
+    demi_w = (node.w + gap) / 2
+    demi_h = (node.h + gap) / 2
+    x0 = math.floor((node.x - demi_w) / maille)
+    x1 = math.floor((node.x + demi_w) / maille)
+    y0 = math.floor((node.y - demi_h) / maille)
+    y1 = math.floor((node.y + demi_h) / maille)
+    return [(cx, cy) for cx in range(x0, x1 + 1) for cy in range(y0, y1 + 1)]
+
+
+def _indexer(nodes: list[Node], maille: float, gap: float) -> dict[tuple[int, int], list[Node]]:
+    grille: dict[tuple[int, int], list[Node]] = {}
+    for node in nodes:
+        for cellule in _cellules(node, maille, gap):
+            grille.setdefault(cellule, []).append(node)
+    return grille
+
+
+def _penetration(a: Node, b: Node, gap: float) -> tuple[float, float]:
+    """Recouvrement en x et en y (écart compris) ; chevauchement si les deux sont > 0."""
+    return ((a.w + b.w) / 2 + gap - abs(a.x - b.x),
+            (a.h + b.h) / 2 + gap - abs(a.y - b.y))
+
+
+def _chevauche(a: Node, b: Node, gap: float) -> bool:
+    px, py = _penetration(a, b, gap)
+    return px > 0 and py > 0
+
+
+def _paires_chevauchantes(nodes: list[Node], gap: float) -> list[tuple[int, int]]:
+    """Paires (i, j) de rectangles qui se chevauchent, hors paires de deux nœuds fixes."""
+    maille = _maille(nodes, gap)
+    grille: dict[tuple[int, int], list[int]] = {}
+    for i, node in enumerate(nodes):
+        for cellule in _cellules(node, maille, gap):
+            grille.setdefault(cellule, []).append(i)
+
+    paires = set()
+    for membres in grille.values():
+        for k, i in enumerate(membres):
+            a = nodes[i]
+            for j in membres[k + 1:]:
+                b = nodes[j]
+                if a.fixed and b.fixed:
+                    continue
+                if _chevauche(a, b, gap):
+                    paires.add((i, j))
+    return sorted(paires)
+
+
+def _paires_libres(libres: list[Node], grille_fixes: dict, maille: float,
+                   gap: float) -> list[tuple[Node, Node]]:
+    """Paires chevauchantes qui impliquent au moins un nœud libre.
+
+    Les nœuds libres sont réindexés (positions courantes) ; les fixes sont
+    lus dans leur grille, construite une fois.
+    """
+    rang = {id(node): k for k, node in enumerate(libres)}
+    grille = _indexer(libres, maille, gap)
+    paires = {}
+    for a in libres:
+        ka = rang[id(a)]
+        for cellule in _cellules(a, maille, gap):
+            for b in grille.get(cellule, ()):
+                kb = rang[id(b)]
+                if kb > ka and (ka, kb) not in paires and _chevauche(a, b, gap):
+                    paires[(ka, kb)] = (a, b)
+            for b in grille_fixes.get(cellule, ()):
+                cle = (ka, -1 - id(b))
+                if cle not in paires and _chevauche(a, b, gap):
+                    paires[cle] = (a, b)
+    return list(paires.values())
+
+
+def _separer(a: Node, b: Node, gap: float):
+    """Écarte a et b le long de l'axe de moindre pénétration (nœuds fixes immobiles)."""
+    px, py = _penetration(a, b, gap)
+    if px <= 0 or py <= 0:
+        return
+    if px <= py:
+        sens = 1.0 if (a.x, a.w) >= (b.x, b.w) else -1.0
+        axe, depl = "x", px
+    else:
+        sens = 1.0 if (a.y, a.h) >= (b.y, b.h) else -1.0
+        axe, depl = "y", py
+    part_a = 0.0 if a.fixed else (1.0 if b.fixed else 0.5)
+    part_b = 0.0 if b.fixed else 1.0 - part_a
+    setattr(a, axe, getattr(a, axe) + sens * depl * part_a)
+    setattr(b, axe, getattr(b, axe) - sens * depl * part_b)
+
+
+def _borner(node: Node, bornes: tuple[float, float, float, float] | None):
+    if bornes is not None and not node.fixed:
+        min_x, min_y, max_x, max_y = bornes
+        node.x = max(min_x, min(max_x, node.x))
+        node.y = max(min_y, min(max_y, node.y))
+
+
+def _libre(node: Node, grille: dict, maille: float, gap: float) -> bool:
+    """Vrai si `node` ne chevauche aucun nœud de la grille (test en ligne, appelé à chaque essai)."""
+    x, y = node.x, node.y
+    demi_w = (node.w + gap) / 2
+    demi_h = (node.h + gap) / 2
+    for cx in range(math.floor((x - demi_w) / maille), math.floor((x + demi_w) / maille) + 1):
+        for cy in range(math.floor((y - demi_h) / maille), math.floor((y + demi_h) / maille) + 1):
+            for autre in grille.get((cx, cy), ()):
+                if (abs(x - autre.x) < (node.w + autre.w) / 2 + gap
+                        and abs(y - autre.y) < (node.h + autre.h) / 2 + gap):
+                    return False
+    return True
+
+
+def _placer_libre(node: Node, grille: dict, maille: float, gap: float,
+                  bornes: tuple[float, float, float, float] | None) -> bool:
+    """Déplace `node` à une position libre proche (grille des nœuds déjà placés).
+
+    Essaie d'abord les positions qui longent ses obstacles (gauche, droite,
+    dessus, dessous), puis des anneaux carrés de plus en plus larges (pas
+    d'une demi-maille, au plus _OVERLAP_MAX_ANNEAUX), dans les bornes. Sans
+    place trouvée, le nœud reste où il était et la fonction retourne False.
+    """
+    x0, y0 = node.x, node.y
+
+    def essayer(positions: list[tuple[float, float]]) -> bool:
+        for x, y in positions:
+            node.x, node.y = x, y
+            if _libre(node, grille, maille, gap):
+                return True
+        return False
+
+    def dans_bornes(x: float, y: float) -> bool:
+        return bornes is None or (bornes[0] <= x <= bornes[2] and bornes[1] <= y <= bornes[3])
+
+    candidats = []
+    for cellule in _cellules(node, maille, gap):
+        for o in grille.get(cellule, ()):
+            if _chevauche(node, o, gap):
+                dx = (o.w + node.w) / 2 + gap + _OVERLAP_MARGE
+                dy = (o.h + node.h) / 2 + gap + _OVERLAP_MARGE
+                candidats += [(o.x - dx, y0), (o.x + dx, y0), (x0, o.y - dy), (x0, o.y + dy)]
+    candidats.sort(key=lambda c: math.hypot(c[0] - x0, c[1] - y0))
+    if essayer([c for c in candidats if dans_bornes(*c)]):
+        return True
+    pas = maille / 2
+    for anneau in _ANNEAUX:
+        candidats = [(x0 + i * pas, y0 + j * pas) for i, j in anneau]
+        candidats = [c for c in candidats if dans_bornes(*c)]
+        if not candidats:
+            break
+        if essayer(candidats):
+            return True
+    node.x, node.y = x0, y0
+    return False
+
+
+def remove_overlaps(nodes: list[Node], gap: float = 10.0, rounds: int = 20,
+                    bornes: tuple[float, float, float, float] | None = None) -> int:
+    """Supprime les chevauchements entre rectangles de nœuds (écart minimal `gap`).
+
+    Seuls les nœuds libres bougent ; les paires de deux nœuds fixes sont
+    laissées en l'état. `bornes` (min_x, min_y, max_x, max_y), si fourni,
+    contient les centres des nœuds déplacés. Aucun chevauchement ne subsiste
+    tant qu'une place libre existe à portée (_OVERLAP_MAX_ANNEAUX demi-mailles)
+    dans les bornes. Retourne le nombre de paires qui se chevauchaient au départ.
+    """
+    libres = [node for node in nodes if not node.fixed]
+    if not libres or len(nodes) < 2:
+        return 0
+    maille = _maille(nodes, gap)
+    grille_fixes = _indexer([node for node in nodes if node.fixed], maille, gap)
+    initiales = None
+    for _ in range(rounds):
+        paires = _paires_libres(libres, grille_fixes, maille, gap)
+        if initiales is None:
+            initiales = len(paires)
+        elif len(paires) > restantes * (1 - _OVERLAP_PROGRES_MIN):
+            break
+        if not paires:
+            return initiales
+        restantes = len(paires)
+        for a, b in paires:
+            _separer(a, b, gap)
+            _borner(a, bornes)
+            _borner(b, bornes)
+
+    paires = _paires_libres(libres, grille_fixes, maille, gap)
+    if initiales is None:
+        initiales = len(paires)
+    if paires:
+        en_conflit = {id(node): node for paire in paires for node in paire if not node.fixed}
+        # Placés : nœuds fixes et nœuds libres sans conflit, puis chaque nœud
+        # replacé, du centre des conflits vers l'extérieur (la place se trouve
+        # alors en bordure de ce qui est déjà rangé)
+        grille = grille_fixes
+        for node in libres:
+            if id(node) not in en_conflit:
+                for cellule in _cellules(node, maille, gap):
+                    grille.setdefault(cellule, []).append(node)
+        cx = sum(node.x for node in en_conflit.values()) / len(en_conflit)
+        cy = sum(node.y for node in en_conflit.values()) / len(en_conflit)
+        for node in sorted(en_conflit.values(), key=lambda node: math.hypot(node.x - cx, node.y - cy)):
+            _placer_libre(node, grille, maille, gap, bornes)
+            for cellule in _cellules(node, maille, gap):
+                grille.setdefault(cellule, []).append(node)
+    return initiales
+
+
+def _resolve_engine(engine: str, n: int) -> str:
+    if engine == "auto":
+        if np is not None and n <= _NUMPY_AUTO_MAX:
+            return "numpy"
+        return "barnes_hut" if n >= _BARNES_HUT_AUTO_MIN else "exact"
+    if engine == "numpy":
+        if np is None:
+            raise ValueError("Moteur de layout \"numpy\" demandé mais NumPy n'est pas installé.")
+        return engine
+    if engine not in _REPULSION_ENGINES:
+        raise ValueError(f"Moteur de layout inconnu : {engine}")
+    return engine
+
+
+def simulate_forces(nodes: list[Node], edges: list[Edge], params: ForceParams | None = None,
+                    on_iteration: IterationCallback | None = None,
+                    stats: LayoutStats | None = None) -> list[Node]:
+    """Lance la simulation force-directed. Retourne les nœuds avec positions finales.
+
+    `on_iteration` est appelé après chaque itération ; s'il retourne True,
+    la simulation s'arrête et les positions courantes sont conservées.
+    `stats`, si fourni, reçoit le bilan (itérations effectuées, énergie finale…).
+    Les nœuds fixes gardent leur position ; le semis se fait autour d'eux.
+    """
     if params is None:
         params = ForceParams()
 
@@ -178,6 +1132,8 @@ def simulate_forces(nodes: list[Node], edges: list[Edge], params: ForceParams |
         return nodes
 
     n = len(nodes)
+    engine = _resolve_engine(params.engine, n)
+
     avg_w = sum(node.w for node in nodes) / n
     avg_h = sum(node.h for node in nodes) / n
     avg_size = (avg_w + avg_h) / 2
@@ -195,89 +1151,564 @@ def simulate_forces(nodes: list[Node], edges: list[Edge], params: ForceParams |
         if edge.target_id in node_map:
             node_map[edge.target_id].degree += 1
 
-    sorted_nodes = sorted(nodes, key=lambda n: n.degree, reverse=True)
-    for i, node in enumerate(sorted_nodes):
-        angle = (2 * math.pi * i) / len(nodes) + random.uniform(-0.3, 0.3)
-        radius = spread * 0.3 * (1.0 - node.degree / max(1, max(n.degree for n in nodes)) * 0.5)
-        radius += random.uniform(-50, 50)
-        node.x = params.center_x + radius * math.cos(angle)
-        node.y = params.center_y + radius * math.sin(angle)
+    fixes = [node for node in nodes if node.fixed]
+    if len(fixes) == n:
+        return nodes
+
+    if params.warm_start:
+        # Positions conservées : centre et bornes s'adaptent à la disposition actuelle
+        params.center_x = sum(node.x for node in nodes) / n
+        params.center_y = sum(node.y for node in nodes) / n
+        params.min_x = min(params.min_x, min(node.x for node in nodes) - 400)
+        params.min_y = min(params.min_y, min(node.y for node in nodes) - 400)
+        params.max_x = max(params.max_x, max(node.x for node in nodes) + 400)
+        params.max_y = max(params.max_y, max(node.y for node in nodes) + 400)
+    else:
+        if fixes:
+            # Nœuds fixes (blocs épinglés) : semis autour d'eux, bornes élargies à leur emprise
+            params.center_x = sum(node.x for node in fixes) / len(fixes)
+            params.center_y = sum(node.y for node in fixes) / len(fixes)
+            params.min_x = min(params.center_x - spread / 2 - 300, min(node.x for node in fixes) - 400)
+            params.min_y = min(params.center_y - spread / 2 - 300, min(node.y for node in fixes) - 400)
+            params.max_x = max(params.center_x + spread / 2 + 300, max(node.x for node in fixes) + 400)
+            params.max_y = max(params.center_y + spread / 2 + 300, max(node.y for node in fixes) + 400)
+        rng = random.Random(params.seed)
+        max_degree = max(1, max(node.degree for node in nodes))
+        sorted_nodes = sorted(nodes, key=lambda n: n.degree, reverse=True)
+        for i, node in enumerate(sorted_nodes):
+            if node.fixed:
+                continue
+            angle = (2 * math.pi * i) / len(nodes) + rng.uniform(-0.3, 0.3)
+            radius = spread * 0.3 * (1.0 - node.degree / max_degree * 0.5)
+            radius += rng.uniform(-50, 50)
+            node.x = params.center_x + radius * math.cos(angle)
+            node.y = params.center_y + radius * math.sin(angle)
+
+    if stats is None:
+        stats = LayoutStats()
+    if engine == "numpy":
+        _simulate_numpy(nodes, edges, params, stats, on_iteration)
+    else:
+        _simulate_python(nodes, edges, node_map, params, _REPULSION_ENGINES[engine], stats, on_iteration)
+
+    if params.remove_overlaps:
+        stats.overlaps = remove_overlaps(nodes, params.overlap_gap, params.overlap_rounds,
+                                         (params.min_x, params.min_y, params.max_x, params.max_y))
+
+    return nodes
 
-    temperature = params.initial_temperature
 
-    for iteration in range(params.iterations):
-        if temperature < params.min_temperature:
-            break
+def simulate_incremental(nodes: list[Node], edges: list[Edge], changed_ids: set[str],
+                         params: ForceParams | None = None,
+                         on_iteration: IterationCallback | None = None,
+                         stats: LayoutStats | None = None) -> list[Node]:
+    """Layout incrémental : seuls les nœuds modifiés et leur voisinage bougent.
 
-        _apply_repulsion(nodes, params)
-        _apply_attraction(nodes, edges, node_map, params)
-        _apply_gravity(nodes, params)
-        _apply_velocity(nodes, temperature, params)
+    - nœuds de `changed_ids` : libres, placés au départ près de leurs voisins
+    - voisins à `incremental_hops` sauts : libres mais ancrés à leur position
+    - tous les autres : fixes (ils repoussent mais ne bougent pas)
+    - nœuds déjà fixes à l'appel (blocs épinglés) : le restent dans tous les cas
 
-        temperature *= params.cooling_factor
+    Démarrage à chaud, sans gravité, avec la température et le budget
+    d'itérations réduits de ForceParams. Retourne les nœuds simulés.
+    """
+    base = params or ForceParams()
+    params = replace(
+        base,
+        warm_start=True,
+        gravity_strength=0.0,
+        iterations=base.incremental_iterations,
+        initial_temperature=base.incremental_temperature,
+    )
+
+    node_map = {node.id: node for node in nodes}
+    voisins: dict[str, set[str]] = {}
+    for edge in edges:
+        if edge.source_id in node_map and edge.target_id in node_map:
+            voisins.setdefault(edge.source_id, set()).add(edge.target_id)
+            voisins.setdefault(edge.target_id, set()).add(edge.source_id)
+
+    rng = random.Random(base.seed)
+    epingles = {node.id for node in nodes if node.fixed}
+    changed = {node_id for node_id in changed_ids if node_id in node_map} - epingles
+    actifs = set(changed)
+    frontiere = set(changed)
+    for _ in range(base.incremental_hops):
+        frontiere = {v for node_id in frontiere for v in voisins.get(node_id, ())} - actifs
+        actifs |= frontiere
+
+    for node in nodes:
+        if node.id in epingles:
+            continue
+        if node.id in changed:
+            node.fixed = False
+            node.anchor = None
+            # Départ au barycentre des voisins déjà placés : convergence quasi immédiate
+            places = [node_map[v] for v in sorted(voisins.get(node.id, ())) if v not in changed]
+            if places:
+                node.x = sum(v.x for v in places) / len(places) + rng.uniform(-40, 40)
+                node.y = sum(v.y for v in places) / len(places) + rng.uniform(-40, 40)
+        elif node.id in actifs:
+            node.fixed = False
+            node.anchor = (node.x, node.y)
+        else:
+            node.fixed = True
+
+    simulate_forces(nodes, edges, params, on_iteration, stats)
+    return [node for node in nodes if node.id in actifs and node.id not in epingles]
+
+
+# ═══════════════════════════════════════════════════════════
+#  MULTINIVEAU (contraction → layout grossier → affinage)
+# ═══════════════════════════════════════════════════════════
+# Chaque niveau grossier remplace des groupes de nœuds par un super-nœud de
+# même surface totale (marges comprises). Le graphe le plus grossier est
+# disposé avec le budget complet de ForceParams ; chaque niveau plus fin
+# démarre des positions de ses parents et n'a besoin que d'un court affinage.
+
+# Une passe d'appariement qui réduit le graphe de moins de 10 % arrête la contraction
+_MULTILEVEL_MIN_REDUCTION = 0.9
+
+
+@dataclass
+class _Niveau:
+    nodes: list[Node]
+    edges: list[Edge]
+    # Indice, au niveau plus grossier, du parent de chaque nœud (None au sommet)
+    parent: list[int] | None = None
+
+
+def _super_node(node_id: str, membres: list[Node], padding: float) -> Node:
+    """Super-nœud : barycentre des membres, surface cumulée, proportions moyennes."""
+    k = len(membres)
+    surface = sum((m.w + padding) * (m.h + padding) for m in membres)
+    ratio = sum(m.w for m in membres) / max(1.0, sum(m.h for m in membres))
+    return Node(
+        id=node_id,
+        x=sum(m.x for m in membres) / k,
+        y=sum(m.y for m in membres) / k,
+        w=max(1.0, math.sqrt(surface * ratio) - padding),
+        h=max(1.0, math.sqrt(surface / ratio) - padding),
+        group=membres[0].group,
+    )
+
+
+def _contracter(niveau: _Niveau, affectation: list[int], nb_parents: int,
+                padding: float) -> _Niveau:
+    """Construit le niveau grossier ; `affectation[i]` = parent du nœud i."""
+    niveau.parent = affectation
+    membres: list[list[Node]] = [[] for _ in range(nb_parents)]
+    for node, p in zip(niveau.nodes, affectation):
+        membres[p].append(node)
+    nodes = [_super_node(f"~{p}", m, padding) for p, m in enumerate(membres)]
+
+    index = {node.id: i for i, node in enumerate(niveau.nodes)}
+    paires = set()
+    for edge in niveau.edges:
+        s = index.get(edge.source_id)
+        t = index.get(edge.target_id)
+        if s is None or t is None:
+            continue
+        ps, pt = affectation[s], affectation[t]
+        if ps != pt:
+            paires.add((min(ps, pt), max(ps, pt)))
+    edges = [Edge(source_id=nodes[s].id, target_id=nodes[t].id) for s, t in sorted(paires)]
+    return _Niveau(nodes=nodes, edges=edges)
+
+
+def _apparier(niveau: _Niveau, par_groupe: bool, rng: random.Random,
+              params: ForceParams) -> tuple[list[int], int]:
+    """Appariement glouton par liaison la plus lourde (somme des raideurs
+    relatives, poids × facteur du type : les liaisons fortes sont contractées
+    d'abord).
+
+    À poids égal, le voisin le plus petit est préféré pour garder des
+    super-nœuds équilibrés. Si `par_groupe`, seules les paires d'un même
+    groupe sont contractées.
+    """
+    index = {node.id: i for i, node in enumerate(niveau.nodes)}
+    poids: dict[int, dict[int, float]] = {}
+    for edge in niveau.edges:
+        s = index.get(edge.source_id)
+        t = index.get(edge.target_id)
+        if s is None or t is None or s == t:
+            continue
+        if par_groupe and niveau.nodes[s].group != niveau.nodes[t].group:
+            continue
+        raideur = edge.weight * params.link_types.get(edge.type, (1.0, 1.0))[0]
+        poids.setdefault(s, {})[t] = poids.get(s, {}).get(t, 0.0) + raideur
+        poids.setdefault(t, {})[s] = poids.get(t, {}).get(s, 0.0) + raideur
+
+    ordre = list(range(len(niveau.nodes)))
+    rng.shuffle(ordre)
+    affectation = [-1] * len(niveau.nodes)
+    nb_parents = 0
+    for i in ordre:
+        if affectation[i] >= 0:
+            continue
+        candidats = [(p, j) for j, p in poids.get(i, {}).items() if affectation[j] < 0]
+        affectation[i] = nb_parents
+        if candidats:
+            _, j = max(candidats, key=lambda c: (c[0], -niveau.nodes[c[1]].w * niveau.nodes[c[1]].h))
+            affectation[j] = nb_parents
+        nb_parents += 1
+    return affectation, nb_parents
+
+
+def _regrouper(niveau: _Niveau) -> tuple[list[int], int]:
+    """Un super-nœud par groupe (espace)."""
+    groupes: dict[str | None, int] = {}
+    affectation = [groupes.setdefault(node.group, len(groupes)) for node in niveau.nodes]
+    return affectation, len(groupes)
+
+
+def _hierarchie(nodes: list[Node], edges: list[Edge], params: ForceParams,
+                rng: random.Random) -> list[_Niveau]:
+    """Niveaux du plus fin (graphe d'origine) au plus grossier."""
+    if params.multilevel_coarsening not in ("espace", "matching"):
+        raise ValueError(f"Contraction multiniveau inconnue : {params.multilevel_coarsening}")
+    par_groupe = params.multilevel_coarsening == "espace"
+
+    niveaux = [_Niveau(nodes=nodes, edges=edges)]
+    while len(niveaux[-1].nodes) > params.multilevel_min_nodes:
+        courant = niveaux[-1]
+        affectation, nb_parents = _apparier(courant, par_groupe, rng, params)
+        if nb_parents > _MULTILEVEL_MIN_REDUCTION * len(courant.nodes):
+            break
+        niveaux.append(_contracter(courant, affectation, nb_parents, params.overlap_padding))
+
+    if par_groupe:
+        courant = niveaux[-1]
+        affectation, nb_parents = _regrouper(courant)
+        if 1 < nb_parents < len(courant.nodes):
+            niveaux.append(_contracter(courant, affectation, nb_parents, params.overlap_padding))
+    return niveaux
+
+
+def _prolonger(fin: _Niveau, grossier: _Niveau, rng: random.Random):
+    """Place chaque nœud dans l'emprise de son parent, dispersé autour de son centre."""
+    for node, p in zip(fin.nodes, fin.parent):
+        parent = grossier.nodes[p]
+        node.x = parent.x + rng.uniform(-0.35, 0.35) * parent.w
+        node.y = parent.y + rng.uniform(-0.35, 0.35) * parent.h
+        node.vx = node.vy = 0.0
+
+
+def simulate_multilevel(nodes: list[Node], edges: list[Edge], params: ForceParams | None = None,
+                        on_iteration: IterationCallback | None = None,
+                        stats: LayoutStats | None = None) -> list[Node]:
+    """Layout multiniveau : contraction, layout du graphe grossier, puis affinage.
+
+    - "espace"   : appariement des liaisons à l'intérieur de chaque groupe
+                   (Node.group), puis un super-nœud par groupe — les clusters
+                   d'espaces sont placés dès le premier niveau
+    - "matching" : appariement des liaisons seul, sans tenir compte des groupes
+
+    Le niveau le plus grossier reçoit le budget complet de ForceParams, chaque
+    niveau plus fin `multilevel_refine_iterations` itérations à chaud depuis
+    `multilevel_refine_temperature`. Les nœuds fixes et ancrés ne sont pas
+    pris en compte (layout complet uniquement).
+
+    `on_iteration` voit une numérotation continue sur tous les niveaux ;
+    les positions transmises sont toujours celles des nœuds d'origine
+    (un nœud prend la position de son ancêtre au niveau en cours).
+    `stats` cumule les itérations de tous les niveaux ; énergie, déplacement
+    et convergence sont ceux du dernier niveau simulé.
+    """
+    base = params or ForceParams()
+    if not nodes:
+        return nodes
+
+    rng = random.Random(base.seed)
+    niveaux = _hierarchie(nodes, edges, base, rng)
+    total = base.iterations + base.multilevel_refine_iterations * (len(niveaux) - 1)
+    fait = 0
+    arret = False
+
+    for profondeur in range(len(niveaux) - 1, -1, -1):
+        niveau = niveaux[profondeur]
+        if profondeur == len(niveaux) - 1:
+            level_params = replace(base)
+        else:
+            _prolonger(niveau, niveaux[profondeur + 1], rng)
+            level_params = replace(
+                base,
+                warm_start=True,
+                iterations=base.multilevel_refine_iterations,
+                initial_temperature=base.multilevel_refine_temperature,
+            )
+
+        # Ancêtre, à ce niveau, de chaque nœud d'origine (pour la progression)
+        ancetre = list(range(len(nodes)))
+        for niveau_fin in niveaux[:profondeur]:
+            ancetre = [niveau_fin.parent[a] for a in ancetre]
+
+        def relayer(info: IterationInfo, ancetre=ancetre, niveau_nodes=niveau.nodes) -> bool:
+            nonlocal arret
+
+            def positions():
+                return ([niveau_nodes[a].x for a in ancetre], [niveau_nodes[a].y for a in ancetre])
+
+            arret = bool(on_iteration(IterationInfo(
+                iteration=fait + info.iteration,
+                iterations_max=total,
+                temperature=info.temperature,
+                energy=info.energy,
+                positions=positions,
+            )))
+            return arret
+
+        level_stats = LayoutStats()
+        simulate_forces(niveau.nodes, niveau.edges, level_params, relayer if on_iteration else None, level_stats)
+        fait += level_stats.iterations
+        if stats is not None:
+            stats.iterations = fait
+            stats.energy = level_stats.energy
+            stats.max_displacement = level_stats.max_displacement
+            stats.converged = level_stats.converged
+            stats.arret = level_stats.arret
+            stats.overlaps = level_stats.overlaps
+        if arret:
+            # Interruption : les nœuds d'origine reçoivent la position de leur ancêtre
+            for plus_fin in range(profondeur - 1, -1, -1):
+                _prolonger(niveaux[plus_fin], niveaux[plus_fin + 1], rng)
+            break
 
     return nodes
 
 
+# ═══════════════════════════════════════════════════════════
+#  EMPREINTE DE GRAPHE
+# ═══════════════════════════════════════════════════════════
+
+def empreinte_graphe(nodes: list[Node], edges: list[Edge], params: ForceParams) -> str:
+    """Empreinte SHA-256 de ce qui détermine un layout : nœuds, liaisons, paramètres.
+
+    Identifiants, tailles et groupes des nœuds, ensemble des liaisons et
+    ForceParams (graine comprise). Les positions courantes n'en font pas
+    partie : sans démarrage à chaud, le semis initial les remplace — sauf
+    celles des nœuds fixes, qui contraignent tout le layout.
+    """
+    contenu = {
+        "nodes": sorted(
+            (node.id, round(node.w, 1), round(node.h, 1), node.group,
+             (round(node.x, 1), round(node.y, 1)) if node.fixed else None)
+            for node in nodes
+        ),
+        "edges": sorted(astuple(edge) for edge in edges),
+        "params": asdict(params),
+    }
+    return hashlib.sha256(json.dumps(contenu, sort_keys=True).encode()).hexdigest()
+
+
 # ═══════════════════════════════════════════════════════════
 #  INTÉGRATION BASE DE DONNÉES — MODE ESPACE
 # ═══════════════════════════════════════════════════════════
 
-async def reorganiser_espace(espace_id: str) -> str:
+# Au-delà de cette proportion de blocs modifiés, le layout incrémental n'est
+# plus rentable : on relance une disposition complète
+INCREMENTAL_MAX_RATIO = 0.2
+
+# Graine utilisée quand l'appelant n'en fournit pas : relancer un layout sur
+# un graphe inchangé redonne la même image
+SEED_DEFAUT = 0
+
+# Une suggestion en attente de validation tire cinq fois moins qu'une liaison
+# validée de même poids : elle oriente la disposition sans la dicter
+POIDS_EN_ATTENTE = 0.2
+
+
+def _edge_liaison(l: dict) -> Edge:
+    """Edge d'une liaison : poids (réduit si en attente de validation) et type."""
+    poids = l["poids"] if l["poids"] is not None else 1.0
+    if l["validation"] == "en_attente":
+        poids *= POIDS_EN_ATTENTE
+    return Edge(source_id=l["bloc_source_id"], target_id=l["bloc_cible_id"],
+                weight=poids, type=l["type"] or "simple")
+
+
+# Libellé de LayoutStats.arret dans les résumés
+_ARRETS = {
+    "energie": "stabilisé",
+    "derive": "nœuds oscillant sur place, dérive sous le seuil",
+    "temperature": "température minimale atteinte",
+    "iterations": "budget d'itérations épuisé",
+    "interruption": "interrompu",
+}
+
+
+def _resume_convergence(stats: LayoutStats) -> str:
+    etat = _ARRETS.get(stats.arret, "budget ou température épuisés")
+    resume = f"\n  {stats.iterations} itérations ({etat}), énergie finale {stats.energy:.3g}."
+    if stats.overlaps:
+        resume += f"\n  {stats.overlaps} chevauchements corrigés."
+    return resume
+
+
+async def _layout_en_cache(cle: str, empreinte: str) -> dict[str, list[float]] | None:
+    """Positions mémorisées pour `cle` si le graphe a toujours cette empreinte."""
+    db = await get_db()
+    rows = await db.execute_fetchall(
+        "SELECT positions FROM cache_layouts WHERE cle = ? AND empreinte = ?", (cle, empreinte)
+    )
+    return json.loads(rows[0]["positions"]) if rows else None
+
+
+async def _mettre_en_cache(cle: str, empreinte: str, nodes: list[Node]):
+    db = await get_db()
+    positions = {node.id: [round(node.x, 1), round(node.y, 1)] for node in nodes}
+    await db.execute(
+        """INSERT INTO cache_layouts (cle, empreinte, positions) VALUES (?, ?, ?)
+           ON CONFLICT(cle) DO UPDATE SET empreinte = excluded.empreinte,
+               positions = excluded.positions, created_at = CURRENT_TIMESTAMP""",
+        (cle, empreinte, json.dumps(positions)),
+    )
+
+
+async def _derniere_disposition(cle: str) -> str | None:
+    db = await get_db()
+    rows = await db.execute_fetchall(
+        "SELECT derniere_disposition FROM dispositions WHERE cle = ?", (cle,)
+    )
+    return rows[0]["derniere_disposition"] if rows else None
+
+
+async def _enregistrer_disposition(cle: str, date: str):
+    db = await get_db()
+    await db.execute(
+        """INSERT INTO dispositions (cle, derniere_disposition) VALUES (?, ?)
+           ON CONFLICT(cle) DO UPDATE SET derniere_disposition = excluded.derniere_disposition""",
+        (cle, date),
+    )
+
+
+async def reorganiser_espace(espace_id: str, on_progress: Callable[[dict], None] | None = None,
+                             progression_toutes: int = 0, incremental: bool | None = None,
+                             seed: int | None = None) -> str:
     """Réorganise les blocs d'un espace avec l'algorithme force-directed.
 
     Persiste dans x / y (coordonnées locales de l'espace).
+    `on_progress` / `progression_toutes` : cf. layout_executor.executer_layout.
+
+    `incremental` : si True, seuls les blocs créés/modifiés depuis la dernière
+    réorganisation (et leur voisinage) sont repositionnés, les autres restent
+    en place. Si None, le mode incrémental est choisi automatiquement quand
+    peu de blocs ont changé (INCREMENTAL_MAX_RATIO).
+
+    `seed` : graine du layout (SEED_DEFAUT si None). Si les blocs, leurs
+    tailles, les liaisons et les paramètres n'ont pas changé depuis le
+    dernier layout (même empreinte), les positions mémorisées sont
+    réappliquées sans calcul — sauf en mode incrémental explicite. Seuls
+    les layouts complets sont mémorisés.
+
+    Les blocs épinglés (`epingle`) ne bougent pas : ils contraignent la
+    disposition des autres comme des nœuds fixes.
     """
     db = await get_db()
 
     blocs = await db.execute_fetchall(
-        "SELECT id, x, y, largeur, hauteur, titre_ia FROM blocs WHERE espace_id = ?",
+        """SELECT id, x, y, largeur, hauteur, epingle, titre_ia, updated_at FROM blocs
+           WHERE espace_id = ? ORDER BY id""",
         (espace_id,),
     )
     if not blocs:
         return "Espace vide — rien à réorganiser."
+    blocs = [dict(b) for b in blocs]
 
     # V2 : modèle unifié, pas de espace_id dans liaisons
-    bloc_ids = [dict(b)["id"] for b in blocs]
+    bloc_ids = [b["id"] for b in blocs]
     if bloc_ids:
         placeholders = ",".join("?" * len(bloc_ids))
         liaisons = await db.execute_fetchall(
-            f"""SELECT bloc_source_id, bloc_cible_id FROM liaisons
-                WHERE bloc_source_id IN ({placeholders}) OR bloc_cible_id IN ({placeholders})""",
+            f"""SELECT bloc_source_id, bloc_cible_id, type, poids, validation, updated_at FROM liaisons
+                WHERE (bloc_source_id IN ({placeholders}) OR bloc_cible_id IN ({placeholders}))
+                  AND validation != 'rejete'
+                ORDER BY id""",
             bloc_ids + bloc_ids,
         )
     else:
         liaisons = []
 
     nodes = [
-        Node(id=dict(b)["id"], x=dict(b)["x"], y=dict(b)["y"],
-             w=dict(b).get("largeur", 200), h=dict(b).get("hauteur", 120))
+        Node(id=b["id"], x=b["x"], y=b["y"],
+             w=b.get("largeur", 200), h=b.get("hauteur", 120), fixed=bool(b["epingle"]))
         for b in blocs
     ]
-    edges = [
-        Edge(source_id=dict(l)["bloc_source_id"], target_id=dict(l)["bloc_cible_id"])
-        for l in liaisons
-    ]
-
-    result_nodes = simulate_forces(nodes, edges)
+    edges = [_edge_liaison(dict(l)) for l in liaisons]
+    epingles = {node.id for node in nodes if node.fixed}
+    if len(epingles) == len(nodes):
+        return "Tous les blocs sont épinglés — rien à réorganiser."
+
+    cle = f"espace:{espace_id}"
+    params = ForceParams(seed=SEED_DEFAUT if seed is None else seed)
+    empreinte = empreinte_graphe(nodes, edges, params)
+    if incremental is not True:
+        cache = await _layout_en_cache(cle, empreinte)
+        if cache is not None:
+            now = datetime.now(timezone.utc).isoformat()
+            debut = time.perf_counter()
+            positions = [(bloc_id, x, y) for bloc_id, (x, y) in cache.items() if bloc_id not in epingles]
+            await ecrire_positions(positions)
+            await _enregistrer_disposition(cle, now)
+            await db.commit()
+            duree_ecriture = time.perf_counter() - debut
+            return (f"✓ {len(positions)} blocs replacés (graphe inchangé, layout en cache)."
+                    f"\n  Positions enregistrées en {duree_ecriture * 1000:.0f} ms.")
+
+    # Blocs touchés depuis la dernière disposition (eux-mêmes ou leurs liaisons)
+    derniere = await _derniere_disposition(cle)
+    modifies: set[str] = set()
+    if derniere:
+        ids_espace = set(bloc_ids)
+        modifies = {b["id"] for b in blocs if (b["updated_at"] or "") > derniere}
+        for l in liaisons:
+            l = dict(l)
+            if (l["updated_at"] or "") > derniere:
+                modifies |= {l["bloc_source_id"], l["bloc_cible_id"]} & ids_espace
+        modifies -= epingles
+
+    if incremental is None:
+        incremental = bool(modifies) and len(modifies) <= INCREMENTAL_MAX_RATIO * len(blocs)
+
+    if incremental and not modifies:
+        return "✓ Aucun bloc modifié depuis la dernière réorganisation."
+
+    # Même incrémental, le calcul se chiffre en secondes sur un gros espace
+    # (tous les blocs fixes repoussent les libres) : il passe lui aussi par
+    # l'exécuteur plutôt que de bloquer la boucle d'événements
+    from services.layout_executor import executer_layout
+    stats = LayoutStats()
+    result_nodes = await executer_layout(
+        cle, nodes, edges, params,
+        on_progress=on_progress, progression_toutes=progression_toutes, stats=stats,
+        modifies=modifies if incremental else None,
+    )
+    mode = f"incrémental, {len(modifies)} blocs modifiés" if incremental else "force-directed"
 
     now = datetime.now(timezone.utc).isoformat()
-    for node in result_nodes:
-        await db.execute(
-            "UPDATE blocs SET x = ?, y = ?, updated_at = ? WHERE id = ?",
-            (round(node.x, 1), round(node.y, 1), now, node.id),
-        )
+    debut = time.perf_counter()
+    result_nodes = [node for node in result_nodes if node.id not in epingles]
+    await ecrire_positions([(node.id, node.x, node.y) for node in result_nodes])
+    await _enregistrer_disposition(cle, now)
+    if not incremental:
+        # Le cache ne garde que des layouts complets : un résultat incrémental
+        # dépend des positions de départ, absentes de l'empreinte
+        await _mettre_en_cache(cle, empreinte, nodes)
     await db.commit()
+    duree_ecriture = time.perf_counter() - debut
 
     central = max(result_nodes, key=lambda n: n.degree) if result_nodes else None
-    summary = f"✓ {len(result_nodes)} blocs réorganisés (force-directed)."
+    summary = f"✓ {len(result_nodes)} blocs réorganisés ({mode})."
+    if epingles:
+        summary += f"\n  {len(epingles)} blocs épinglés laissés en place."
     if central and central.degree > 0:
         for b in blocs:
-            b = dict(b)
             if b["id"] == central.id:
                 summary += f'\n  Nœud central : "{b.get("titre_ia", "?")}" ({central.degree} connexions)'
                 break
     summary += f"\n  {len(edges)} liaisons traitées."
+    summary += _resume_convergence(stats)
+    summary += f"\n  Positions enregistrées en {duree_ecriture * 1000:.0f} ms."
     return summary
 
 
@@ -285,27 +1716,188 @@ async def reorganiser_espace(espace_id: str) -> str:
 #  INTÉGRATION BASE DE DONNÉES — MODE GRAPHE GLOBAL
 # ═══════════════════════════════════════════════════════════
 
-async def reorganiser_global() -> str:
+# À partir de ce nombre de blocs, le graphe global est disposé en multiniveau
+MULTINIVEAU_MIN_BLOCS = 300
+
+# Layout en deux phases : marge autour de chaque espace disposé (phase 2)
+MARGE_ESPACE = 200.0
+
+
+async def _layout_par_espace(nodes: list[Node], edges: list[Edge], params: ForceParams,
+                             stats: LayoutStats,
+                             on_progress: Callable[[dict], None] | None = None,
+                             progression_toutes: int = 0) -> int:
+    """Layout global en deux phases.
+
+    1. Chaque espace est disposé seul, en parallèle dans l'exécuteur de
+       layouts (un job par espace, les plus gros d'abord). Ses liaisons
+       inter-espaces comptent dans le degré des blocs mais ne tirent pas.
+    2. Chaque espace devient un nœud rigide de la taille de son emprise ;
+       ces nœuds sont disposés avec les seules liaisons inter-espaces,
+       agrégées par paire d'espaces et pondérées par la somme de leurs
+       raideurs (poids × facteur du type).
+
+    Le temps de calcul suit le plus gros espace et non le nombre total de
+    blocs. Les positions sont écrites dans `nodes` ; `stats` reçoit le bilan
+    de la phase 2. Retourne le plus grand nombre d'itérations de la phase 1.
+
+    Positions intermédiaires (`progression_toutes`) : en phase 1, celles des
+    blocs d'un espace, recentrées sur l'emprise qu'il occupait avant le
+    layout ; en phase 2, celles de tous les blocs, chaque espace translaté
+    comme son nœud rigide.
+    """
+    from services.layout_executor import MAX_WORKERS, executer_layout
+
+    groupes: dict[str, list[Node]] = {}
+    for node in nodes:
+        groupes.setdefault(node.group, []).append(node)
+    espace_de = {node.id: node.group for node in nodes}
+
+    internes: dict[str, list[Edge]] = {espace_id: [] for espace_id in groupes}
+    inter: dict[tuple[str, str], float] = {}
+    for edge in edges:
+        espace_source, espace_cible = espace_de.get(edge.source_id), espace_de.get(edge.target_id)
+        if espace_source is None or espace_cible is None:
+            continue
+        internes[espace_source].append(edge)
+        if espace_cible != espace_source:
+            internes[espace_cible].append(edge)
+            paire = (min(espace_source, espace_cible), max(espace_source, espace_cible))
+            raideur = edge.weight * params.link_types.get(edge.type, (1.0, 1.0))[0]
+            inter[paire] = inter.get(paire, 0.0) + raideur
+
+    # ── Phase 1 : espaces en parallèle ──────────────────
+    avancement: dict[str, dict] = {}
+    centres_depart = {
+        espace_id: (sum(node.x for node in membres) / len(membres), sum(node.y for node in membres) / len(membres))
+        for espace_id, membres in groupes.items()
+    }
+
+    def relais(espace_id: str) -> Callable[[dict], None]:
+        def recevoir(message: dict) -> None:
+            avancement[espace_id] = message
+            global_message = {
+                "iteration": sum(m["iteration"] for m in avancement.values()),
+                "iterations_max": sum(m["iterations_max"] for m in avancement.values())
+                + params.iterations * (len(groupes) - len(avancement)),
+                "temperature": max(m["temperature"] for m in avancement.values()),
+                "energie": sum(m["energie"] for m in avancement.values()),
+                "eta_s": max(m["eta_s"] for m in avancement.values()),
+            }
+            if "positions" in message:
+                positions = message["positions"]
+                cx, cy = centres_depart[espace_id]
+                dx = cx - sum(x for x, _ in positions.values()) / len(positions)
+                dy = cy - sum(y for _, y in positions.values()) / len(positions)
+                global_message["positions"] = {
+                    bloc_id: [round(x + dx, 1), round(y + dy, 1)] for bloc_id, (x, y) in positions.items()
+                }
+            on_progress(global_message)
+        return recevoir
+
+    places = asyncio.Semaphore(MAX_WORKERS)
+    iterations_phase1: dict[str, int] = {}
+
+    async def disposer(espace_id: str, membres: list[Node]):
+        espace_params = replace(params, multilevel=params.multilevel and len(membres) >= MULTINIVEAU_MIN_BLOCS)
+        bilan = LayoutStats()
+        async with places:
+            await executer_layout(
+                f"global:{espace_id}", membres, internes[espace_id], espace_params,
+                on_progress=relais(espace_id) if on_progress else None,
+                progression_toutes=progression_toutes, stats=bilan,
+            )
+        iterations_phase1[espace_id] = bilan.iterations
+
+    taches = [
+        asyncio.create_task(disposer(espace_id, membres))
+        for espace_id, membres in sorted(groupes.items(), key=lambda g: len(g[1]), reverse=True)
+    ]
+    try:
+        await asyncio.gather(*taches)
+    except BaseException:
+        for tache in taches:
+            tache.cancel()
+        raise
+
+    # ── Phase 2 : espaces rigides ───────────────────────
+    clusters = []
+    for espace_id, membres in groupes.items():
+        x0 = min(node.x - node.w / 2 for node in membres)
+        x1 = max(node.x + node.w / 2 for node in membres)
+        y0 = min(node.y - node.h / 2 for node in membres)
+        y1 = max(node.y + node.h / 2 for node in membres)
+        clusters.append(Node(
+            id=espace_id, x=(x0 + x1) / 2, y=(y0 + y1) / 2,
+            w=x1 - x0 + MARGE_ESPACE, h=y1 - y0 + MARGE_ESPACE,
+        ))
+    cluster_edges = [
+        Edge(source_id=a, target_id=b, weight=poids) for (a, b), poids in sorted(inter.items())
+    ]
+    centres = {cluster.id: (cluster.x, cluster.y) for cluster in clusters}
+    iterations_phase1_total = sum(m["iterations_max"] for m in avancement.values())
+
+    def relais_phase2(message: dict) -> None:
+        global_message = dict(
+            message,
+            iteration=iterations_phase1_total + message["iteration"],
+            iterations_max=iterations_phase1_total + message["iterations_max"],
+        )
+        if "positions" in message:
+            global_message["positions"] = {
+                node.id: [round(node.x + x - centres[espace_id][0], 1), round(node.y + y - centres[espace_id][1], 1)]
+                for espace_id, (x, y) in message["positions"].items()
+                for node in groupes[espace_id]
+            }
+        on_progress(global_message)
+
+    await executer_layout(
+        "global", clusters, cluster_edges, replace(params, multilevel=False),
+        on_progress=relais_phase2 if on_progress else None,
+        progression_toutes=progression_toutes, stats=stats,
+    )
+
+    for cluster in clusters:
+        cx, cy = centres[cluster.id]
+        for node in groupes[cluster.id]:
+            node.x += cluster.x - cx
+            node.y += cluster.y - cy
+    return max(iterations_phase1.values(), default=0)
+
+
+async def reorganiser_global(on_progress: Callable[[dict], None] | None = None,
+                             progression_toutes: int = 0, multiniveau: bool | None = None,
+                             par_espace: bool | None = None) -> str:
     """Positionne tous les blocs de tous les espaces dans le graphe global.
 
-    Utilise l'algorithme force-directed sur l'ensemble des blocs et liaisons.
-    Les blocs d'un même espace sont groupés en clusters naturellement
-    grâce aux liaisons intra-espace, tandis que les liaisons inter-espaces
-    créent des ponts entre clusters.
+    `par_espace` (défaut : dès qu'il y a plusieurs espaces) : layout en deux
+    phases, chaque espace disposé seul en parallèle puis placé comme un
+    cluster rigide d'après les liaisons inter-espaces (cf. _layout_par_espace).
+
+    Sinon, l'algorithme force-directed tourne sur l'ensemble des blocs et
+    liaisons : les blocs d'un même espace se groupent en clusters grâce aux
+    liaisons intra-espace, les liaisons inter-espaces créent des ponts.
 
     Les positions sont persistées dans x_global / y_global
     (indépendantes de x/y locaux).
+    `on_progress` / `progression_toutes` : cf. layout_executor.executer_layout.
+
+    `multiniveau` : si True, chaque espace est d'abord contracté en un
+    super-nœud (cf. simulate_multilevel) ; les clusters sont placés avant
+    l'affinage bloc par bloc. Si None, activé à partir de MULTINIVEAU_MIN_BLOCS
+    (en deux phases : pour chaque espace d'au moins MULTINIVEAU_MIN_BLOCS blocs).
     """
     db = await get_db()
 
     blocs = await db.execute_fetchall(
-        "SELECT id, x, y, x_global, y_global, largeur, hauteur, espace_id, titre_ia FROM blocs"
+        "SELECT id, x, y, x_global, y_global, largeur, hauteur, espace_id, titre_ia FROM blocs ORDER BY id"
     )
     if not blocs:
         return "Aucun bloc — rien à positionner."
 
     liaisons = await db.execute_fetchall(
-        "SELECT bloc_source_id, bloc_cible_id, poids FROM liaisons WHERE validation != 'rejete'"
+        """SELECT bloc_source_id, bloc_cible_id, type, poids, validation FROM liaisons
+           WHERE validation != 'rejete' ORDER BY id"""
     )
 
     nodes = [
@@ -315,13 +1907,11 @@ async def reorganiser_global() -> str:
             y=dict(b).get("y_global") or dict(b)["y"],
             w=dict(b).get("largeur", 200),
             h=dict(b).get("hauteur", 120),
+            group=dict(b)["espace_id"],
         )
         for b in blocs
     ]
-    edges = [
-        Edge(source_id=dict(l)["bloc_source_id"], target_id=dict(l)["bloc_cible_id"])
-        for l in liaisons
-    ]
+    edges = [_edge_liaison(dict(l)) for l in liaisons]
 
     # Paramètres adaptés au mode global (plus d'espace, gravité plus douce)
     params = ForceParams(
@@ -331,21 +1921,49 @@ async def reorganiser_global() -> str:
         iterations=400,
         initial_temperature=300.0,
         overlap_padding=50.0,
+        multilevel=multiniveau if multiniveau is not None else len(nodes) >= MULTINIVEAU_MIN_BLOCS,
+        seed=SEED_DEFAUT,
     )
 
-    result_nodes = simulate_forces(nodes, edges, params)
+    espace_ids = set(dict(b)["espace_id"] for b in blocs)
+    deux_phases = par_espace if par_espace is not None else len(espace_ids) > 1
+    cle_cache = "global:par_espace" if deux_phases else "global"
+
+    empreinte = empreinte_graphe(nodes, edges, params)
+    cache = await _layout_en_cache(cle_cache, empreinte)
+    if cache is not None:
+        now = datetime.now(timezone.utc).isoformat()
+        debut = time.perf_counter()
+        await ecrire_positions([(bloc_id, x, y) for bloc_id, (x, y) in cache.items()], globales=True)
+        await _enregistrer_disposition(cle_cache, now)
+        await db.commit()
+        duree_ecriture = time.perf_counter() - debut
+        return (f"✓ {len(cache)} blocs replacés dans le graphe global (graphe inchangé, layout en cache)."
+                f"\n  Positions enregistrées en {duree_ecriture * 1000:.0f} ms.")
+
+    stats = LayoutStats()
+    if deux_phases:
+        iterations_phase1 = await _layout_par_espace(nodes, edges, params, stats, on_progress, progression_toutes)
+        result_nodes = nodes
+    else:
+        from services.layout_executor import executer_layout
+        result_nodes = await executer_layout(
+            "global", nodes, edges, params,
+            on_progress=on_progress, progression_toutes=progression_toutes, stats=stats,
+        )
 
     now = datetime.now(timezone.utc).isoformat()
-    for node in result_nodes:
-        await db.execute(
-            "UPDATE blocs SET x_global = ?, y_global = ?, updated_at = ? WHERE id = ?",
-            (round(node.x, 1), round(node.y, 1), now, node.id),
-        )
+    debut = time.perf_counter()
+    await ecrire_positions([(node.id, node.x, node.y) for node in result_nodes], globales=True)
+    await _enregistrer_disposition(cle_cache, now)
+    await _mettre_en_cache(cle_cache, empreinte, result_nodes)
     await db.commit()
+    duree_ecriture = time.perf_counter() - debut
 
-    espace_ids = set(dict(b)["espace_id"] for b in blocs)
     central = max(result_nodes, key=lambda n: n.degree) if result_nodes else None
-    summary = f"✓ {len(result_nodes)} blocs positionnés dans le graphe global ({len(espace_ids)} espaces)."
+    modes = (["par espace"] if deux_phases else []) + (["multiniveau"] if params.multilevel else [])
+    summary = f"✓ {len(result_nodes)} blocs positionnés dans le graphe global ({len(espace_ids)} espaces"
+    summary += f", {', '.join(modes)})." if modes else ")."
     if central and central.degree > 0:
         for b in blocs:
             b = dict(b)
@@ -353,4 +1971,10 @@ async def reorganiser_global() -> str:
                 summary += f'\n  Nœud central : "{b.get("titre_ia", "?")}" ({central.degree} connexions)'
                 break
     summary += f"\n  {len(edges)} liaisons traitées."
+    if deux_phases:
+        summary += f"\n  Phase 1 (espaces en parallèle) : jusqu'à {iterations_phase1} itérations."
+        summary += f"\n  Phase 2 (placement des espaces) : {_resume_convergence(stats).strip()}"
+    else:
+        summary += _resume_convergence(stats)
+    summary += f"\n  Positions enregistrées en {duree_ecriture * 1000:.0f} ms."
     return summary
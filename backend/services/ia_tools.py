@@ -11,12 +11,14 @@ En V1, on exécute directement (l'utilisateur a déjà validé en posant la ques
 En V2, on ajoutera un mode "proposition" avec validation explicite.
 """
 
+import asyncio
 import uuid
 import json
 import os
 from datetime import datetime, timezone
 
 from db.database import get_db
+from services.meta_graphe import planifier_suggestions
 
 
 # ═══════════════════════════════════════════════════════════
@@ -333,6 +335,7 @@ async def execute_tool(espace_id: str, tool_name: str, arguments: dict) -> str:
                 )
 
             await db.commit()
+            planifier_suggestions([bloc_id])
             return f"✓ Bloc créé : \"{titre}\" [{couleur}/{forme}] à position ({x:.0f}, {y:.0f})"
 
         elif tool_name == "creer_liaison":
@@ -370,6 +373,10 @@ async def execute_tool(espace_id: str, tool_name: str, arguments: dict) -> str:
             if "nouveau_titre" in arguments and arguments["nouveau_titre"]:
                 updates.append("titre_ia = ?")
                 params.append(arguments["nouveau_titre"])
+                # Termes changés : recalculés par le méta-graphe
+                updates.append("termes = NULL")
+                updates.append("termes_updated_at = NULL")
+                updates.append("signature_minhash = NULL")
             if "nouvelle_couleur" in arguments and arguments["nouvelle_couleur"]:
                 updates.append("couleur = ?")
                 params.append(arguments["nouvelle_couleur"])
@@ -448,9 +455,15 @@ async def execute_tool(espace_id: str, tool_name: str, arguments: dict) -> str:
             return "\n".join(lines)
 
         elif tool_name == "reorganiser_graphe":
-            from services.force_layout import reorganiser_espace
-            result = await reorganiser_espace(espace_id)
-            return result
+            # Job de layout, comme depuis l'interface : progression suivie via
+            # /layouts/{job_id}. L'outil attend son résultat pour le rapporter ;
+            # une réponse abandonnée n'interrompt pas le job.
+            from services.layout_jobs import lancer_layout
+            job = lancer_layout("espace", espace_id)
+            await asyncio.shield(job.tache)
+            if job.statut != "termine":
+                return f"✗ Réorganisation {job.statut} : {job.erreur}"
+            return job.resultat
 
         elif tool_name == "importer_youtube":
             from services.import_parser import parse_youtube_url
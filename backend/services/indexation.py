@@ -5,6 +5,7 @@ from datetime import datetime, timezone
 
 from db.database import get_db
 from services.ia_routeur import call_ia
+from services.meta_graphe import oublier_paires_evaluees, planifier_suggestions, signature_minhash, termes_bloc
 
 SYSTEM_PROMPT = """Tu es un indexeur sémantique. Pour le texte fourni, génère un JSON avec exactement ces 4 clés :
 - "titre_ia": un titre synthétique (max 10 mots)
@@ -18,6 +19,10 @@ Réponds UNIQUEMENT avec le JSON, sans markdown, sans explication."""
 async def indexer_bloc(bloc_id: str) -> bool:
     """Indexe un bloc : génère titre_ia, resume_ia, entités, mots-clés.
 
+    Les suggestions inter-espaces du bloc sont recalculées ensuite, en tâche
+    de fond (lui seul contre les autres espaces, cf.
+    meta_graphe.planifier_suggestions) : leur échec n'affecte pas le résultat.
+
     Retourne True si l'indexation a réussi, False sinon (IA non configurée ou erreur).
     """
     db = await get_db()
@@ -57,11 +62,17 @@ async def indexer_bloc(bloc_id: str) -> bool:
     resume_ia = data.get("resume_ia", "")
     entites = json.dumps(data.get("entites", []), ensure_ascii=False)
     mots_cles = json.dumps(data.get("mots_cles", []), ensure_ascii=False)
+    termes = termes_bloc({"titre_ia": titre_ia, "entites": entites, "mots_cles": mots_cles})
     now = datetime.now(timezone.utc).isoformat()
 
     await db.execute(
-        "UPDATE blocs SET titre_ia = ?, resume_ia = ?, entites = ?, mots_cles = ?, updated_at = ? WHERE id = ?",
-        (titre_ia, resume_ia, entites, mots_cles, now, bloc_id),
+        """UPDATE blocs SET titre_ia = ?, resume_ia = ?, entites = ?, mots_cles = ?,
+           termes = ?, signature_minhash = ?, termes_updated_at = ?, updated_at = ? WHERE id = ?""",
+        (titre_ia, resume_ia, entites, mots_cles, json.dumps(termes, ensure_ascii=False),
+         signature_minhash(termes), now, now, bloc_id),
     )
+    await oublier_paires_evaluees([bloc_id])
     await db.commit()
+
+    planifier_suggestions([bloc_id])
     return True
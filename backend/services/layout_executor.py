@@ -0,0 +1,370 @@
+"""Service Layout Executor — Calcul des layouts hors de la boucle d'événements.
+
+simulate_forces est purement CPU : exécutée dans un handler async, elle gèle
+toutes les autres requêtes du serveur. Ce module la déporte dans un pool de
+processus :
+
+- Les jobs reçoivent des tableaux simples (positions, tailles, liaisons en
+  indices) et retournent des positions — aucun objet DB ne traverse le pool.
+- File d'attente bornée : au-delà de MAX_JOBS_EN_COURS, la soumission échoue
+  immédiatement (FileLayoutPleine) plutôt que d'empiler du travail.
+- Une clé par cible (ex. "espace:<id>", "global") : soumettre un nouveau
+  layout pour la même clé annule le précédent (LayoutRemplace).
+- Délai max par job (LayoutExpire) ; le worker est prévenu et s'arrête à
+  l'itération suivante.
+
+L'annulation d'un job déjà démarré passe par un tableau partagé de drapeaux,
+transmis aux workers à leur création (un slot par job en vol). La progression
+(itération, température, énergie, ETA, positions intermédiaires) remonte par
+une file multiprocessing partagée, lue par un thread qui la réinjecte dans la
+boucle d'événements.
+"""
+
+import asyncio
+import math
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+
+from services.force_layout import (
+    Edge,
+    ForceParams,
+    IterationInfo,
+    LayoutStats,
+    Node,
+    simulate_forces,
+    simulate_incremental,
+    simulate_multilevel,
+)
+
+
+# ═══════════════════════════════════════════════════════════
+#  CONFIGURATION
+# ═══════════════════════════════════════════════════════════
+
+# Processus de calcul (on laisse un cœur au serveur)
+MAX_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+# Jobs en vol (en cours + en attente) au-delà desquels on refuse
+MAX_JOBS_EN_COURS = MAX_WORKERS + 8
+
+# Délai max d'un layout, en secondes
+TIMEOUT_JOB_S = 180.0
+
+# Intervalle min entre deux messages de progression sans positions, en secondes
+PROGRESSION_INTERVALLE_S = 0.25
+
+
+class FileLayoutPleine(RuntimeError):
+    """Trop de layouts en attente."""
+
+
+class LayoutRemplace(RuntimeError):
+    """Le layout a été annulé par une soumission plus récente sur la même clé."""
+
+
+class LayoutExpire(RuntimeError):
+    """Le layout a dépassé son délai maximal."""
+
+
+# ═══════════════════════════════════════════════════════════
+#  CÔTÉ WORKER
+# ═══════════════════════════════════════════════════════════
+
+# Drapeaux d'annulation et file de progression partagés, hérités par chaque
+# worker à sa création
+_drapeaux_annulation = None
+_file_progression_worker = None
+
+
+def _init_worker(drapeaux, file_progression):
+    global _drapeaux_annulation, _file_progression_worker
+    _drapeaux_annulation = drapeaux
+    _file_progression_worker = file_progression
+
+
+def _iterations_prevues(params: ForceParams) -> int:
+    """Nombre d'itérations avant que le refroidissement n'arrête la simulation."""
+    if params.cooling_factor >= 1.0 or params.initial_temperature <= params.min_temperature:
+        return params.iterations
+    if params.min_temperature <= 0.0:
+        return params.iterations
+    refroidissement = math.log(params.min_temperature / params.initial_temperature) / math.log(params.cooling_factor)
+    return max(1, min(params.iterations, math.ceil(refroidissement)))
+
+
+def _executer_layout(slot: int, payload: dict, params: ForceParams,
+                     suivi_id: str | None = None, progression_toutes: int = 0) -> dict:
+    """Exécute une simulation dans un worker. Fonction de module (picklable).
+
+    `payload` : x, y, w, h, group, fixed (listes parallèles), edges (paires
+    d'indices ; -1 pour une extrémité hors du graphe, comptée dans le degré
+    de l'autre nœud comme dans simulate_forces), weights et types (parallèles
+    à edges), modifies (indices, ou None hors layout incrémental).
+
+    Si `suivi_id` est fourni, la progression est publiée sur la file partagée,
+    avec les positions toutes les `progression_toutes` itérations (0 = jamais).
+    """
+    nodes = [
+        Node(id=str(i), x=x, y=y, w=w, h=h, group=group, fixed=fixed)
+        for i, (x, y, w, h, group, fixed) in enumerate(
+            zip(payload["x"], payload["y"], payload["w"], payload["h"], payload["group"], payload["fixed"])
+        )
+    ]
+    edges = [
+        Edge(source_id=str(s) if s >= 0 else "", target_id=str(t) if t >= 0 else "",
+             weight=weight, type=type_liaison)
+        for (s, t), weight, type_liaison in zip(payload["edges"], payload["weights"], payload["types"])
+    ]
+
+    debut = time.perf_counter()
+    dernier_envoi = 0.0
+    if payload["modifies"] is not None:
+        iterations_prevues = _iterations_prevues(replace(
+            params, iterations=params.incremental_iterations, initial_temperature=params.incremental_temperature,
+        ))
+    else:
+        iterations_prevues = _iterations_prevues(params)
+
+    def on_iteration(info: IterationInfo) -> bool:
+        nonlocal dernier_envoi
+        if suivi_id is not None:
+            maintenant = time.perf_counter()
+            avec_positions = progression_toutes > 0 and info.iteration % progression_toutes == 0
+            if avec_positions or maintenant - dernier_envoi >= PROGRESSION_INTERVALLE_S:
+                dernier_envoi = maintenant
+                ecoule = maintenant - debut
+                # Multiniveau : le budget total n'est connu qu'une fois le graphe contracté
+                iterations_max = info.iterations_max if params.multilevel else iterations_prevues
+                restantes = max(0, iterations_max - info.iteration)
+                message = {
+                    "iteration": info.iteration,
+                    "iterations_max": iterations_max,
+                    "temperature": info.temperature,
+                    "energie": info.energy,
+                    "eta_s": ecoule / info.iteration * restantes,
+                }
+                if avec_positions:
+                    message["positions"] = info.positions()
+                _file_progression_worker.put((suivi_id, message))
+        return bool(_drapeaux_annulation[slot])
+
+    stats = LayoutStats()
+    actifs = None
+    if payload["modifies"] is not None:
+        modifies = {str(i) for i in payload["modifies"]}
+        simules = simulate_incremental(nodes, edges, modifies, params, on_iteration=on_iteration, stats=stats)
+        actifs = [int(node.id) for node in simules]
+    else:
+        simulate = simulate_multilevel if params.multilevel else simulate_forces
+        simulate(nodes, edges, params, on_iteration=on_iteration, stats=stats)
+    return {
+        "annule": bool(_drapeaux_annulation[slot]),
+        "stats": stats,
+        "x": [node.x for node in nodes],
+        "y": [node.y for node in nodes],
+        "degree": [node.degree for node in nodes],
+        "actifs": actifs,
+    }
+
+
+# ═══════════════════════════════════════════════════════════
+#  CÔTÉ SERVEUR
+# ═══════════════════════════════════════════════════════════
+
+_pool: ProcessPoolExecutor | None = None
+_drapeaux = None
+_file_progression = None
+_slots_libres: list[int] = []
+# Clé → (slot, future) du job le plus récent pour cette clé
+_jobs_par_cle: dict[str, tuple[int, Future]] = {}
+# Identifiant de suivi → callback de progression (appelé dans la boucle d'événements)
+_suivis: dict[str, Callable[[dict], None]] = {}
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool, _drapeaux, _file_progression, _slots_libres
+    if _pool is None:
+        _drapeaux = multiprocessing.Array("b", MAX_JOBS_EN_COURS, lock=False)
+        _file_progression = multiprocessing.Queue()
+        _slots_libres = list(range(MAX_JOBS_EN_COURS))
+        _jobs_par_cle.clear()
+        _pool = ProcessPoolExecutor(
+            max_workers=MAX_WORKERS,
+            initializer=_init_worker,
+            initargs=(_drapeaux, _file_progression),
+        )
+        threading.Thread(
+            target=_lire_progressions,
+            args=(_file_progression, asyncio.get_running_loop()),
+            name="layout-progression",
+            daemon=True,
+        ).start()
+    return _pool
+
+
+def _lire_progressions(file_progression, loop: asyncio.AbstractEventLoop) -> None:
+    """Thread lecteur : transfère les messages des workers vers la boucle."""
+    while True:
+        message = file_progression.get()
+        if message is None:
+            return
+        try:
+            loop.call_soon_threadsafe(_diffuser_progression, *message)
+        except RuntimeError:  # boucle fermée
+            return
+
+
+def _diffuser_progression(suivi_id: str, message: dict) -> None:
+    callback = _suivis.get(suivi_id)
+    if callback is not None:
+        callback(message)
+
+
+def capacite_disponible() -> bool:
+    """True si un nouveau layout peut être soumis sans être refusé."""
+    return _pool is None or bool(_slots_libres)
+
+
+def arreter_layout_executor() -> None:
+    """Arrête le pool (appelé à l'arrêt du serveur)."""
+    global _pool
+    if _pool is not None:
+        for slot in range(MAX_JOBS_EN_COURS):
+            _drapeaux[slot] = 1
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _file_progression.put(None)
+        _pool = None
+
+
+def _liberer_slot(pool: ProcessPoolExecutor, slot: int) -> None:
+    # Un slot n'est rendu qu'une fois le worker réellement terminé : son
+    # drapeau ne peut pas être réarmé sous les pieds d'un job encore actif.
+    if pool is _pool:
+        _slots_libres.append(slot)
+
+
+def _serialiser(nodes: list[Node], edges: list[Edge], modifies: set[str] | None = None) -> dict:
+    index = {node.id: i for i, node in enumerate(nodes)}
+    return {
+        "x": [node.x for node in nodes],
+        "y": [node.y for node in nodes],
+        "w": [node.w for node in nodes],
+        "h": [node.h for node in nodes],
+        "group": [node.group for node in nodes],
+        "fixed": [node.fixed for node in nodes],
+        "edges": [(index.get(e.source_id, -1), index.get(e.target_id, -1)) for e in edges],
+        "weights": [e.weight for e in edges],
+        "types": [e.type for e in edges],
+        "modifies": None if modifies is None else sorted(index[i] for i in modifies if i in index),
+    }
+
+
+async def executer_layout(cle: str, nodes: list[Node], edges: list[Edge],
+                          params: ForceParams | None = None,
+                          timeout: float = TIMEOUT_JOB_S,
+                          on_progress: Callable[[dict], None] | None = None,
+                          progression_toutes: int = 0,
+                          stats: LayoutStats | None = None,
+                          modifies: set[str] | None = None) -> list[Node]:
+    """Calcule le layout dans le pool et écrit les positions dans `nodes`.
+
+    `on_progress` reçoit {iteration, iterations_max, temperature, energie,
+    eta_s} et, toutes les `progression_toutes` itérations, `positions`
+    ({bloc_id: [x, y]}). `stats`, si fourni, reçoit le bilan de la simulation.
+
+    `modifies`, si fourni : layout incrémental (cf. simulate_incremental),
+    seuls ces nœuds et leur voisinage bougent. Retourne alors les seuls
+    nœuds simulés, sinon `nodes`.
+
+    Lève FileLayoutPleine, LayoutRemplace ou LayoutExpire.
+    """
+    if params is None:
+        params = ForceParams()
+    if not nodes:
+        return nodes
+
+    pool = _get_pool()
+    if not _slots_libres:
+        raise FileLayoutPleine(f"Trop de layouts en cours ({MAX_JOBS_EN_COURS}), réessayez plus tard.")
+
+    # Une soumission plus récente sur la même clé annule la précédente
+    precedent = _jobs_par_cle.get(cle)
+    if precedent is not None:
+        _drapeaux[precedent[0]] = 1
+        precedent[1].cancel()  # sans effet si le worker l'a déjà démarré
+
+    slot = _slots_libres.pop(0)
+    _drapeaux[slot] = 0
+    loop = asyncio.get_running_loop()
+
+    suivi_id = None
+    if on_progress is not None:
+        suivi_id = uuid.uuid4().hex
+        ids = [node.id for node in nodes]
+
+        def relayer(message: dict) -> None:
+            if "positions" in message:
+                xs, ys = message["positions"]
+                message["positions"] = {
+                    bloc_id: [round(x, 1), round(y, 1)] for bloc_id, x, y in zip(ids, xs, ys)
+                }
+            on_progress(message)
+
+        _suivis[suivi_id] = relayer
+
+    try:
+        future = pool.submit(
+            _executer_layout, slot, _serialiser(nodes, edges, modifies), params, suivi_id, progression_toutes
+        )
+    except BrokenProcessPool:
+        # Un worker est mort (mémoire, kill) : on repartira d'un pool neuf
+        arreter_layout_executor()
+        _suivis.pop(suivi_id, None)
+        raise
+    future.add_done_callback(lambda f: loop.call_soon_threadsafe(_liberer_slot, pool, slot))
+    _jobs_par_cle[cle] = (slot, future)
+
+    try:
+        result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except asyncio.TimeoutError:
+        _drapeaux[slot] = 1
+        raise LayoutExpire(f"Layout interrompu après {timeout:g} s ({len(nodes)} blocs).")
+    except asyncio.CancelledError:
+        if future.cancelled() and _drapeaux[slot]:
+            raise LayoutRemplace("Layout remplacé par une demande plus récente.")
+        # Requête abandonnée par le client : inutile de continuer le calcul
+        _drapeaux[slot] = 1
+        raise
+    except BrokenProcessPool:
+        arreter_layout_executor()
+        raise
+    finally:
+        if _jobs_par_cle.get(cle, (None,))[0] == slot:
+            del _jobs_par_cle[cle]
+        _suivis.pop(suivi_id, None)
+
+    if result["annule"]:
+        raise LayoutRemplace("Layout remplacé par une demande plus récente.")
+
+    for node, x, y, degree in zip(nodes, result["x"], result["y"], result["degree"]):
+        node.x = x
+        node.y = y
+        node.degree = degree
+    if stats is not None:
+        bilan = result["stats"]
+        stats.iterations = bilan.iterations
+        stats.energy = bilan.energy
+        stats.max_displacement = bilan.max_displacement
+        stats.converged = bilan.converged
+        stats.arret = bilan.arret
+        stats.overlaps = bilan.overlaps
+    if result["actifs"] is not None:
+        return [nodes[i] for i in result["actifs"]]
+    return nodes
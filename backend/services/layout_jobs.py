@@ -0,0 +1,192 @@
+"""Service Layout Jobs — Réorganisations asynchrones suivies par identifiant.
+
+Un layout lancé en job rend la main immédiatement : le calcul tourne dans
+l'exécuteur de layouts et sa progression est consultable à tout moment
+(état courant) ou suivie en direct par Server-Sent Events :
+
+    event: progression   → iteration, iterations_max, temperature, energie,
+                           eta_s, et `positions` toutes les N itérations
+    event: fin           → état final (statut, resultat ou erreur)
+
+Les jobs vivent en mémoire : seuls les MAX_JOBS_CONSERVES plus récents
+sont gardés, un redémarrage du serveur les oublie.
+"""
+
+import asyncio
+import json
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from services.force_layout import reorganiser_espace, reorganiser_global
+from services.layout_executor import LayoutRemplace
+
+
+# ═══════════════════════════════════════════════════════════
+#  CONFIGURATION
+# ═══════════════════════════════════════════════════════════
+
+# Jobs terminés conservés pour consultation
+MAX_JOBS_CONSERVES = 20
+
+# Positions intermédiaires publiées toutes les N itérations
+PROGRESSION_TOUTES_DEFAUT = 10
+
+# Événements en attente par abonné SSE (les plus anciens sont écartés)
+TAILLE_FILE_ABONNE = 32
+
+# Commentaire SSE envoyé en l'absence d'événement, en secondes
+KEEPALIVE_S = 15.0
+
+
+@dataclass
+class LayoutJob:
+    id: str
+    scope: str                       # 'espace' | 'global'
+    espace_id: str | None = None
+    statut: str = "en_attente"       # en_attente | en_cours | termine | annule | erreur
+    iteration: int = 0
+    iterations_max: int = 0
+    temperature: float | None = None
+    energie: float | None = None
+    eta_s: float | None = None
+    positions: dict[str, list[float]] | None = None
+    positions_iteration: int = 0
+    resultat: str | None = None
+    erreur: str | None = None
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    abonnes: list[asyncio.Queue] = field(default_factory=list, repr=False)
+    tache: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def termine(self) -> bool:
+        return self.statut in ("termine", "annule", "erreur")
+
+    def etat(self, avec_positions: bool = False) -> dict:
+        etat = {
+            "job_id": self.id,
+            "scope": self.scope,
+            "espace_id": self.espace_id,
+            "statut": self.statut,
+            "iteration": self.iteration,
+            "iterations_max": self.iterations_max,
+            "temperature": self.temperature,
+            "energie": self.energie,
+            "eta_s": self.eta_s,
+            "positions_iteration": self.positions_iteration,
+            "resultat": self.resultat,
+            "erreur": self.erreur,
+            "created_at": self.created_at,
+        }
+        if avec_positions:
+            etat["positions"] = self.positions
+        return etat
+
+    def _publier(self, evenement: str, data: dict) -> None:
+        for file in self.abonnes:
+            if file.full():
+                file.get_nowait()
+            file.put_nowait((evenement, data))
+
+
+_jobs: dict[str, LayoutJob] = {}
+# Références fortes vers les tâches en cours (sinon collectables par le GC)
+_taches: set[asyncio.Task] = set()
+
+
+def get_job(job_id: str) -> LayoutJob | None:
+    return _jobs.get(job_id)
+
+
+def _enregistrer(job: LayoutJob) -> None:
+    _jobs[job.id] = job
+    termines = [j for j in _jobs.values() if j.termine]
+    for ancien in termines[: max(0, len(termines) - MAX_JOBS_CONSERVES)]:
+        del _jobs[ancien.id]
+
+
+# ═══════════════════════════════════════════════════════════
+#  LANCEMENT
+# ═══════════════════════════════════════════════════════════
+
+def lancer_layout(scope: str, espace_id: str | None = None,
+                  progression_toutes: int = PROGRESSION_TOUTES_DEFAUT,
+                  multiniveau: bool | None = None, par_espace: bool | None = None,
+                  incremental: bool | None = None, seed: int | None = None) -> LayoutJob:
+    """Crée un job de layout et le démarre en tâche de fond.
+
+    `multiniveau` et `par_espace` ne concernent que le scope global
+    (cf. reorganiser_global), `incremental` et `seed` le scope espace
+    (cf. reorganiser_espace). `job.tache` se termine avec le job.
+    """
+    job = LayoutJob(id=str(uuid.uuid4()), scope=scope, espace_id=espace_id)
+    _enregistrer(job)
+    job.tache = asyncio.create_task(
+        _executer(job, progression_toutes, multiniveau, par_espace, incremental, seed)
+    )
+    _taches.add(job.tache)
+    job.tache.add_done_callback(_taches.discard)
+    return job
+
+
+async def _executer(job: LayoutJob, progression_toutes: int, multiniveau: bool | None = None,
+                    par_espace: bool | None = None, incremental: bool | None = None,
+                    seed: int | None = None) -> None:
+    def on_progress(message: dict) -> None:
+        job.statut = "en_cours"
+        job.iteration = message["iteration"]
+        job.iterations_max = message["iterations_max"]
+        job.temperature = message["temperature"]
+        job.energie = message["energie"]
+        job.eta_s = message["eta_s"]
+        if "positions" in message:
+            job.positions = message["positions"]
+            job.positions_iteration = message["iteration"]
+        job._publier("progression", message)
+
+    try:
+        if job.scope == "global":
+            job.resultat = await reorganiser_global(on_progress, progression_toutes, multiniveau, par_espace)
+        else:
+            job.resultat = await reorganiser_espace(job.espace_id, on_progress, progression_toutes,
+                                                    incremental=incremental, seed=seed)
+        job.statut = "termine"
+        job.eta_s = 0.0
+    except LayoutRemplace as e:
+        job.statut = "annule"
+        job.erreur = str(e)
+    except Exception as e:
+        job.statut = "erreur"
+        job.erreur = str(e)
+    job._publier("fin", job.etat())
+
+
+# ═══════════════════════════════════════════════════════════
+#  FLUX SSE
+# ═══════════════════════════════════════════════════════════
+
+def _sse(evenement: str, data: dict) -> str:
+    return f"event: {evenement}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+async def flux_sse(job: LayoutJob):
+    """Générateur Server-Sent Events : état initial, progression, puis fin."""
+    file: asyncio.Queue = asyncio.Queue(maxsize=TAILLE_FILE_ABONNE)
+    job.abonnes.append(file)
+    try:
+        if job.termine:
+            yield _sse("fin", job.etat())
+            return
+        yield _sse("progression", job.etat(avec_positions=True))
+
+        while True:
+            try:
+                evenement, data = await asyncio.wait_for(file.get(), KEEPALIVE_S)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse(evenement, data)
+            if evenement == "fin":
+                return
+    finally:
+        job.abonnes.remove(file)
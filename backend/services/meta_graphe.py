@@ -13,11 +13,41 @@ Heuristiques (cf. CENTRAL.md §5.11) :
 - Blocs violet/bleu résonnants → analogie
 - Espaces isolés (aucune liaison inter) → signalement
 - Dépendances structurelles → dependance
+
+Score d'une paire : cosinus des vecteurs TF-IDF de leurs termes, les
+fréquences documentaires venant de la table frequences_termes (tenue à jour
+par triggers à chaque écriture de blocs.termes).
+
+Paires candidates : index inversé des termes (exact, par défaut). Les seaux
+LSH sur les signatures MinHash (candidats="lsh") restent désactivés par
+défaut et ne sont pas exposés par l'API : sur bench_meta_graphe, ils sont
+plus lents que l'index à 500 et 2000 blocs (231 ms contre 57, 1002 contre
+672) et ne retrouvent que 78 % puis 45 % des suggestions (100 % des fortes) ;
+à 5000 blocs, le gain (2,3 s contre 2,6) ne compense pas un rappel de 39 %.
+Les signatures servent à la détection de quasi-doublons entre espaces.
+
+Passages incrémentaux : un bloc créé ou réindexé est évalué seul contre les
+autres espaces (suggerer_pour_blocs) ; le passage global ne réévalue que les
+blocs dont les termes ont changé depuis le précédent (passages_meta_graphe).
+Entre deux passages globaux, les paires évaluées sous le seuil par les
+passages par bloc sont mémorisées (paires_evaluees) avec la version des
+termes de leurs blocs : le passage global suivant ne les réévalue pas. Les
+paires déjà liées, suggestions rejetées comprises (validation='rejete'), ne
+sont jamais réévaluées.
 """
 
+import asyncio
+import hashlib
+import heapq
 import json
+import math
+import random
 import uuid
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator
 from datetime import datetime, timezone
+from itertools import islice
 
 from db.database import get_db
 
@@ -26,36 +56,165 @@ from db.database import get_db
 #  HEURISTIQUES LOCALES (sans appel LLM)
 # ═══════════════════════════════════════════════════════════
 
-async def detecter_suggestions_inter_espaces() -> list[dict]:
+# Un terme partagé par plus de blocs que cela (mot vide, thème omniprésent)
+# ne génère plus de paires candidates : il coûterait O(k²) évaluations pour
+# des rapprochements sans valeur. Il compte toujours dans l'intersection des
+# paires rapprochées par d'autres termes.
+MAX_BLOCS_PAR_TERME = 500
+
+# Générateurs de paires candidates (cf. _iter_suggestions). "lsh" n'est
+# utilisé que par le benchmark : plus lent que l'index et de rappel partiel
+CANDIDATS = ("index", "lsh")
+
+# Similarité TF-IDF (cosinus) minimale pour suggérer une liaison, et au-delà
+# de laquelle deux blocs se prolongent
+SEUIL_SIMILARITE = 0.2
+SEUIL_PROLONGEMENT = 0.4
+
+# Clé du passage global dans passages_meta_graphe
+CLE_PASSAGE_SUGGESTIONS = "suggestions"
+
+
+async def _completer_termes():
+    """Calcule et enregistre termes et signatures manquants.
+
+    Blocs créés hors indexer_bloc, titre modifié : termes_updated_at est
+    renseigné, updated_at n'est pas touché. La signature n'entre pas dans
+    le filtre : elle reste NULL pour un bloc sans termes, qui serait sinon
+    recalculé (et ses paires oubliées) à chaque appel.
+    """
+    db = await get_db()
+    rows = await db.execute_fetchall(
+        """SELECT id, titre_ia, entites, mots_cles FROM blocs
+           WHERE termes IS NULL OR termes_updated_at IS NULL"""
+    )
+    if not rows:
+        return
+    now = datetime.now(timezone.utc).isoformat()
+    manquants = []
+    for row in rows:
+        termes = termes_bloc(dict(row))
+        manquants.append((json.dumps(termes, ensure_ascii=False), signature_minhash(termes), now, row["id"]))
+    # Un bloc indexé entre la lecture et l'écriture (passage par bloc en
+    # tâche de fond) garde ses termes
+    await db.executemany(
+        """UPDATE blocs SET termes = ?, signature_minhash = ?, termes_updated_at = ?
+           WHERE id = ? AND (termes IS NULL OR termes_updated_at IS NULL)""",
+        manquants,
+    )
+    await oublier_paires_evaluees([m[-1] for m in manquants])
+    await db.commit()
+
+
+async def _charger_blocs(voisins_de: set[str] | None = None) -> list[dict]:
+    """Blocs avec espace, métadonnées IA, termes normalisés et signature MinHash.
+
+    `termes` est décodé en liste, `version_termes` en est tiré (cf.
+    _version_termes). Avec `voisins_de`, seuls ces blocs et ceux
+    qui partagent au moins un terme avec eux sont chargés : les voisins sont
+    lus dans l'index terme → blocs (table termes_blocs, par sa clé), en temps
+    proportionnel aux blocs des termes des cibles, sans parcourir la table
+    blocs ni décoder les termes des autres blocs. Tous les blocs d'un terme
+    des cibles sont chargés, la taille de ses groupes est donc inchangée.
+    """
+    await _completer_termes()
+    db = await get_db()
+    colonnes = """b.id, b.espace_id, b.couleur, b.forme, b.titre_ia, b.resume_ia,
+                  b.entites, b.mots_cles, b.termes, b.signature_minhash"""
+    if voisins_de is None:
+        blocs = await db.execute_fetchall(f"SELECT {colonnes} FROM blocs b ORDER BY b.espace_id")
+    else:
+        ids = json.dumps(sorted(voisins_de))
+        blocs = await db.execute_fetchall(
+            f"""WITH cibles AS (SELECT value AS id FROM json_each(?)),
+                termes_cibles AS (
+                    SELECT DISTINCT terme FROM termes_blocs
+                    WHERE bloc_id IN (SELECT id FROM cibles)
+                )
+                SELECT {colonnes} FROM blocs b
+                WHERE b.id IN (
+                    SELECT id FROM cibles
+                    UNION
+                    SELECT bloc_id FROM termes_blocs
+                    WHERE terme IN (SELECT terme FROM termes_cibles)
+                )
+                ORDER BY b.espace_id""",
+            (ids,),
+        )
+    blocs_list = [dict(b) for b in blocs]
+    for b in blocs_list:
+        b["version_termes"] = _version_termes(b["termes"])
+        b["termes"] = json.loads(b["termes"])
+    return blocs_list
+
+
+async def _paires_existantes(cibles: set[str] | None = None) -> set[tuple]:
+    """Paires (triées) de blocs déjà liés, quelle que soit la validation.
+
+    Avec `cibles`, seules les liaisons qui touchent l'un de ces blocs.
+    """
+    db = await get_db()
+    if cibles is None:
+        liaisons_existantes = await db.execute_fetchall(
+            "SELECT bloc_source_id, bloc_cible_id FROM liaisons"
+        )
+    else:
+        ids = json.dumps(sorted(cibles))
+        liaisons_existantes = await db.execute_fetchall(
+            """SELECT bloc_source_id, bloc_cible_id FROM liaisons
+               WHERE bloc_source_id IN (SELECT value FROM json_each(?))
+                  OR bloc_cible_id IN (SELECT value FROM json_each(?))""",
+            (ids, ids),
+        )
+    return {tuple(sorted([l["bloc_source_id"], l["bloc_cible_id"]])) for l in liaisons_existantes}
+
+
+async def detecter_suggestions_inter_espaces(candidats: str = "index", cibles: set[str] | None = None,
+                                             sous_seuil: list[tuple[dict, dict]] | None = None) -> list[dict]:
     """Détecte des connexions potentielles entre espaces par heuristiques.
 
     Retourne une liste de suggestions (non encore persistées).
     Chaque suggestion = {
         bloc_source_id, bloc_cible_id, type, poids, justification
     }
+    `candidats` : "index" (toutes les paires qui partagent un terme, par
+    défaut) ou "lsh" (paires de même seau MinHash, approché ; désactivé par
+    défaut, cf. docstring du module).
+    `cibles` : si fourni, seules les paires qui touchent l'un de ces blocs
+    sont évaluées. Les paires évaluées sans suggestion sont ajoutées à
+    `sous_seuil` s'il est fourni.
     """
-    db = await get_db()
+    return list(await flux_suggestions_inter_espaces(candidats, cibles, sous_seuil))
 
-    # Charger tous les blocs avec leur espace et métadonnées IA
-    blocs = await db.execute_fetchall(
-        """SELECT id, espace_id, couleur, forme, titre_ia, resume_ia,
-                  entites, mots_cles
-           FROM blocs ORDER BY espace_id"""
-    )
-    blocs_list = [dict(b) for b in blocs]
+
+async def flux_suggestions_inter_espaces(candidats: str = "index", cibles: set[str] | None = None,
+                                         sous_seuil: list[tuple[dict, dict]] | None = None) -> Iterator[dict]:
+    """detecter_suggestions_inter_espaces, sous forme de flux.
+
+    Les blocs et paires existantes sont chargés avant le retour ; les
+    suggestions sont produites à mesure que le flux est consommé (et
+    `sous_seuil` rempli de même).
+    """
+    if candidats not in CANDIDATS:
+        raise ValueError(f"Générateur de candidats inconnu : {candidats}")
+
+    # Charger les blocs avec leur espace et métadonnées IA. Avec l'index, une
+    # cible n'est rapprochée que des blocs qui partagent un de ses termes :
+    # inutile de charger les autres
+    voisins_de = cibles if candidats == "index" else None
+    blocs_list = await _charger_blocs(voisins_de)
 
     if len(blocs_list) < 2:
-        return []
+        return iter(())
 
-    # Charger les liaisons existantes pour éviter les doublons
-    liaisons_existantes = await db.execute_fetchall(
-        "SELECT bloc_source_id, bloc_cible_id FROM liaisons"
-    )
-    paires_existantes = set()
-    for l in liaisons_existantes:
-        l = dict(l)
-        pair = tuple(sorted([l["bloc_source_id"], l["bloc_cible_id"]]))
-        paires_existantes.add(pair)
+    # Liaisons existantes, pour éviter les doublons, et paires déjà évaluées
+    # sous le seuil avec les mêmes termes
+    paires_existantes = await _paires_existantes(cibles)
+    paires_existantes |= await _paires_deja_evaluees(blocs_list, cibles)
+
+    # Fréquences documentaires de tout le corpus, même si seuls les voisins
+    # des cibles sont chargés
+    frequences, nb_blocs = await _frequences_termes(blocs_list if voisins_de is not None else None)
 
     # Indexer par espace
     par_espace: dict[str, list[dict]] = {}
@@ -65,38 +224,197 @@ async def detecter_suggestions_inter_espaces() -> list[dict]:
             par_espace[eid] = []
         par_espace[eid].append(b)
 
-    espaces = list(par_espace.keys())
-    if len(espaces) < 2:
-        return []
+    if len(par_espace) < 2:
+        return iter(())
 
-    suggestions: list[dict] = []
+    return _iter_suggestions(par_espace, paires_existantes, candidats=candidats, cibles=cibles,
+                             sous_seuil=sous_seuil, frequences=frequences, nb_blocs=nb_blocs)
 
-    # Comparer les blocs entre espaces différents
-    for i, espace_a in enumerate(espaces):
-        for espace_b in espaces[i + 1:]:
-            for bloc_a in par_espace[espace_a]:
-                for bloc_b in par_espace[espace_b]:
-                    pair = tuple(sorted([bloc_a["id"], bloc_b["id"]]))
-                    if pair in paires_existantes:
-                        continue
 
-                    suggestion = _evaluer_paire(bloc_a, bloc_b)
-                    if suggestion:
-                        suggestions.append(suggestion)
-                        paires_existantes.add(pair)  # Éviter doublons dans la session
+async def _frequences_termes(blocs: list[dict] | None = None) -> tuple[dict[str, int], int]:
+    """Nombre de blocs par terme (table frequences_termes) et nombre de blocs indexés.
 
-    return suggestions
+    Avec `blocs`, seulement les termes de ces blocs.
+    """
+    db = await get_db()
+    if blocs is None:
+        rows = await db.execute_fetchall("SELECT terme, nb_blocs FROM frequences_termes")
+    else:
+        termes = json.dumps(sorted({t for b in blocs for t in b["termes"]}), ensure_ascii=False)
+        rows = await db.execute_fetchall(
+            """SELECT terme, nb_blocs FROM frequences_termes
+               WHERE terme IN (SELECT value FROM json_each(?))""",
+            (termes,),
+        )
+    total = await db.execute_fetchall("SELECT COUNT(*) AS n FROM blocs WHERE termes IS NOT NULL")
+    return {r["terme"]: r["nb_blocs"] for r in rows}, total[0]["n"]
+
+
+def _paires_inter_espaces(groupes, espace_de: list[int], max_par_groupe: int | None,
+                          est_cible: list[bool] | None = None) -> Iterator[tuple[int, int]]:
+    """Paires (i < j) d'espaces différents au sein de chaque groupe de blocs, en flux.
 
+    Les groupes (blocs d'un terme, d'un seau LSH) sont des listes d'indices
+    croissants ; au-delà de `max_par_groupe` blocs, un groupe est ignoré.
+    Les blocs sont rangés par espace (`espace_de` croissant) ; les paires
+    sortent dans l'ordre (espace de i, espace de j, i, j), chacune une fois.
 
-def _evaluer_paire(a: dict, b: dict) -> dict | None:
+    Leur ensemble n'est pas matérialisé : pour chaque bloc et chaque espace
+    voisin, seuls les voisins du bloc dans cet espace sont en mémoire.
+    Avec `est_cible`, seules les paires qui touchent une cible sont produites,
+    en temps proportionnel aux groupes des cibles (elles sont alors
+    rassemblées puis triées : leur nombre est borné par ces groupes).
+    """
+    groupes = [m for m in groupes if max_par_groupe is None or len(m) <= max_par_groupe]
+    if est_cible is not None:
+        candidates: set[tuple[int, int]] = set()
+        for membres in groupes:
+            for i in membres:
+                if est_cible[i]:
+                    for j in membres:
+                        if espace_de[i] != espace_de[j]:
+                            candidates.add((min(i, j), max(i, j)))
+        yield from sorted(candidates, key=lambda p: (espace_de[p[0]], espace_de[p[1]], p[0], p[1]))
+        return
+
+    # Membres de chaque groupe par espace, groupes de chaque bloc, et blocs
+    # ayant des voisins par paire d'espaces (a < b)
+    repartitions: list[dict[int, list[int]]] = []
+    groupes_de: dict[int, list[int]] = {}
+    for membres in groupes:
+        repartition: dict[int, list[int]] = {}
+        for i in membres:
+            repartition.setdefault(espace_de[i], []).append(i)
+        if len(repartition) < 2:
+            continue
+        for i in membres:
+            groupes_de.setdefault(i, []).append(len(repartitions))
+        repartitions.append(repartition)
+    blocs_par_espaces: dict[tuple[int, int], list[int]] = {}
+    for i in sorted(groupes_de):
+        espaces_voisins = {e for g in groupes_de[i] for e in repartitions[g] if e > espace_de[i]}
+        for e in espaces_voisins:
+            blocs_par_espaces.setdefault((espace_de[i], e), []).append(i)
+
+    for (_, espace_b), blocs in sorted(blocs_par_espaces.items()):
+        for i in blocs:
+            voisins = {j for g in groupes_de[i] for j in repartitions[g].get(espace_b, ())}
+            for j in sorted(voisins):
+                yield i, j
+
+
+def _detecter(par_espace: dict[str, list[dict]], paires_existantes: set[tuple],
+              max_blocs_par_terme: int | None = MAX_BLOCS_PAR_TERME,
+              candidats: str = "index", cibles: set[str] | None = None,
+              sous_seuil: list[tuple[dict, dict]] | None = None,
+              frequences: dict[str, int] | None = None, nb_blocs: int | None = None) -> list[dict]:
+    """Suggestions entre blocs d'espaces différents, hors paires existantes (cf. _iter_suggestions)."""
+    return list(_iter_suggestions(par_espace, paires_existantes, max_blocs_par_terme,
+                                  candidats, cibles, sous_seuil, frequences, nb_blocs))
+
+
+def _iter_suggestions(par_espace: dict[str, list[dict]], paires_existantes: set[tuple],
+                      max_blocs_par_terme: int | None = MAX_BLOCS_PAR_TERME,
+                      candidats: str = "index", cibles: set[str] | None = None,
+                      sous_seuil: list[tuple[dict, dict]] | None = None,
+                      frequences: dict[str, int] | None = None,
+                      nb_blocs: int | None = None) -> Iterator[dict]:
+    """Suggestions entre blocs d'espaces différents, hors paires existantes.
+
+    Seules les paires qui partagent au moins un terme peuvent être retenues
+    par _evaluer_paire : un index inversé terme → blocs les énumère sans
+    parcourir toutes les paires inter-espaces. L'ordre des suggestions est
+    celui d'un parcours espace × espace × bloc × bloc ; sans plafond
+    (`max_blocs_par_terme=None`), le résultat est celui de ce parcours.
+
+    Avec `candidats="lsh"`, seules les paires qui partagent un seau LSH sont
+    évaluées : les paires à faible recouvrement peuvent manquer. Ce mode
+    n'est pas utilisé hors benchmark : il n'est pas plus rapide que l'index
+    aux tailles mesurées et perd plus de la moitié des suggestions.
+
+    Les termes sont internés en entiers : la boucle d'évaluation ne fait que
+    des intersections d'ensembles d'entiers, les chaînes ne sont retrouvées
+    que pour justifier les suggestions retenues.
+
+    Avec `cibles` (identifiants de blocs), seules les paires qui touchent une
+    cible sont évaluées : même résultat que le parcours complet restreint à
+    ces paires.
+
+    Les paires évaluées sans suggestion sont ajoutées à `sous_seuil` s'il
+    est fourni.
+
+    `frequences` / `nb_blocs` : fréquences documentaires des termes pour la
+    pondération TF-IDF (cf. _evaluer_termes) ; à défaut, celles des blocs
+    de `par_espace`.
+    """
+    blocs: list[dict] = []
+    espace_de: list[int] = []
+    for rang, espace_id in enumerate(par_espace):
+        blocs.extend(par_espace[espace_id])
+        espace_de.extend([rang] * len(par_espace[espace_id]))
+
+    ids_termes: dict[str, int] = {}
+    termes = [
+        frozenset(ids_termes.setdefault(t, len(ids_termes)) for t in _termes_de(b))
+        for b in blocs
+    ]
+    vocabulaire = list(ids_termes)
+
+    if frequences is None:
+        frequences, nb_blocs = frequences_locales(blocs)
+    poids = [_idf(frequences.get(t, 0), nb_blocs) ** 2 for t in vocabulaire]
+    normes = [_norme(termes_bloc, poids) for termes_bloc in termes]
+
+    if candidats == "lsh":
+        signatures = [b.get("signature_minhash") or signature_minhash(_termes_de(b)) for b in blocs]
+        groupes = _seaux_lsh(signatures).values()
+    else:
+        index: list[list[int]] = [[] for _ in vocabulaire]
+        for i, termes_bloc in enumerate(termes):
+            for terme in termes_bloc:
+                index[terme].append(i)
+        groupes = index
+    est_cible = None if cibles is None else [b["id"] in cibles for b in blocs]
+
+    for i, j in _paires_inter_espaces(groupes, espace_de, max_blocs_par_terme, est_cible):
+        pair = tuple(sorted([blocs[i]["id"], blocs[j]["id"]]))
+        if pair in paires_existantes:
+            continue
+
+        suggestion = _evaluer_termes(blocs[i], blocs[j], termes[i], termes[j], poids,
+                                     normes[i] * normes[j], vocabulaire)
+        if suggestion:
+            paires_existantes.add(pair)  # Éviter doublons dans la session
+            yield suggestion
+        elif sous_seuil is not None:
+            sous_seuil.append((blocs[i], blocs[j]))
+
+
+def _evaluer_paire(a: dict, b: dict, frequences: dict[str, int] | None = None,
+                   nb_blocs: int = 0) -> dict | None:
     """Évalue si deux blocs d'espaces différents méritent une liaison.
 
-    Retourne une suggestion ou None.
+    `frequences` / `nb_blocs` : fréquences documentaires du corpus ; à
+    défaut, tous les termes pèsent autant. Retourne une suggestion ou None.
     """
-    # Extraire les mots-clés et entités
-    mots_a = _extraire_termes(a)
-    mots_b = _extraire_termes(b)
+    mots_a, mots_b = _extraire_termes(a), _extraire_termes(b)
+    poids = {
+        t: _idf(frequences.get(t, 0), nb_blocs) ** 2 if frequences is not None else 1.0
+        for t in mots_a | mots_b
+    }
+    return _evaluer_termes(a, b, mots_a, mots_b, poids, _norme(mots_a, poids) * _norme(mots_b, poids))
+
+
+def _evaluer_termes(a: dict, b: dict, mots_a: frozenset | set, mots_b: frozenset | set,
+                    poids, produit_normes: float, vocabulaire: list[str] | None = None) -> dict | None:
+    """_evaluer_paire sur des termes déjà extraits et pondérés.
 
+    Chaque bloc est un vecteur creux TF-IDF (tf binaire) : la similarité est
+    le cosinus, produit scalaire sur les seuls termes communs. `poids[t]`
+    est l'IDF² du terme t, `produit_normes` le produit des normes des deux
+    vecteurs. Si `vocabulaire` est fourni, les termes sont des identifiants
+    entiers (indices dans `vocabulaire` et `poids`).
+    """
     if not mots_a or not mots_b:
         return None
 
@@ -106,17 +424,20 @@ def _evaluer_paire(a: dict, b: dict) -> dict | None:
     if not communs:
         return None
 
-    # Score basé sur le ratio de termes communs
-    ratio = len(communs) / min(len(mots_a), len(mots_b))
+    # Cosinus TF-IDF : un terme rare partagé compte plus qu'un terme courant
+    similarite = sum(poids[t] for t in communs) / produit_normes
 
-    if ratio < 0.15:
+    if similarite < SEUIL_SIMILARITE:
         return None  # Trop peu de recouvrement
 
+    if vocabulaire is not None:
+        communs = {vocabulaire[t] for t in communs}
+
     # Déterminer le type de liaison selon les couleurs sémantiques
-    liaison_type, justification = _determiner_type(a, b, communs, ratio)
+    liaison_type, justification = _determiner_type(a, b, communs, similarite)
 
     # Poids suggeré = indicatif, jamais algorithmique implicite
-    poids_suggere = min(1.0, round(0.4 + ratio * 0.5, 2))
+    poids_suggere = min(1.0, round(0.4 + similarite * 0.5, 2))
 
     return {
         "bloc_source_id": a["id"],
@@ -127,6 +448,36 @@ def _evaluer_paire(a: dict, b: dict) -> dict | None:
     }
 
 
+def _idf(nb_blocs_terme: int, nb_blocs: int) -> float:
+    """IDF lissé : 1 pour un terme présent dans tous les blocs, 1 + ln(N + 1) pour un terme inconnu."""
+    return math.log((1 + nb_blocs) / (1 + nb_blocs_terme)) + 1
+
+
+def _norme(mots, poids) -> float:
+    return math.sqrt(sum(poids[t] for t in mots))
+
+
+def frequences_locales(blocs: list[dict]) -> tuple[dict[str, int], int]:
+    """Fréquences documentaires calculées sur `blocs` (même forme que _frequences_termes)."""
+    frequences: dict[str, int] = {}
+    for b in blocs:
+        for t in _termes_de(b):
+            frequences[t] = frequences.get(t, 0) + 1
+    return frequences, len(blocs)
+
+
+def termes_bloc(bloc: dict) -> list[str]:
+    """Termes normalisés d'un bloc, triés, tels que stockés dans blocs.termes."""
+    return sorted(_extraire_termes(bloc))
+
+
+def _termes_de(bloc: dict) -> list[str] | set[str]:
+    """Termes déjà chargés (colonne `termes`) ou, à défaut, extraits du bloc."""
+    if bloc.get("termes") is not None:
+        return bloc["termes"]
+    return _extraire_termes(bloc)
+
+
 def _extraire_termes(bloc: dict) -> set[str]:
     """Extrait un ensemble de termes normalisés d'un bloc."""
     termes = set()
@@ -167,7 +518,7 @@ def _extraire_termes(bloc: dict) -> set[str]:
     return termes
 
 
-def _determiner_type(a: dict, b: dict, communs: set, ratio: float) -> tuple[str, str]:
+def _determiner_type(a: dict, b: dict, communs: set, similarite: float) -> tuple[str, str]:
     """Détermine le type de liaison et la justification."""
     c_a = a.get("couleur", "")
     c_b = b.get("couleur", "")
@@ -182,8 +533,8 @@ def _determiner_type(a: dict, b: dict, communs: set, ratio: float) -> tuple[str,
         return "analogie", f"Résonance conceptuelle — termes communs : {termes_str}"
 
     # Fort recouvrement → prolongement
-    if ratio > 0.4:
-        return "prolongement", f"Forte continuité thématique ({ratio:.0%}) — {termes_str}"
+    if similarite > SEUIL_PROLONGEMENT:
+        return "prolongement", f"Forte continuité thématique ({similarite:.0%}) — {termes_str}"
 
     # Vert (matière) ↔ Violet (sens) → fondation
     if {c_a, c_b} == {"green", "violet"}:
@@ -194,46 +545,415 @@ def _determiner_type(a: dict, b: dict, communs: set, ratio: float) -> tuple[str,
 
 
 # ═══════════════════════════════════════════════════════════
-#  PERSISTANCE DES SUGGESTIONS
+#  SIGNATURES MINHASH ET LSH
 # ═══════════════════════════════════════════════════════════
+# Signature d'un bloc : pour chacune des MINHASH_PERMUTATIONS fonctions
+# h_k(x) = (a_k·x + b_k) mod p, le minimum sur les termes du bloc. La part de
+# composantes égales entre deux signatures estime la similarité de Jaccard
+# de leurs ensembles de termes. Découpée en LSH_BANDES bandes, la signature
+# range le bloc dans un seau par bande : deux blocs de similarité J partagent
+# au moins un seau avec la probabilité 1 − (1 − J^r)^b (r composantes par bande).
+
+MINHASH_PERMUTATIONS = 64
+LSH_BANDES = 32              # r = 2 : seuil de l'ordre de J ≈ (1/b)^(1/r) ≈ 0,18
+SEUIL_QUASI_DOUBLON = 0.8    # Jaccard estimé
 
-async def persister_suggestions(suggestions: list[dict]) -> int:
-    """Insère les suggestions comme liaisons en_attente.
+_PREMIER_MINHASH = (1 << 61) - 1
+_rng_minhash = random.Random(0x4D48)
+_COEFFICIENTS_MINHASH = [
+    (_rng_minhash.randrange(1, _PREMIER_MINHASH), _rng_minhash.randrange(_PREMIER_MINHASH))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
 
-    Retourne le nombre de suggestions créées.
+
+def _hash_terme(terme: str) -> int:
+    # Stable d'un processus à l'autre, contrairement à hash()
+    return int.from_bytes(hashlib.blake2b(terme.encode(), digest_size=8).digest(), "little")
+
+
+def signature_minhash(termes: list[str] | set[str]) -> bytes | None:
+    """Signature MinHash d'un ensemble de termes (None s'il est vide).
+
+    Sérialisée en MINHASH_PERMUTATIONS entiers 64 bits, telle que stockée
+    dans blocs.signature_minhash.
     """
-    if not suggestions:
-        return 0
+    if not termes:
+        return None
+    valeurs = [_hash_terme(t) for t in termes]
+    return array("Q", (
+        min((a * v + b) % _PREMIER_MINHASH for v in valeurs) for a, b in _COEFFICIENTS_MINHASH
+    )).tobytes()
+
+
+def signature_bloc(bloc: dict) -> bytes | None:
+    """Signature MinHash des termes d'un bloc (mots_cles, entites, titre_ia)."""
+    return signature_minhash(_termes_de(bloc))
+
+
+def similarite_minhash(a: bytes, b: bytes) -> float:
+    """Jaccard estimé entre deux signatures."""
+    return sum(x == y for x, y in zip(array("Q", a), array("Q", b))) / MINHASH_PERMUTATIONS
+
+
+def _seaux_lsh(signatures: list[bytes | None]) -> dict[tuple[int, bytes], list[int]]:
+    """Seaux LSH : (bande, octets de la bande) → indices des blocs, croissants."""
+    largeur = len(_COEFFICIENTS_MINHASH) // LSH_BANDES * array("Q").itemsize
+    seaux: dict[tuple[int, bytes], list[int]] = {}
+    for i, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        for bande in range(LSH_BANDES):
+            seaux.setdefault((bande, signature[bande * largeur:(bande + 1) * largeur]), []).append(i)
+    return seaux
+
+
+async def detecter_quasi_doublons(seuil: float = SEUIL_QUASI_DOUBLON) -> list[dict]:
+    """Paires de blocs d'espaces différents aux termes quasi identiques.
 
+    Candidates tirées des seaux LSH, puis filtrées sur le Jaccard estimé des
+    signatures. Triées par similarité décroissante.
+    """
+    blocs = await _charger_blocs()
+    espaces = {espace_id: rang for rang, espace_id in enumerate(dict.fromkeys(b["espace_id"] for b in blocs))}
+    espace_de = [espaces[b["espace_id"]] for b in blocs]
+    signatures = [b["signature_minhash"] for b in blocs]
+
+    doublons = []
+    for i, j in _paires_inter_espaces(_seaux_lsh(signatures).values(), espace_de, MAX_BLOCS_PAR_TERME):
+        similarite = similarite_minhash(signatures[i], signatures[j])
+        if similarite >= seuil:
+            a, b = blocs[i], blocs[j]
+            doublons.append({
+                "bloc_a_id": a["id"], "espace_a_id": a["espace_id"], "titre_a": a["titre_ia"],
+                "bloc_b_id": b["id"], "espace_b_id": b["espace_id"], "titre_b": b["titre_ia"],
+                "similarite": round(similarite, 3),
+            })
+    doublons.sort(key=lambda d: (-d["similarite"], d["bloc_a_id"], d["bloc_b_id"]))
+    return doublons
+
+
+# ═══════════════════════════════════════════════════════════
+#  PAIRES DÉJÀ ÉVALUÉES
+# ═══════════════════════════════════════════════════════════
+# Paires évaluées sous le seuil par les passages par bloc (suggerer_pour_blocs)
+# depuis le dernier passage global, qui ne les réévalue pas puis vide la
+# table : au-delà, le repère du passage couvre toutes les paires de blocs
+# inchangés. Une paire n'est retenue qu'avec la version des termes de ses
+# deux blocs ; si l'un change (réindexation, titre modifié), la ligne est
+# effacée. Les paires suggérées, elles, sont dans liaisons.
+
+# Lignes par appel executemany
+TAILLE_LOT_PAIRES = 5000
+
+
+def _version_termes(termes_json: str) -> int:
+    """Version (31 bits) d'un ensemble de termes, tirée de sa forme JSON triée."""
+    return zlib.crc32(termes_json.encode()) & 0x7FFFFFFF
+
+
+def _version_paire(a: dict, b: dict) -> int:
+    """Versions des termes de deux blocs, dans l'ordre de leurs identifiants."""
+    if a["id"] > b["id"]:
+        a, b = b, a
+    return a["version_termes"] << 31 | b["version_termes"]
+
+
+async def _paires_deja_evaluees(blocs: list[dict], cibles: set[str] | None = None) -> set[tuple]:
+    """Paires mémorisées dont les deux blocs ont toujours les mêmes termes.
+
+    Avec `cibles`, seules les paires qui touchent l'un de ces blocs.
+    """
     db = await get_db()
-    now = datetime.now(timezone.utc).isoformat()
-    count = 0
+    if cibles is None:
+        rows = await db.execute_fetchall("SELECT bloc_a_id, bloc_b_id, version FROM paires_evaluees")
+    else:
+        ids = json.dumps(sorted(cibles))
+        rows = await db.execute_fetchall(
+            """SELECT bloc_a_id, bloc_b_id, version FROM paires_evaluees
+               WHERE bloc_a_id IN (SELECT value FROM json_each(?))
+                  OR bloc_b_id IN (SELECT value FROM json_each(?))""",
+            (ids, ids),
+        )
+    par_id = {b["id"]: b for b in blocs}
+    paires = set()
+    for bloc_a_id, bloc_b_id, version in rows:
+        a, b = par_id.get(bloc_a_id), par_id.get(bloc_b_id)
+        if a is not None and b is not None and _version_paire(a, b) == version:
+            paires.add((bloc_a_id, bloc_b_id))
+    return paires
+
+
+async def _memoriser_paires_evaluees(paires: list[tuple[dict, dict]]):
+    db = await get_db()
+    for debut in range(0, len(paires), TAILLE_LOT_PAIRES):
+        await db.executemany(
+            "INSERT OR REPLACE INTO paires_evaluees (bloc_a_id, bloc_b_id, version) VALUES (?, ?, ?)",
+            [(*sorted([a["id"], b["id"]]), _version_paire(a, b)) for a, b in paires[debut:debut + TAILLE_LOT_PAIRES]],
+        )
+    await db.commit()
+
+
+async def oublier_paires_evaluees(bloc_ids: list[str]):
+    """Efface les paires mémorisées de blocs dont les termes viennent de changer.
+
+    L'appelant valide (commit) avec l'écriture des nouveaux termes.
+    """
+    db = await get_db()
+    ids = json.dumps(sorted(bloc_ids))
+    await db.execute(
+        """DELETE FROM paires_evaluees
+           WHERE bloc_a_id IN (SELECT value FROM json_each(?))
+              OR bloc_b_id IN (SELECT value FROM json_each(?))""",
+        (ids, ids),
+    )
+
+
+# ═══════════════════════════════════════════════════════════
+#  PERSISTANCE DES SUGGESTIONS
+# ═══════════════════════════════════════════════════════════
+
+# Suggestions gardées par passage : les plus fortes de chaque bloc, en
+# attente comprises, puis un plafond global, pour ne pas noyer l'utilisateur
+# sous des liaisons en attente
+MAX_SUGGESTIONS_PAR_BLOC = 5
+MAX_SUGGESTIONS_PAR_PASSAGE = 10000
+
+# Lignes par appel executemany
+TAILLE_LOT_SUGGESTIONS = 1000
+
+
+def _garder(tas: list, entree: tuple, limite: int | None):
+    """Ajoute `entree` au tas (minimum en tête) s'il y a de la place ou si elle bat le minimum."""
+    if limite is None or len(tas) < limite:
+        heapq.heappush(tas, entree)
+    elif entree > tas[0]:
+        heapq.heapreplace(tas, entree)
+
+
+def selectionner_suggestions(suggestions: Iterable[dict],
+                             par_bloc: int | None = MAX_SUGGESTIONS_PAR_BLOC,
+                             maximum: int | None = MAX_SUGGESTIONS_PAR_PASSAGE,
+                             en_attente: dict[str, int] | None = None) -> tuple[list[dict], int]:
+    """Meilleures suggestions d'un flux : `par_bloc` par bloc, `maximum` en tout.
+
+    Aucun bloc ne dépasse `par_bloc` suggestions, en comptant celles déjà en
+    attente (`en_attente`, bloc → nombre) : des passages successifs ne
+    l'accumulent pas. Seuls les tas des blocs (les `par_bloc` plus fortes
+    de chacun) restent en mémoire ; leurs suggestions sont ensuite gardées
+    par poids décroissant tant que leurs deux blocs ont de la place. Retourne
+    les suggestions gardées par poids décroissant (ordre d'arrivée à poids
+    égal) et le nombre de suggestions du flux.
+    """
+    en_attente = en_attente or {}
+    tas: dict[str | None, list] = {}
+    total = 0
+    for rang, s in enumerate(suggestions):
+        total = rang + 1
+        # -rang : à poids égal, la première arrivée l'emporte ; les dicts ne sont jamais comparés
+        entree = (s["poids"], -rang, s)
+        if par_bloc is None:
+            _garder(tas.setdefault(None, []), entree, maximum)
+            continue
+        places = [par_bloc - en_attente.get(cle, 0) for cle in (s["bloc_source_id"], s["bloc_cible_id"])]
+        if min(places) <= 0:
+            continue
+        _garder(tas.setdefault(s["bloc_source_id"], []), entree, places[0])
+        _garder(tas.setdefault(s["bloc_cible_id"], []), entree, places[1])
+
+    gardees = {-rang_neg: s for t in tas.values() for _, rang_neg, s in t}
+    retenues = []
+    gardees_par_bloc: dict[str, int] = dict(en_attente)
+    for rang in sorted(gardees, key=lambda r: (-gardees[r]["poids"], r)):
+        if maximum is not None and len(retenues) >= maximum:
+            break
+        s = gardees[rang]
+        cles = (s["bloc_source_id"], s["bloc_cible_id"])
+        if par_bloc is not None:
+            if any(gardees_par_bloc.get(cle, 0) >= par_bloc for cle in cles):
+                continue
+            for cle in cles:
+                gardees_par_bloc[cle] = gardees_par_bloc.get(cle, 0) + 1
+        retenues.append(s)
+    return retenues, total
+
+
+async def _suggestions_en_attente() -> dict[str, int]:
+    """Nombre de suggestions en attente de validation par bloc."""
+    db = await get_db()
+    rows = await db.execute_fetchall(
+        """SELECT bloc_id, COUNT(*) AS n FROM (
+               SELECT bloc_source_id AS bloc_id FROM liaisons
+               WHERE origine = 'ia_suggestion' AND validation = 'en_attente'
+               UNION ALL
+               SELECT bloc_cible_id FROM liaisons
+               WHERE origine = 'ia_suggestion' AND validation = 'en_attente'
+           ) GROUP BY bloc_id"""
+    )
+    return {r["bloc_id"]: r["n"] for r in rows}
 
-    for s in suggestions:
-        lid = str(uuid.uuid4())
-        metadata = json.dumps({"justification": s["justification"]}, ensure_ascii=False)
 
-        await db.execute(
+async def _inserer_suggestions(suggestions: Iterable[dict]) -> int:
+    """Insère les suggestions comme liaisons en_attente, par lots, sans valider."""
+    db = await get_db()
+    now = datetime.now(timezone.utc).isoformat()
+    flux = iter(suggestions)
+    count = 0
+    while lot := list(islice(flux, TAILLE_LOT_SUGGESTIONS)):
+        await db.executemany(
             """INSERT INTO liaisons
                (id, bloc_source_id, bloc_cible_id, type, poids, origine, validation, metadata, created_at, updated_at)
-               VALUES (?, ?, ?, ?, ?, 'ia_suggestion', 'en_attente', ?, ?, ?)""",
-            (lid, s["bloc_source_id"], s["bloc_cible_id"], s["type"],
-             s["poids"], metadata, now, now),
+               VALUES (?, ?, ?, ?, ?, 'ia_suggestion', 'en_attente', json_object('justification', ?), ?, ?)""",
+            [
+                (str(uuid.uuid4()), s["bloc_source_id"], s["bloc_cible_id"], s["type"],
+                 s["poids"], s["justification"], now, now)
+                for s in lot
+            ],
         )
-        count += 1
+        count += len(lot)
+    return count
 
-    await db.commit()
+
+async def persister_suggestions(suggestions: Iterable[dict]) -> int:
+    """Insère les suggestions comme liaisons en_attente, par lots (executemany).
+
+    `suggestions` peut être un flux : il est consommé lot par lot. Tous les
+    lots partagent une transaction, validée à la fin ; en cas d'erreur,
+    aucune suggestion n'est écrite. Retourne le nombre de suggestions créées.
+    """
+    db = await get_db()
+    try:
+        count = await _inserer_suggestions(suggestions)
+    except Exception:
+        await db.rollback()
+        raise
+
+    if count:
+        await db.commit()
     return count
 
 
-async def suggerer_et_persister() -> str:
-    """Pipeline complet : détection + persistance. Retourne un résumé."""
-    suggestions = await detecter_suggestions_inter_espaces()
+async def suggerer_pour_blocs(bloc_ids: list[str], candidats: str = "index") -> int:
+    """Suggestions des seuls blocs donnés (créés ou réindexés), persistées.
 
-    if not suggestions:
-        return "Aucune suggestion inter-espaces détectée."
+    Chaque bloc est évalué contre les blocs des autres espaces qui partagent
+    un terme avec lui, sans passage global. Retourne le nombre de
+    suggestions créées.
+    """
+    sous_seuil: list[tuple[dict, dict]] = []
+    flux = await flux_suggestions_inter_espaces(candidats, set(bloc_ids), sous_seuil)
+    suggestions, _ = selectionner_suggestions(flux, en_attente=await _suggestions_en_attente())
+    await _memoriser_paires_evaluees(sous_seuil)
+    return await persister_suggestions(suggestions)
+
+
+# Références fortes vers les passages par bloc en cours (sinon collectables par le GC)
+_taches_suggestions: set[asyncio.Task] = set()
+# Un passage à la fois (par bloc ou global) : deux passages concurrents
+# liraient les mêmes paires existantes et suggéreraient deux fois une paire
+_verrou_passages = asyncio.Lock()
+
+
+def planifier_suggestions(bloc_ids: list[str]) -> None:
+    """suggerer_pour_blocs en tâche de fond, après l'écriture des blocs.
+
+    L'appelant (indexation, création de bloc) rend la main sans attendre ;
+    une erreur du passage est journalisée, les suggestions de ces blocs
+    seront reprises par le passage global suivant.
+    """
+    async def passage():
+        try:
+            async with _verrou_passages:
+                await suggerer_pour_blocs(bloc_ids)
+        except Exception as e:
+            print(f"[Méta-graphe] Erreur suggestions pour {len(bloc_ids)} bloc(s) : {e}")
+
+    tache = asyncio.create_task(passage())
+    _taches_suggestions.add(tache)
+    tache.add_done_callback(_taches_suggestions.discard)
 
-    count = await persister_suggestions(suggestions)
+
+async def _dernier_passage() -> str | None:
+    db = await get_db()
+    rows = await db.execute_fetchall(
+        "SELECT dernier_passage FROM passages_meta_graphe WHERE cle = ?", (CLE_PASSAGE_SUGGESTIONS,)
+    )
+    return rows[0]["dernier_passage"] if rows else None
+
+
+async def _repere_termes() -> str | None:
+    """Plus grand termes_updated_at des blocs, termes manquants complétés."""
+    await _completer_termes()
+    db = await get_db()
+    rows = await db.execute_fetchall("SELECT MAX(termes_updated_at) AS repere FROM blocs")
+    return rows[0]["repere"]
+
+
+async def _enregistrer_passage(repere: str | None):
+    """Le passage couvre les termes écrits jusqu'à `repere` (backfill compris).
+
+    `repere` est relevé avant le chargement des blocs du passage : un bloc
+    réindexé pendant le passage reste à traiter au suivant. Les paires
+    mémorisées par les passages par bloc dont les deux blocs sont couverts
+    le sont désormais aussi ; celles d'un bloc plus récent (passage par bloc
+    concurrent) sont gardées. L'appelant valide (commit) avec l'écriture des
+    suggestions du passage.
+    """
+    if repere is None:
+        return
+    db = await get_db()
+    await db.execute(
+        """DELETE FROM paires_evaluees
+           WHERE NOT EXISTS (
+               SELECT 1 FROM blocs b
+               WHERE b.id IN (paires_evaluees.bloc_a_id, paires_evaluees.bloc_b_id)
+                 AND (b.termes_updated_at IS NULL OR b.termes_updated_at > ?)
+           )""",
+        (repere,),
+    )
+    await db.execute(
+        """INSERT INTO passages_meta_graphe (cle, dernier_passage) VALUES (?, ?)
+           ON CONFLICT(cle) DO UPDATE SET dernier_passage = excluded.dernier_passage""",
+        (CLE_PASSAGE_SUGGESTIONS, repere),
+    )
+
+
+async def suggerer_et_persister(candidats: str = "index", complet: bool = False) -> str:
+    """Pipeline complet : détection + persistance. Retourne un résumé.
+
+    Sauf `complet=True`, seuls les blocs dont les termes ont changé depuis le
+    dernier passage (ou jamais calculés) sont réévalués : les paires de blocs
+    inchangés l'ont déjà été.
+    """
+    async with _verrou_passages:
+        db = await get_db()
+        depuis = None if complet else await _dernier_passage()
+        repere = await _repere_termes()
+        cibles = None
+        if depuis is not None:
+            rows = await db.execute_fetchall(
+                "SELECT id FROM blocs WHERE termes_updated_at IS NULL OR termes_updated_at > ?",
+                (depuis,),
+            )
+            cibles = {r["id"] for r in rows}
+
+        suggestions, detectees = [], 0
+        if cibles != set():
+            flux = await flux_suggestions_inter_espaces(candidats, cibles)
+            suggestions, detectees = selectionner_suggestions(flux, en_attente=await _suggestions_en_attente())
+
+        # Suggestions et passage dans une même transaction : si l'écriture
+        # échoue, le passage n'avance pas et ces blocs seront réévalués
+        try:
+            count = await _inserer_suggestions(suggestions)
+            await _enregistrer_passage(repere)
+        except Exception:
+            await db.rollback()
+            raise
+        await db.commit()
+
+    portee = "" if cibles is None else f" ({len(cibles)} blocs modifiés depuis le dernier passage)"
+    if not suggestions:
+        return f"Aucune suggestion inter-espaces détectée{portee}."
 
     # Résumé par type
     par_type: dict[str, int] = {}
@@ -241,4 +961,8 @@ async def suggerer_et_persister() -> str:
         par_type[s["type"]] = par_type.get(s["type"], 0) + 1
 
     detail = ", ".join(f"{t}: {n}" for t, n in sorted(par_type.items()))
-    return f"✓ {count} suggestions inter-espaces créées (en attente de validation).\n  Types : {detail}"
+    resume = f"✓ {count} suggestions inter-espaces créées (en attente de validation){portee}.\n  Types : {detail}"
+    if detectees > count:
+        resume += (f"\n  {detectees - count} suggestions plus faibles écartées "
+                   f"({MAX_SUGGESTIONS_PAR_BLOC} max. par bloc en attente, {MAX_SUGGESTIONS_PAR_PASSAGE} par passage).")
+    return resume
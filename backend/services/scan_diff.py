@@ -11,14 +11,27 @@ Contraintes (CENTRAL.md §8.3) :
   - Pas de watchdog permanent — scan au démarrage ou sur demande
   - CPU léger — pas de GPU requis
   - Cible : < 5 secondes pour 10 000 fichiers indexés
+
+Le parcours et le hash tournent hors de la boucle d'événements : le parcours
+(générateur os.scandir) est avancé par lots dans un thread, qui confie chaque
+fichier à hasher (nouveau, ou taille/date changée) à un pool de threads borné
+au fil de l'eau — hashlib relâche le GIL, les lectures et les hash se
+recouvrent avec la suite du parcours. Le débit disque consommé par le hash est
+plafonné par un budget (BudgetIO). Des fichiers inchangés, seul le chemin est
+conservé : la mémoire suit le nombre de changements, pas la taille de l'arbre.
 """
 
+import asyncio
 import hashlib
 import json
 import os
+import threading
 import time
 import uuid
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone
+from itertools import islice
 from pathlib import Path
 
 from db.database import get_db
@@ -31,6 +44,25 @@ from db.database import get_db
 # Taille max pour calcul de hash complet (au-delà, hash partiel)
 HASH_MAX_SIZE = 50 * 1024 * 1024  # 50 Mo
 
+# Threads de hash (lectures disque + SHA-256, hors GIL)
+HASH_WORKERS = min(8, (os.cpu_count() or 2) + 2)
+
+# Hash soumis mais pas encore terminés, au-delà desquels le parcours attend
+HASH_EN_VOL_MAX = HASH_WORKERS * 4
+
+# Budget disque du hash, en octets lus par seconde (None = illimité)
+HASH_BUDGET_IO = 256 * 1024 * 1024
+
+# Taille des lectures pour le hash
+HASH_CHUNK = 65536
+
+# Fichiers tirés du parcours à chaque passage par la boucle d'événements
+TAILLE_LOT_SCAN = 2000
+
+# Lignes par executemany lors de la mise à jour de l'index ; une transaction
+# validée par lot
+TAILLE_LOT_ECRITURE = 1000
+
 # Extensions ignorées par défaut (binaires lourds, caches, etc.)
 IGNORE_PATTERNS = {
     # Dossiers
@@ -53,11 +85,16 @@ IGNORE_EXTENSIONS = {
 # SCAN PRINCIPAL
 # ═══════════════════════════════════════════════════════════
 
-async def scanner_dossier(dossier_id: str) -> dict:
+async def scanner_dossier(dossier_id: str, budget_io: int | None = HASH_BUDGET_IO) -> dict:
     """Scanne un dossier surveillé et produit un rapport différentiel.
     
     Retourne un rapport avec le nombre de fichiers par catégorie
-    et les détails des changements.
+    et les détails des changements. `budget_io` plafonne le débit de lecture
+    du hash (octets/s, None = illimité).
+    
+    `durees_ms` détaille la durée des phases successives : parcours (les
+    hash soumis en chemin tournent pendant ce temps), hash (attente des
+    hash restants une fois le parcours fini), diff et écriture de l'index.
     """
     db = await get_db()
     start = time.monotonic()
@@ -85,166 +122,217 @@ async def scanner_dossier(dossier_id: str) -> dict:
             pass
     
     # ─── Charger l'index actuel ───────────────────────────
+    # Seules les colonnes utiles au diff : l'index entier reste en mémoire
     index_rows = await db.execute_fetchall(
-        "SELECT * FROM fichiers_indexes WHERE dossier_id = ?", (dossier_id,)
+        """SELECT id, chemin_absolu, nom, extension, taille_octets, hash_contenu, date_modification
+           FROM fichiers_indexes WHERE dossier_id = ?""",
+        (dossier_id,)
     )
     # Dictionnaire chemin → enregistrement
     index_par_chemin: dict[str, dict] = {}
-    # Dictionnaire hash → liste de chemins (pour détection déplacements)
-    index_par_hash: dict[str, list[str]] = {}
-    
     for r in index_rows:
         d = dict(r)
         index_par_chemin[d["chemin_absolu"]] = d
-        if d["hash_contenu"]:
-            index_par_hash.setdefault(d["hash_contenu"], []).append(d["chemin_absolu"])
     
-    # ─── Scanner le système de fichiers ───────────────────
-    fichiers_disque: dict[str, dict] = {}
+    # ─── Parcours du disque, consommé par lots ────────────
+    # Seuls les fichiers candidats (nouveaux, ou taille/date changée) sont
+    # conservés ; les fichiers inchangés ne font que passer. Chaque chemin vu
+    # est retiré des chemins indexés : ceux qui restent ont disparu du disque.
+    restants = set(index_par_chemin)
+    candidats_nouveaux: list[tuple[dict, Future]] = []
+    candidats_modifies: list[tuple[dict, dict, Future]] = []
+    inchanges = 0
+    fichiers_parcourus = 0
     
-    for entry in _parcourir_dossier(racine, profondeur_max, extensions_filtre):
-        chemin_str = str(entry["path"])
-        fichiers_disque[chemin_str] = entry
+    parcours = _parcourir_dossier(racine, profondeur_max, extensions_filtre)
+    budget = BudgetIO(budget_io)
+    places = threading.BoundedSemaphore(HASH_EN_VOL_MAX)
+    debut_parcours = time.monotonic()
+    # Pas de `with` : à l'annulation du scan, son shutdown(wait=True)
+    # bloquerait la boucle d'événements jusqu'à la fin des hash en cours
+    pool = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="scan-hash")
+    try:
+        while lot := await asyncio.to_thread(
+            _preparer_lot, parcours, index_par_chemin, pool, places, budget
+        ):
+            fichiers_parcourus += len(lot)
+            for info, future in lot:
+                chemin = info["chemin"]
+                restants.discard(chemin)
+                record = index_par_chemin.get(chemin)
+                if record is None:
+                    candidats_nouveaux.append((info, future))
+                elif future is not None:
+                    candidats_modifies.append((info, record, future))
+                else:
+                    inchanges += 1
+        fin_parcours = time.monotonic()
+        
+        # Les hash du dernier lot peuvent encore tourner
+        hashes = {
+            info["chemin"]: await asyncio.wrap_future(future)
+            for info, future in candidats_nouveaux
+        }
+        for info, _record, future in candidats_modifies:
+            hashes[info["chemin"]] = await asyncio.wrap_future(future)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    fin_hash = time.monotonic()
+    
+    # ─── Détection des déplacements ───────────────────────
+    # Fichiers indexés disparus du disque, candidats à un déplacement
+    # (dans l'ordre de l'index : le journal ne garde que les premiers)
+    disparus = {
+        chemin: record for chemin, record in index_par_chemin.items()
+        if chemin in restants
+    }
+    # Contenus disparus. Les fichiers nouveaux étant tous hashés au parcours
+    # (leur hash entre dans l'index), la recherche par hash est une simple
+    # consultation de dictionnaire : elle tient lieu de préfiltre par
+    # (taille, extension), qui n'épargnerait aucune lecture.
+    disparus_par_hash: dict[str, list[str]] = {}
+    for chemin, record in disparus.items():
+        if record["hash_contenu"]:
+            disparus_par_hash.setdefault(record["hash_contenu"], []).append(chemin)
+    # Ancien chemin → nouveau chemin, chaque ancien chemin attribué une fois
+    anciens_chemins: dict[str, str] = {}
+    
+    # Infos disque des seuls candidats, pour l'écriture dans l'index
+    fichiers_candidats = {info["chemin"]: info for info, _future in candidats_nouveaux}
+    fichiers_candidats.update((info["chemin"], info) for info, _r, _f in candidats_modifies)
     
     # ─── Analyse différentielle ───────────────────────────
     nouveaux = []
     modifies = []
     supprimes = []
     deplaces = []
-    inchanges = 0
     
-    # 1. Fichiers sur le disque mais pas dans l'index → NOUVEAUX
-    for chemin, info in fichiers_disque.items():
-        if chemin not in index_par_chemin:
-            # Vérifier si c'est un déplacement (même hash, autre chemin)
-            file_hash = _calculer_hash(info["path"])
-            if file_hash and file_hash in index_par_hash:
-                # Trouver l'ancien chemin qui n'existe plus
-                for ancien_chemin in index_par_hash[file_hash]:
-                    if ancien_chemin not in fichiers_disque:
-                        deplaces.append({
-                            "ancien_chemin": ancien_chemin,
-                            "nouveau_chemin": chemin,
-                            "nom": info["nom"],
-                            "hash": file_hash,
-                        })
-                        break
-                else:
-                    # Hash trouvé mais tous les anciens chemins existent encore → copie = nouveau
-                    nouveaux.append({
-                        "chemin": chemin,
-                        "nom": info["nom"],
-                        "taille": info["taille"],
-                        "extension": info["extension"],
-                        "hash": file_hash,
-                    })
-            else:
-                nouveaux.append({
-                    "chemin": chemin,
-                    "nom": info["nom"],
-                    "taille": info["taille"],
-                    "extension": info["extension"],
-                    "hash": file_hash,
-                })
-    
-    # 2. Fichiers dans l'index mais plus sur le disque → SUPPRIMÉS
-    for chemin, record in index_par_chemin.items():
-        if chemin not in fichiers_disque:
-            # Vérifier que ce n'est pas un déplacement déjà détecté
-            is_deplaced = any(d["ancien_chemin"] == chemin for d in deplaces)
-            if not is_deplaced:
-                supprimes.append({
-                    "chemin": chemin,
-                    "nom": record["nom"],
-                    "id": record["id"],
-                })
-    
-    # 3. Fichiers présents des deux côtés → vérifier modification
-    for chemin in fichiers_disque:
-        if chemin in index_par_chemin:
-            info_disque = fichiers_disque[chemin]
-            record = index_par_chemin[chemin]
-            
-            # Comparer date de modification et taille
-            mtime_disque = info_disque["date_modification"]
-            mtime_index = record["date_modification"]
-            taille_disque = info_disque["taille"]
-            taille_index = record["taille_octets"]
-            
-            if mtime_disque != mtime_index or taille_disque != taille_index:
-                # Confirmer par hash si la taille ou la date a changé
-                new_hash = _calculer_hash(info_disque["path"])
-                if new_hash != record["hash_contenu"]:
-                    modifies.append({
-                        "chemin": chemin,
-                        "nom": info_disque["nom"],
-                        "id": record["id"],
-                        "ancien_hash": record["hash_contenu"],
-                        "nouveau_hash": new_hash,
-                        "ancienne_taille": taille_index,
-                        "nouvelle_taille": taille_disque,
-                    })
-                else:
-                    inchanges += 1
-            else:
-                inchanges += 1
+    # 1. Fichiers sur le disque mais pas dans l'index → NOUVEAUX ou DÉPLACÉS
+    for info, _future in candidats_nouveaux:
+        chemin = info["chemin"]
+        file_hash = hashes[chemin]
+        # Déplacement : même hash qu'un fichier disparu pas encore attribué,
+        # de préférence de même identité (nom, taille, date : dossier renommé)
+        libres = [c for c in disparus_par_hash.get(file_hash, ()) if c not in anciens_chemins]
+        identite = _identite(info["nom"], info["taille"], info["date_modification"])
+        ancien_chemin = next((
+            c for c in libres
+            if _identite(disparus[c]["nom"], disparus[c]["taille_octets"],
+                         disparus[c]["date_modification"]) == identite
+        ), libres[0] if libres else None)
+        
+        if ancien_chemin is not None:
+            anciens_chemins[ancien_chemin] = chemin
+            deplaces.append({
+                "ancien_chemin": ancien_chemin,
+                "nouveau_chemin": chemin,
+                "nom": info["nom"],
+                "hash": file_hash,
+            })
+        else:
+            # Hash inconnu, ou tous les anciens chemins existent encore → copie = nouveau
+            nouveaux.append({
+                "chemin": chemin,
+                "nom": info["nom"],
+                "taille": info["taille"],
+                "extension": info["extension"],
+                "hash": file_hash,
+            })
+    
+    # 2. Fichiers dans l'index mais plus sur le disque, non déplacés → SUPPRIMÉS
+    for chemin, record in disparus.items():
+        if chemin not in anciens_chemins:
+            supprimes.append({
+                "chemin": chemin,
+                "nom": record["nom"],
+                "id": record["id"],
+            })
     
-    # ─── Mettre à jour l'index ────────────────────────────
+    # 3. Fichiers présents des deux côtés, taille ou date changée → confirmer par hash
+    for info_disque, record, _future in candidats_modifies:
+        chemin = info_disque["chemin"]
+        new_hash = hashes[chemin]
+        if new_hash != record["hash_contenu"]:
+            modifies.append({
+                "chemin": chemin,
+                "nom": info_disque["nom"],
+                "id": record["id"],
+                "ancien_hash": record["hash_contenu"],
+                "nouveau_hash": new_hash,
+                "ancienne_taille": record["taille_octets"],
+                "nouvelle_taille": info_disque["taille"],
+            })
+        else:
+            inchanges += 1
+    fin_diff = time.monotonic()
+    
+    # ─── Mettre à jour l'index (par lots) ─────────────────
     
     # Nouveaux fichiers → INSERT
-    for f in nouveaux:
-        fid = str(uuid.uuid4())
-        chemin_rel = str(Path(f["chemin"]).relative_to(racine))
-        await db.execute(
-            """INSERT INTO fichiers_indexes 
-               (id, dossier_id, chemin_absolu, chemin_relatif, nom, extension, 
-                taille_octets, hash_contenu, date_modification, statut, date_indexation)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'nouveau', ?)""",
-            (fid, dossier_id, f["chemin"], chemin_rel, f["nom"], f["extension"],
-             f["taille"], f["hash"],
-             fichiers_disque[f["chemin"]]["date_modification"], now)
-        )
+    await _ecrire_par_lots(
+        """INSERT INTO fichiers_indexes 
+           (id, dossier_id, chemin_absolu, chemin_relatif, nom, extension, 
+            taille_octets, hash_contenu, date_modification, statut, date_indexation)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 'nouveau', ?)""",
+        (
+            (str(uuid.uuid4()), dossier_id, f["chemin"], str(Path(f["chemin"]).relative_to(racine)),
+             f["nom"], f["extension"], f["taille"], f["hash"],
+             fichiers_candidats[f["chemin"]]["date_modification"], now)
+            for f in nouveaux
+        ),
+    )
     
     # Modifiés → UPDATE
-    for f in modifies:
-        info = fichiers_disque[f["chemin"]]
-        await db.execute(
-            """UPDATE fichiers_indexes 
-               SET hash_contenu = ?, taille_octets = ?, date_modification = ?,
-                   statut = 'modifie', date_indexation = ?
-               WHERE id = ?""",
+    await _ecrire_par_lots(
+        """UPDATE fichiers_indexes 
+           SET hash_contenu = ?, taille_octets = ?, date_modification = ?,
+               statut = 'modifie', date_indexation = ?
+           WHERE id = ?""",
+        (
             (f["nouveau_hash"], f["nouvelle_taille"],
-             info["date_modification"], now, f["id"])
-        )
+             fichiers_candidats[f["chemin"]]["date_modification"], now, f["id"])
+            for f in modifies
+        ),
+    )
     
     # Supprimés → UPDATE statut (ne pas supprimer l'enregistrement pour traçabilité)
-    for f in supprimes:
-        await db.execute(
-            "UPDATE fichiers_indexes SET statut = 'supprime', date_indexation = ? WHERE id = ?",
-            (now, f["id"])
-        )
+    await _ecrire_par_lots(
+        "UPDATE fichiers_indexes SET statut = 'supprime', date_indexation = ? WHERE id = ?",
+        ((now, f["id"]) for f in supprimes),
+    )
     
     # Déplacés → UPDATE chemin
-    for f in deplaces:
-        chemin_rel = str(Path(f["nouveau_chemin"]).relative_to(racine))
-        await db.execute(
-            """UPDATE fichiers_indexes 
-               SET chemin_absolu = ?, chemin_relatif = ?, statut = 'deplace', date_indexation = ?
-               WHERE chemin_absolu = ?""",
-            (f["nouveau_chemin"], chemin_rel, now, f["ancien_chemin"])
-        )
+    await _ecrire_par_lots(
+        """UPDATE fichiers_indexes 
+           SET chemin_absolu = ?, chemin_relatif = ?, statut = 'deplace', date_indexation = ?
+           WHERE chemin_absolu = ?""",
+        (
+            (f["nouveau_chemin"], str(Path(f["nouveau_chemin"]).relative_to(racine)), now,
+             f["ancien_chemin"])
+            for f in deplaces
+        ),
+    )
+    fin_ecriture = time.monotonic()
     
-    duree_ms = int((time.monotonic() - start) * 1000)
+    duree_ms = int((fin_ecriture - start) * 1000)
+    durees_ms = {
+        "parcours": int((fin_parcours - debut_parcours) * 1000),
+        "hash": int((fin_hash - fin_parcours) * 1000),
+        "diff": int((fin_diff - fin_hash) * 1000),
+        "ecriture": int((fin_ecriture - fin_diff) * 1000),
+    }
     
     # ─── Journal du scan ──────────────────────────────────
     rapport = {
-        "fichiers_total": len(fichiers_disque),
+        "fichiers_total": fichiers_parcourus,
         "fichiers_nouveaux": len(nouveaux),
         "fichiers_modifies": len(modifies),
         "fichiers_supprimes": len(supprimes),
         "fichiers_deplaces": len(deplaces),
         "fichiers_inchanges": inchanges,
+        "fichiers_haches": len(hashes),
         "duree_ms": duree_ms,
+        "durees_ms": durees_ms,
     }
     
     journal_id = str(uuid.uuid4())
@@ -253,6 +341,7 @@ async def scanner_dossier(dossier_id: str) -> dict:
         "modifies": modifies[:50],
         "supprimes": supprimes[:50],
         "deplaces": deplaces[:50],
+        "durees_ms": durees_ms,
     }, ensure_ascii=False)
     
     await db.execute(
@@ -273,80 +362,188 @@ async def scanner_dossier(dossier_id: str) -> dict:
     return rapport
 
 
+# ═══════════════════════════════════════════════════════════
+# ÉCRITURES GROUPÉES
+# ═══════════════════════════════════════════════════════════
+
+async def _ecrire_par_lots(sql: str, lignes: Iterable[tuple]) -> None:
+    """Exécute `sql` pour chaque ligne, par lots de TAILLE_LOT_ECRITURE (executemany).
+    
+    Chaque lot est une transaction validée aussitôt : le journal SQLite
+    reste borné et la boucle d'événements reprend la main entre deux lots.
+    En cas d'erreur, le lot en cours est annulé ; les lots déjà validés
+    restent, le scan suivant retrouve les changements non écrits.
+    """
+    db = await get_db()
+    flux = iter(lignes)
+    try:
+        while lot := list(islice(flux, TAILLE_LOT_ECRITURE)):
+            await db.executemany(sql, lot)
+            await db.commit()
+    except Exception:
+        await db.rollback()
+        raise
+
+
+# ═══════════════════════════════════════════════════════════
+# HASH PARALLÈLE
+# ═══════════════════════════════════════════════════════════
+
+class BudgetIO:
+    """Plafond de débit de lecture partagé par les threads de hash.
+    
+    Chaque lecture réserve sa part du budget ; le thread dort le temps que
+    le débit cumulé repasse sous `octets_par_s`. Sans budget, aucune attente.
+    """
+
+    def __init__(self, octets_par_s: int | None = None):
+        self.octets_par_s = octets_par_s
+        self._lock = threading.Lock()
+        self._prochain = 0.0
+
+    def consommer(self, octets: int) -> None:
+        if not self.octets_par_s or octets <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            debut = max(now, self._prochain)
+            self._prochain = debut + octets / self.octets_par_s
+        if debut > now:
+            time.sleep(debut - now)
+
+
+def _identite(nom: str, taille: int | None, date_modification: str | None) -> tuple:
+    """Identité rapide d'un fichier : nom, taille et date de modification."""
+    return (nom, taille, date_modification)
+
+
+def _doit_hasher(info: dict, record: dict | None) -> bool:
+    """Nouveau fichier, ou taille/date différente de l'index : hash nécessaire."""
+    if record is None:
+        return True
+    return (info["date_modification"] != record["date_modification"]
+            or info["taille"] != record["taille_octets"])
+
+
+def _preparer_lot(
+    parcours: Iterator[dict],
+    index_par_chemin: dict[str, dict],
+    pool: ThreadPoolExecutor,
+    places: threading.BoundedSemaphore,
+    budget: BudgetIO,
+) -> list[tuple[dict, Future | None]]:
+    """Avance le parcours de TAILLE_LOT_SCAN fichiers et soumet leurs hash.
+    
+    Exécuté hors de la boucle d'événements. Chaque fichier à hasher part au
+    pool dès que le parcours le rencontre : les hash d'un lot tournent
+    pendant le parcours du suivant. Au-delà de HASH_EN_VOL_MAX hash en
+    attente, le parcours patiente. Retourne (fichier, future du hash ou
+    None) ; liste vide en fin de parcours.
+    """
+    lot = []
+    for info in islice(parcours, TAILLE_LOT_SCAN):
+        future = None
+        if _doit_hasher(info, index_par_chemin.get(info["chemin"])):
+            places.acquire()
+            future = pool.submit(_calculer_hash, info["chemin"], budget, info["taille"])
+            future.add_done_callback(lambda _f: places.release())
+        lot.append((info, future))
+    return lot
+
+
 # ═══════════════════════════════════════════════════════════
 # UTILITAIRES
 # ═══════════════════════════════════════════════════════════
 
+def _entrees_triees(dossier: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(dossier) as it:
+            return sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+
 def _parcourir_dossier(
     racine: Path,
     profondeur_max: int = -1,
     extensions_filtre: set[str] | None = None,
-    _profondeur: int = 0,
-) -> list[dict]:
-    """Parcourt un dossier récursivement et retourne les infos de chaque fichier.
+) -> Iterator[dict]:
+    """Parcourt un dossier récursivement et produit les infos de chaque fichier.
+    
+    Générateur en profondeur d'abord, dans l'ordre des noms : seule la liste
+    des entrées des dossiers en cours de descente est en mémoire. Les
+    dossiers ignorés ou au-delà de la profondeur max ne sont pas ouverts ;
+    le type et le stat viennent des DirEntry de os.scandir (le stat est mis
+    en cache sur l'entrée et la taille est réutilisée par le hash).
     
     Respecte les filtres de profondeur et d'extensions.
     Ignore les dossiers/fichiers dans IGNORE_PATTERNS et IGNORE_EXTENSIONS.
     """
-    resultats = []
-    
-    if profondeur_max != -1 and _profondeur > profondeur_max:
-        return resultats
+    pile = [(iter(_entrees_triees(str(racine))), 0)]
     
-    try:
-        entries = sorted(racine.iterdir())
-    except PermissionError:
-        return resultats
-    except OSError:
-        return resultats
-    
-    for entry in entries:
+    while pile:
+        entries, profondeur = pile[-1]
+        entry = next(entries, None)
+        if entry is None:
+            pile.pop()
+            continue
+        
         # Ignorer les patterns
         if entry.name in IGNORE_PATTERNS:
             continue
         if entry.name.startswith('.'):
             continue
         
-        if entry.is_dir():
-            resultats.extend(
-                _parcourir_dossier(entry, profondeur_max, extensions_filtre, _profondeur + 1)
-            )
-        elif entry.is_file():
-            ext = entry.suffix.lower()
-            
-            # Ignorer extensions binaires
-            if ext in IGNORE_EXTENSIONS:
-                continue
-            
-            # Filtre d'extensions si défini
-            if extensions_filtre and ext not in extensions_filtre:
+        try:
+            if entry.is_dir():
+                if profondeur_max == -1 or profondeur < profondeur_max:
+                    pile.append((iter(_entrees_triees(entry.path)), profondeur + 1))
                 continue
-            
-            try:
-                stat = entry.stat()
-                mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
-                
-                resultats.append({
-                    "path": entry,
-                    "nom": entry.name,
-                    "extension": ext,
-                    "taille": stat.st_size,
-                    "date_modification": mtime,
-                })
-            except (PermissionError, OSError):
+            if not entry.is_file():
                 continue
-    
-    return resultats
+        except OSError:
+            continue
+        
+        ext = os.path.splitext(entry.name)[1].lower()
+        
+        # Ignorer extensions binaires
+        if ext in IGNORE_EXTENSIONS:
+            continue
+        
+        # Filtre d'extensions si défini
+        if extensions_filtre and ext not in extensions_filtre:
+            continue
+        
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        mtime = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).isoformat()
+        
+        yield {
+            "chemin": entry.path,
+            "nom": entry.name,
+            "extension": ext,
+            "taille": stat.st_size,
+            "date_modification": mtime,
+        }
 
 
-def _calculer_hash(filepath: Path) -> str | None:
+def _calculer_hash(
+    filepath: str | Path,
+    budget: BudgetIO | None = None,
+    taille: int | None = None,
+) -> str | None:
     """Calcule le SHA-256 d'un fichier.
     
     Pour les fichiers > HASH_MAX_SIZE, calcule un hash partiel
-    (début + milieu + fin) pour rester rapide.
+    (début + milieu + fin) pour rester rapide. Chaque lecture est
+    décomptée du `budget` s'il est fourni. `taille` évite un stat
+    quand le parcours la connaît déjà.
     """
+    lire = _lecteur(budget)
     try:
-        size = filepath.stat().st_size
+        size = os.stat(filepath).st_size if taille is None else taille
         
         if size == 0:
             return hashlib.sha256(b"").hexdigest()
@@ -356,23 +553,35 @@ def _calculer_hash(filepath: Path) -> str | None:
         if size <= HASH_MAX_SIZE:
             # Hash complet
             with open(filepath, "rb") as f:
-                while chunk := f.read(65536):
+                while chunk := lire(f, HASH_CHUNK):
                     h.update(chunk)
         else:
             # Hash partiel : 64KB début + 64KB milieu + 64KB fin + taille
-            chunk_size = 65536
+            chunk_size = HASH_CHUNK
             with open(filepath, "rb") as f:
                 # Début
-                h.update(f.read(chunk_size))
+                h.update(lire(f, chunk_size))
                 # Milieu
                 f.seek(size // 2)
-                h.update(f.read(chunk_size))
+                h.update(lire(f, chunk_size))
                 # Fin
                 f.seek(max(0, size - chunk_size))
-                h.update(f.read(chunk_size))
+                h.update(lire(f, chunk_size))
             # Inclure la taille pour différencier des fichiers avec même début/milieu/fin
             h.update(str(size).encode())
         
         return h.hexdigest()
     except (PermissionError, OSError):
         return None
+
+
+def _lecteur(budget: BudgetIO | None):
+    """Fonction de lecture d'un fichier, bridée par le budget s'il est fourni."""
+    if budget is None:
+        return lambda f, n: f.read(n)
+    
+    def lire(f, n: int) -> bytes:
+        chunk = f.read(n)
+        budget.consommer(len(chunk))
+        return chunk
+    return lire
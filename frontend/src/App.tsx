@@ -389,11 +389,16 @@ function App() {
         onConfigIA={() => setShowConfig(true)}
         onReorganiser={async () => {
           if (!espaceStore.espaceActifId) return
-          await api.reorganiserGraphe(espaceStore.espaceActifId)
+          await api.reorganiserGraphe(espaceStore.espaceActifId, p => {
+            if (p.positions && blocsStore.scope === 'espace') blocsStore.appliquerPositions(p.positions)
+          })
           blocsStore.refreshEspace()
         }}
         onReorganiserGlobal={async () => {
-          await api.reorganiserGlobal()
+          // Le canvas anime la convergence avec les positions intermédiaires
+          await api.reorganiserGlobal(p => {
+            if (p.positions && blocsStore.scope === 'global') blocsStore.appliquerPositions(p.positions)
+          })
           blocsStore.loadGrapheGlobal()
         }}
         onSuggererLiaisons={async () => {
@@ -61,6 +61,7 @@ export interface BlocAPI {
   couleur: string
   largeur: number
   hauteur: number
+  epingle: number  // 1 : bloc immobile lors des réorganisations
   titre: string | null
   titre_ia: string | null
   resume_ia: string | null
@@ -95,6 +96,7 @@ export async function updateBloc(id: string, data: {
   couleur?: string
   largeur?: number
   hauteur?: number
+  epingle?: boolean
 }): Promise<BlocAPI> {
   return request(`/blocs/${id}`, {
     method: 'PUT',
@@ -352,19 +354,66 @@ export async function askIA(espaceId: string, question: string): Promise<string>
   return data.response
 }
 
-export async function reorganiserGraphe(espaceId: string): Promise<string> {
-  const data = await request<{ result: string }>('/ia/reorganiser', {
+// ─── Jobs de layout (progression en SSE) ─────────────────
+
+export interface LayoutProgression {
+  iteration: number
+  iterations_max: number
+  temperature: number | null
+  energie: number | null
+  eta_s: number | null
+  positions?: Record<string, [number, number]> | null  // toutes les N itérations
+}
+
+export interface LayoutJobEtat extends LayoutProgression {
+  job_id: string
+  scope: 'espace' | 'global'
+  statut: 'en_attente' | 'en_cours' | 'termine' | 'annule' | 'erreur'
+  resultat: string | null
+  erreur: string | null
+}
+
+/** Suit un job de layout par Server-Sent Events jusqu'à sa fin. Résout avec le résumé final. */
+export function suivreLayoutJob(
+  jobId: string,
+  onProgress?: (p: LayoutProgression) => void,
+): Promise<string> {
+  return new Promise((resolve, reject) => {
+    const source = new EventSource(`${BASE}/ia/layouts/${jobId}/flux`)
+    source.addEventListener('progression', e => {
+      onProgress?.(JSON.parse((e as MessageEvent).data))
+    })
+    source.addEventListener('fin', e => {
+      source.close()
+      const etat: LayoutJobEtat = JSON.parse((e as MessageEvent).data)
+      if (etat.statut === 'termine') resolve(etat.resultat ?? '')
+      else reject(new Error(etat.erreur || etat.statut))
+    })
+    source.onerror = () => {
+      source.close()
+      reject(new Error('Flux de progression du layout interrompu'))
+    }
+  })
+}
+
+export async function reorganiserGlobal(
+  onProgress?: (p: LayoutProgression) => void,
+): Promise<string> {
+  const job = await request<LayoutJobEtat>('/ia/reorganiser-global', {
     method: 'POST',
-    body: JSON.stringify({ espace_id: espaceId }),
   })
-  return data.result
+  return suivreLayoutJob(job.job_id, onProgress)
 }
 
-export async function reorganiserGlobal(): Promise<string> {
-  const data = await request<{ scope: string; result: string }>('/ia/reorganiser-global', {
+export async function reorganiserGraphe(
+  espaceId: string,
+  onProgress?: (p: LayoutProgression) => void,
+): Promise<string> {
+  const job = await request<LayoutJobEtat>('/ia/reorganiser-espace', {
     method: 'POST',
+    body: JSON.stringify({ espace_id: espaceId }),
   })
-  return data.result
+  return suivreLayoutJob(job.job_id, onProgress)
 }
 
 export async function suggererLiaisons(): Promise<string> {
@@ -396,7 +445,9 @@ export interface RapportScan {
   fichiers_supprimes: number
   fichiers_deplaces: number
   fichiers_inchanges: number
+  fichiers_haches: number
   duree_ms: number
+  durees_ms: { parcours: number; hash: number; diff: number; ecriture: number }
   journal_id?: string
 }
 
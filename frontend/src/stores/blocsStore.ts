@@ -245,6 +245,14 @@ export function useBlocsStore(espaceActifId: string | null) {
     finally { setLoading(false) }
   }, [])
 
+  /** Applique des positions intermédiaires (animation d'un layout en cours). */
+  const appliquerPositions = useCallback((positions: Record<string, [number, number]>) => {
+    setBlocs(prev => prev.map(b => {
+      const p = positions[b.id]
+      return p ? { ...b, x: p[0], y: p[1] } : b
+    }))
+  }, [])
+
   /** Revient en mode espace. */
   const switchToEspace = useCallback(() => {
     setScope('espace')
@@ -301,6 +309,7 @@ export function useBlocsStore(espaceActifId: string | null) {
     changeBlocCouleur,
     refreshEspace,
     loadGrapheGlobal,
+    appliquerPositions,
     switchToEspace,
   }
 }